@@ -1,14 +1,34 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from decimal import Decimal
+from typing import List, Optional, Tuple
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # Derived from DATABASE_URL when unset
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_REVOCATION_REDIS_URL: Optional[str] = None  # Share revocations across workers when set
+    
+    # Password hashing (Argon2)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = one process per CPU
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Requests beyond this get 503
+    
+    # Login/signup throttling (token buckets)
+    AUTH_RATE_LIMIT_IP_BURST: int = 20
+    AUTH_RATE_LIMIT_IP_PER_MINUTE: float = 10
+    AUTH_RATE_LIMIT_EMAIL_BURST: int = 5
+    AUTH_RATE_LIMIT_EMAIL_PER_MINUTE: float = 5
+    RATE_LIMIT_REDIS_URL: Optional[str] = None  # Shared buckets across workers when set
     
     # SMTP
     SMTP_HOST: str
@@ -17,16 +37,77 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str
     SMTP_FROM: str
     
+    # Blackjack shoe (shuffled fresh for every hand)
+    BLACKJACK_DECKS: int = 6
+    
+    # Active game state ("redis://..." to share it between workers, otherwise in-process;
+    # required when ENVIRONMENT is "production")
+    GAME_STATE_REDIS_URL: Optional[str] = None
+    GAME_STATE_MAX_ENTRIES: int = 100000
+    GAME_STATE_TTL_SECONDS: int = 3600  # Abandoned games are evicted after this long, and forfeited once started this long ago
+    # "store" keeps blackjack/mines state server-side; "token" hands it to the client
+    # encrypted (GAME_STATE_TOKEN_KEY is 32 hex-encoded bytes, derived from SECRET_KEY when unset)
+    GAME_STATE_MODE: str = "store"
+    GAME_STATE_TOKEN_KEY: Optional[str] = None
+    
+    # Shared-wheel roulette (comma-separated table ids; every table spins on the same schedule)
+    ROULETTE_TABLES: str = "main"
+    ROULETTE_BETTING_WINDOW_SECONDS: int = 15
+    # Roulette liability limits, checked per slip and for a shared table's whole round
+    ROULETTE_MAX_NUMBER_LIABILITY: Decimal = Decimal("10000")  # Max paid out if any one number wins
+    ROULETTE_MAX_TABLE_LIABILITY: Decimal = Decimal("50000")   # Max house loss on the worst outcome
+    ROULETTE_SLIP_STORAGE: str = "rows"  # "rows" (one Bet per chip) or "compact" (slip packed on the round)
+    
+    # Dice autobet
+    DICE_AUTOBET_MAX_ROLLS: int = 1000  # Rolls per /games/dice/autobet request
+    
+    # Provably fair
+    FAIR_VERIFY_MAX_RECORDS: int = 100000  # Records per /games/fair/verify request
+    FAIR_VERIFY_MAX_BYTES: int = 32 * 1024 * 1024  # Body size per /games/fair/verify request
+    FAIR_VERIFY_WORKERS: int = 0  # Verification processes shared by requests, 0 = one per CPU
+    
+    # Wallet
+    WALLET_ENGINE: str = "locking"  # "locking" (SELECT ... FOR UPDATE) or "conditional" (UPDATE ... RETURNING)
+    
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:8080"
     
     # Application
     ENVIRONMENT: str = "development"
     
+    @property
+    def async_database_url(self) -> str:
+        """DATABASE_URL with its async driver (asyncpg / aiosqlite)"""
+        if self.ASYNC_DATABASE_URL:
+            return self.ASYNC_DATABASE_URL
+        
+        drivers = {
+            "postgresql+psycopg2://": "postgresql+asyncpg://",
+            "postgresql://": "postgresql+asyncpg://",
+            "postgres://": "postgresql+asyncpg://",
+            "sqlite://": "sqlite+aiosqlite://",
+        }
+        for sync_prefix, async_prefix in drivers.items():
+            if self.DATABASE_URL.startswith(sync_prefix):
+                return async_prefix + self.DATABASE_URL[len(sync_prefix):]
+        return self.DATABASE_URL
+    
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
+    @property
+    def roulette_tables_list(self) -> List[str]:
+        return [table_id.strip() for table_id in self.ROULETTE_TABLES.split(",") if table_id.strip()]
+    
+    @property
+    def roulette_limits(self) -> Tuple[int, int]:
+        """(max payout per number, max table liability) in cents"""
+        return (
+            int(self.ROULETTE_MAX_NUMBER_LIABILITY * 100),
+            int(self.ROULETTE_MAX_TABLE_LIABILITY * 100)
+        )
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import settings
-from .database import engine, Base
+from .database import engine, Base, AsyncSessionLocal
+from .services.game_catalog import game_catalog
+from .services.roulette_table_service import roulette_tables
+from .services.game_engines import fair_verification
+from .utils.security import password_hasher
 
 # Import routers
 from .routers import auth, admin, wallet
@@ -12,7 +16,8 @@ from .routers.games import (
     mines,
     slots,
     crash,
-    fantasy_cricket
+    fantasy_cricket,
+    fairness
 )
 
 app = FastAPI(
@@ -49,6 +54,38 @@ app.include_router(mines.router)
 app.include_router(slots.router)
 app.include_router(crash.router)
 app.include_router(fantasy_cricket.router)
+app.include_router(fairness.router)
+
+@app.on_event("startup")
+def require_shared_game_state():
+    """Seed pair nonces and shared tables must be shared by every worker in production"""
+    if settings.ENVIRONMENT == "production" and not settings.GAME_STATE_REDIS_URL:
+        raise RuntimeError("GAME_STATE_REDIS_URL must be set in production")
+
+@app.on_event("startup")
+async def load_game_catalog():
+    """Load game entries once so game routers resolve game_id from memory"""
+    async with AsyncSessionLocal() as db:
+        await game_catalog.load(db)
+
+@app.on_event("startup")
+async def start_roulette_tables():
+    """Spin the shared roulette wheels on their common schedule"""
+    roulette_tables.start()
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    """Stop the Argon2 worker processes"""
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_fair_verification():
+    """Stop the provably fair verification worker processes"""
+    fair_verification.shutdown_pool()
+
+@app.on_event("shutdown")
+async def stop_roulette_tables():
+    await roulette_tables.stop()
 
 @app.get("/")
 async def root():
@@ -86,7 +123,7 @@ async def list_games():
                 "name": "Blackjack",
                 "endpoint": "/games/blackjack",
                 "description": "Classic 21 card game with hit, stand, and double down",
-                "rtp": "99.5%"
+                "rtp": "99.2%"  # Basic strategy, see game_engines/blackjack_strategy.py
             },
             {
                 "name": "Roulette",
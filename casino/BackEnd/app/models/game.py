@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, Numeric, TIMESTAMP, ForeignKey, Enum
+from sqlalchemy import BigInteger, Boolean, Column, Integer, String, Numeric, TIMESTAMP, ForeignKey, Enum, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -47,6 +47,11 @@ class GameRound(Base):
     
     round_id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("game_session.session_id"))
+    state_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped on every action, invalidates older state tokens
+    slip = Column(JSON, nullable=True)  # Packed per-bet detail when the slip is stored compactly (one summary Bet)
+    seed_pair_id = Column(Integer, ForeignKey("seed_pair.seed_pair_id"), nullable=True, index=True)  # Provably fair draw (dice, mines, crash)
+    nonce = Column(Integer, nullable=True)
+    stream_seed = Column(BigInteger, nullable=True)  # EngineRandom seed the outcome was drawn with (roulette, slots, blackjack), for replay
     
     # Relationships
     session = relationship("GameSession", back_populates="rounds")
@@ -67,6 +72,19 @@ class Bet(Base):
     round = relationship("GameRound", back_populates="bets")
     wallet = relationship("Wallet", back_populates="bets")
 
+class SeedPair(Base):
+    __tablename__ = "seed_pair"
+    
+    seed_pair_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=True, index=True)  # None for the house pair (crash)
+    server_seed = Column(String(64), nullable=False)  # Revealed once the pair is rotated out
+    server_seed_hash = Column(String(64), nullable=False)
+    client_seed = Column(String(64), nullable=False)
+    nonce = Column(Integer, nullable=False, default=0)  # Nonces used, written when the pair is rotated out
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    revealed_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
 class GameProvider(Base):
     __tablename__ = "game_provider"
     
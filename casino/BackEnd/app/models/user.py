@@ -27,6 +27,7 @@ class User(Base):
     role = Column(Enum(UserType), default=UserType.player)
     tenant_id = Column(Integer, ForeignKey("tenants.tenant_id"), index=True)
     is_active = Column(Boolean, default=False)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bumped to revoke issued tokens
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     
     # Relationships
@@ -3,16 +3,19 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 
-from app.utils.security import get_password_hash
+from app.utils.security import password_hasher
 from ..database import get_db
 from ..models.user import User, UserKYC, UserType
 from ..models.tenant import Tenant, TenantRegion
 from ..schemas.tenant import RegionUpdate, TenantCreate, TenantResponse, RegionCreate, RegionResponse
 from ..schemas.user import TenantAdminCreate, UserResponse, UserSignup
 from ..utils.dependencies import require_casino_owner, require_tenant_admin
+from ..utils.user_cache import AuthenticatedUser, user_cache
+from ..utils.token_revocation import token_revocations
 from ..services.email_service import email_service
-from ..models.game import GameProvider
-from ..schemas.game import GameProviderCreate, GameProviderResponse
+from ..models.game import Game, GameProvider
+from ..schemas.game import GameProviderCreate, GameProviderResponse, GameResponse, GameRtpUpdate
+from ..services.game_catalog import game_catalog
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -22,7 +25,7 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 async def create_tenant(
     tenant_data: TenantCreate,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_casino_owner)
+    admin: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Create a new tenant"""
     
@@ -42,7 +45,7 @@ async def create_tenant(
 @router.get("/tenants", response_model=List[TenantResponse])
 async def get_all_tenants(
     db: Session = Depends(get_db),
-    # admin: User = Depends(require_casino_owner)
+    # admin: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Get all tenants"""
     tenants = db.query(Tenant).all()
@@ -52,7 +55,7 @@ async def get_all_tenants(
 async def get_tenant(
     tenant_id: int,
     db: Session = Depends(get_db),
-    # admin: User = Depends(require_casino_owner)
+    # admin: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Get a specific tenant"""
     tenant = db.query(Tenant).filter(Tenant.tenant_id == tenant_id).first()
@@ -68,7 +71,7 @@ async def update_tenant_status(
     tenant_id: int,
     status: bool,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_casino_owner)
+    admin: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Enable or disable a tenant"""
     tenant = db.query(Tenant).filter(Tenant.tenant_id == tenant_id).first()
@@ -89,7 +92,7 @@ async def update_tenant_status(
 async def create_region(
     region_data: RegionCreate,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_casino_owner)
+    admin: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Create a new region for a tenant"""
     
@@ -117,7 +120,7 @@ async def create_region(
 async def get_all_regions(
     tenant_id: int = None,
     db: Session = Depends(get_db),
-    # admin: User = Depends(require_casino_owner)
+    # admin: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Get all regions, optionally filtered by tenant"""
     query = db.query(TenantRegion)
@@ -134,7 +137,7 @@ async def update_region_tax(
     region_id: int,
     update_data: RegionUpdate,
     db: Session = Depends(get_db),
-    owner: User = Depends(require_casino_owner)
+    owner: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Update tax rate for a specific region"""
     region = db.query(TenantRegion).filter(TenantRegion.region_id == region_id).first()
@@ -167,7 +170,7 @@ from ..utils.dependencies import require_tenant_admin
 async def get_all_users_admin(
     is_active: Optional[bool] = None,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_tenant_admin)
+    admin: AuthenticatedUser = Depends(require_tenant_admin)
 ):
     """
     Get all users belonging specifically to the logged-in admin's tenant.
@@ -186,7 +189,7 @@ async def get_all_users_admin(
 @router.get("/kyc/pending")
 async def get_pending_kyc(
     db: Session = Depends(get_db),
-    admin: User = Depends(require_tenant_admin)
+    admin: AuthenticatedUser = Depends(require_tenant_admin)
 ):
     """Get all pending KYC verifications"""
     pending_kyc = db.query(UserKYC).filter(
@@ -211,7 +214,7 @@ async def get_pending_kyc(
 async def approve_kyc(
     kyc_id: int,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_tenant_admin)
+    admin: AuthenticatedUser = Depends(require_tenant_admin)
 ):
     """Approve KYC verification"""
     
@@ -244,7 +247,7 @@ async def reject_kyc(
     kyc_id: int,
     reason: str = None,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_tenant_admin)
+    admin: AuthenticatedUser = Depends(require_tenant_admin)
 ):
     """Reject KYC verification"""
     
@@ -275,7 +278,7 @@ async def reject_kyc(
 async def activate_user(
     user_id: int,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_tenant_admin)
+    admin: AuthenticatedUser = Depends(require_tenant_admin)
 ):
     """Activate a user account"""
     
@@ -294,9 +297,12 @@ async def activate_user(
             detail="KYC must be verified before activation"
         )
     
-    # Activate user
+    # Activate user (new token version so earlier tokens stay revoked)
     user.is_active = True
+    user.token_version = (user.token_version or 0) + 1
     db.commit()
+    user_cache.invalidate(user_id)
+    await token_revocations.revoke(user_id, user.token_version)
     
     # Send activation email
     await email_service.send_activation_email(
@@ -310,7 +316,7 @@ async def activate_user(
 async def deactivate_user(
     user_id: int,
     db: Session = Depends(get_db),
-    admin: User = Depends(require_tenant_admin)
+    admin: AuthenticatedUser = Depends(require_tenant_admin)
 ):
     """Deactivate a user account"""
     
@@ -322,7 +328,10 @@ async def deactivate_user(
         )
     
     user.is_active = False
+    user.token_version = (user.token_version or 0) + 1
     db.commit()
+    user_cache.invalidate(user_id)
+    await token_revocations.revoke(user_id, user.token_version)
     
     return {"message": "User deactivated successfully"}
 
@@ -332,7 +341,7 @@ async def deactivate_user(
 @router.get("/providers", response_model=List[GameProviderResponse])
 async def get_providers(
     db: Session = Depends(get_db),
-    owner: User = Depends(require_casino_owner)
+    owner: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Fetch all game providers"""
     return db.query(GameProvider).all()
@@ -341,7 +350,7 @@ async def get_providers(
 async def add_game_provider(
     provider_data: GameProviderCreate,
     db: Session = Depends(get_db),
-    owner: User = Depends(require_casino_owner)
+    owner: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Add a new game provider"""
     # Check if exists
@@ -371,7 +380,7 @@ async def toggle_provider_status(
     provider_id: int,
     is_active: bool,
     db: Session = Depends(get_db),
-    owner: User = Depends(require_casino_owner)
+    owner: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Enable or disable a game provider"""
     provider = db.query(GameProvider).filter(GameProvider.provider_id == provider_id).first()
@@ -382,13 +391,44 @@ async def toggle_provider_status(
     db.commit()
     return {"message": f"Provider {'enabled' if is_active else 'disabled'}"}
 
+# Game Catalog Management
+
+@router.get("/games", response_model=List[GameResponse])
+async def get_games(
+    db: Session = Depends(get_db),
+    owner: AuthenticatedUser = Depends(require_casino_owner)
+):
+    """Fetch all games"""
+    return db.query(Game).order_by(Game.game_id).all()
+
+@router.patch("/games/{game_id}/rtp", response_model=GameResponse)
+async def update_game_rtp(
+    game_id: int,
+    update_data: GameRtpUpdate,
+    db: Session = Depends(get_db),
+    owner: AuthenticatedUser = Depends(require_casino_owner)
+):
+    """Update the RTP of a game"""
+    game = db.query(Game).filter(Game.game_id == game_id).first()
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+    
+    game.rtp_percent = update_data.rtp_percent
+    db.commit()
+    db.refresh(game)
+    
+    # Game routers reload the catalog on their next lookup
+    game_catalog.invalidate()
+    
+    return game
+
 # Create Admin User for Tenant
 
 @router.post("/create_admin_user_for_tenant", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def create_admin_user_for_tenant(
     admin_data: TenantAdminCreate, 
     db: Session = Depends(get_db),
-    owner: User = Depends(require_casino_owner)
+    owner: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Create an admin user for a specific tenant"""
     
@@ -409,7 +449,7 @@ async def create_admin_user_for_tenant(
         )
     
     # 3. Hash password
-    hashed_password = get_password_hash(admin_data.password)
+    hashed_password = await password_hasher.hash(admin_data.password)
 
     # 4. Create User
     new_admin = User(
@@ -433,7 +473,7 @@ async def create_admin_user_for_tenant(
 async def get_tenant_admins(
     tenant_id: Optional[int] = None,
     db: Session = Depends(get_db),
-    owner: User = Depends(require_casino_owner)
+    owner: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Get all tenant admins, optionally filtered by tenant"""
     query = db.query(User).filter(User.role == UserType.admin)
@@ -449,7 +489,7 @@ async def update_tenant_admin_status(
     user_id: int,
     is_active: bool,
     db: Session = Depends(get_db),
-    owner: User = Depends(require_casino_owner)
+    owner: AuthenticatedUser = Depends(require_casino_owner)
 ):
     """Enable or disable a tenant admin"""
     
@@ -466,7 +506,10 @@ async def update_tenant_admin_status(
         )
     
     admin_user.is_active = is_active
+    admin_user.token_version = (admin_user.token_version or 0) + 1
     db.commit()
     db.refresh(admin_user)
+    user_cache.invalidate(user_id)
+    await token_revocations.revoke(user_id, admin_user.token_version)
     
     return {"message": f"Admin status updated to {'Active' if is_active else 'Inactive'}"}
\ No newline at end of file
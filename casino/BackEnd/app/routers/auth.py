@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from ..database import get_db
 from ..models.user import User, UserType
 from ..schemas.user import UserSignup, UserLogin, UserResponse, UserRegionSelect, KYCSubmit
 from ..schemas.auth import Token
-from ..utils.security import get_password_hash, verify_password, create_access_token
+from ..utils.security import password_hasher, create_access_token
 from ..utils.dependencies import get_current_user
+from ..utils.user_cache import AuthenticatedUser, user_cache
+from ..utils.rate_limiter import auth_throttle
 from ..services.wallet_service import wallet_service
 from ..config import settings
 from ..models.tenant import TenantRegion
@@ -15,9 +17,12 @@ from ..models.user import UserKYC
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
+async def signup(user_data: UserSignup, request: Request, db: Session = Depends(get_db)):
     """User signup - Returns Access Token immediately to allow onboarding"""
     
+    # Throttle before any lookup or hashing
+    await auth_throttle.check(request, "signup", user_data.email)
+    
     # Check if email exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
@@ -26,8 +31,8 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
             detail="Email already registered"
         )
     
-    # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    # Hash password (off the event loop)
+    hashed_password = await password_hasher.hash(user_data.password)
     
     # Create user (Active by default to allow onboarding steps, but gated by KYC on Login)
     new_user = User(
@@ -48,7 +53,12 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
     # Generate Token Immediately
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(new_user.user_id), "tenant_id": None},
+        data={
+            "sub": str(new_user.user_id),
+            "tenant_id": None,
+            "role": new_user.role.value,
+            "ver": new_user.token_version
+        },
         expires_delta=access_token_expires
     )
     
@@ -57,7 +67,7 @@ async def signup(user_data: UserSignup, db: Session = Depends(get_db)):
 @router.post("/select-region", response_model=UserResponse)
 async def select_region(
     region_data: UserRegionSelect,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Select region and assign tenant"""
@@ -74,20 +84,24 @@ async def select_region(
         )
     
     # Assign tenant
-    current_user.tenant_id = region.tenant_id
+    user = db.query(User).filter(User.user_id == current_user.user_id).first()
+    user.tenant_id = region.tenant_id
     
     # Create wallets for the user
-    wallet_service.create_wallets_for_user(db, current_user.user_id)
+    wallet_service.create_wallets_for_user(db, user.user_id)
     
     db.commit()
-    db.refresh(current_user)
+    db.refresh(user)
+    
+    # Cached auth fields now have a stale tenant_id
+    user_cache.invalidate(user.user_id)
     
-    return current_user
+    return user
 
 @router.post("/submit-kyc")
 async def submit_kyc(
     kyc_data: KYCSubmit,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthenticatedUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Submit KYC documents"""
@@ -124,18 +138,35 @@ async def submit_kyc(
     return {"message": "KYC submitted successfully. Awaiting admin approval."}
 
 @router.post("/login", response_model=Token)
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     """User login - Enforces strict KYC check"""
     
+    # Throttle before any lookup or password verification
+    await auth_throttle.check(request, "login", login_data.email)
+    
     # Find user by email
     user = db.query(User).filter(User.email == login_data.email).first()
     
-    if not user or not verify_password(login_data.password, user.password):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Verify password (off the event loop)
+    valid, new_hash = await password_hasher.verify_and_update(login_data.password, user.password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # Rehash passwords stored with outdated Argon2 parameters
+    if new_hash:
+        user.password = new_hash
+        db.commit()
         
     if not user.is_active:
         raise HTTPException(
@@ -154,13 +185,21 @@ async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.user_id), "tenant_id": user.tenant_id},
+        data={
+            "sub": str(user.user_id),
+            "tenant_id": user.tenant_id,
+            "role": user.role.value,
+            "ver": user.token_version
+        },
         expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: AuthenticatedUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get current user information"""
-    return current_user
\ No newline at end of file
+    return db.query(User).filter(User.user_id == current_user.user_id).first()
\ No newline at end of file
@@ -1,32 +1,99 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
-from typing import Dict
-from ...database import get_db
-from ...models.user import User
-from ...models.game import Game, GameSession, GameRound, Bet, BetStatus
+from typing import Optional, Tuple
+from ...database import get_async_db
+from ...models.game import GameSession, BetStatus
 from ...models.wallet import WalletType
 from ...utils.dependencies import get_current_active_user, require_tenant
-from ...services.wallet_service import wallet_service
-from ...services.game_engines.blackjack_engine import BlackjackEngine
+from ...utils.user_cache import AuthenticatedUser
+from ...utils.game_state_token import game_state_tokens
+from ...services.wallet_service import async_wallet_service
+from ...services.round_recorder import async_round_recorder
+from ...services.game_catalog import game_catalog
+from ...services.game_state_store import game_state_store
+from ...services.game_engines.blackjack_engine import BlackjackEngine, Shoe
+from ...config import settings
 
 router = APIRouter(prefix="/games/blackjack", tags=["Blackjack"])
 
-# Store active game sessions in memory (in production, use Redis)
-active_games: Dict[int, BlackjackEngine] = {}
+# Active hands are kept in the game state store keyed by session, or with
+# GAME_STATE_MODE="token" sealed into a token the client sends back in the
+# X-Game-State header. Every hand is dealt from a freshly shuffled shoe, so
+# there is no carried-over shoe for a player to count.
+GAME_NAMESPACE = "blackjack"
+
+async def _load_game(
+    session_id: int,
+    db: AsyncSession,
+    state_token: Optional[str]
+) -> Tuple[BlackjackEngine, Optional[int], bytes]:
+    """
+    Claim an active hand
+    
+    The hand is taken out of the store (or, in token mode, the round's state
+    version is advanced, committed with the action), so concurrent requests
+    cannot both play the same hand.
+    Returns: (engine, new state version or None in store mode, the
+    serialized hand for _release_game)
+    """
+    if settings.GAME_STATE_MODE == "token":
+        version = await async_round_recorder.get_state_version(db, session_id)
+        data = None
+        if state_token and version is not None:
+            data = game_state_tokens.open(GAME_NAMESPACE, session_id, version, state_token)
+        if data is None or not await async_round_recorder.advance_state_version(db, session_id, version):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Game state token is invalid or already used"
+            )
+        return BlackjackEngine.from_bytes(data), version + 1, data
+    
+    data = await game_state_store.take(GAME_NAMESPACE, str(session_id))
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Game session expired"
+        )
+    return BlackjackEngine.from_bytes(data), None, data
+
+async def _save_game(
+    session_id: int,
+    engine: BlackjackEngine,
+    db: AsyncSession,
+    version: Optional[int]
+) -> Optional[str]:
+    """Store a hand in progress; returns its state token in token mode"""
+    if settings.GAME_STATE_MODE == "token":
+        await db.commit()
+        return game_state_tokens.seal(GAME_NAMESPACE, session_id, version, engine.to_bytes())
+    
+    await game_state_store.set(
+        GAME_NAMESPACE, str(session_id), engine.to_bytes(), settings.GAME_STATE_TTL_SECONDS
+    )
+    return None
+
+async def _release_game(session_id: int, data: bytes, db: AsyncSession) -> None:
+    """Undo a failed action and put the claimed hand back"""
+    await db.rollback()
+    if settings.GAME_STATE_MODE != "token":
+        await game_state_store.set(GAME_NAMESPACE, str(session_id), data, settings.GAME_STATE_TTL_SECONDS)
 
 @router.post("/start")
 async def start_blackjack_game(
     bet_amount: Decimal,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Start a new blackjack game"""
     # 1. Check for active session
-    active_session = db.query(GameSession).filter(
-        GameSession.user_id == current_user.user_id,
-        GameSession.ended_at.is_(None)
-    ).first()
+    active_session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.user_id == current_user.user_id,
+            GameSession.ended_at.is_(None)
+        )
+    )
 
     if active_session:
         raise HTTPException(
@@ -37,79 +104,60 @@ async def start_blackjack_game(
             }
         )
     
-    # Get or create blackjack game entry
-    game = db.query(Game).filter(Game.game_name == "Blackjack").first()
-    if not game:
-        game = Game(game_name="Blackjack", rtp_percent=Decimal("99.5"))
-        db.add(game)
-        db.commit()
-        db.refresh(game)
+    # Resolve blackjack game entry from the in-process catalog
+    game_id = await game_catalog.get_game_id(db, "Blackjack")
     
     # Get user's cash wallet
-    wallet = wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
     if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
-    # Debit bet amount
-    wallet_service.debit_wallet(db, wallet.wallet_id, bet_amount)
+    # Every hand is dealt from a fresh shoe, recorded by its seed
+    shoe = Shoe(settings.BLACKJACK_DECKS)
     
-    # Create game session
-    session = GameSession(
+    # Debit bet amount and open the round in one transaction
+    session_id, bet_id = await async_round_recorder.open_round(
+        db,
         user_id=current_user.user_id,
-        game_id=game.game_id
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    
-    # Create game round
-    round_obj = GameRound(session_id=session.session_id)
-    db.add(round_obj)
-    db.commit()
-    db.refresh(round_obj)
-    
-    # Create bet record
-    bet = Bet(
-        round_id=round_obj.round_id,
+        game_id=game_id,
         wallet_id=wallet.wallet_id,
         bet_amount=bet_amount,
-        payout_amount=Decimal("0"),
-        bet_status=BetStatus.placed
+        stream_seed=shoe.seed
     )
-    db.add(bet)
-    db.commit()
-    db.refresh(bet)
     
-    # Initialize game engine
-    engine = BlackjackEngine()
+    # Initialize game engine and store the hand until it is settled
+    engine = BlackjackEngine(shoe=shoe)
     game_state = engine.start_game()
     
-    # Store in memory
-    active_games[session.session_id] = engine
+    state_token = await _save_game(session_id, engine, db, 0)
     
     return {
-        "session_id": session.session_id,
-        "bet_id": bet.bet_id,
+        "session_id": session_id,
+        "bet_id": bet_id,
         "bet_amount": bet_amount,
-        "game_state": game_state
+        "game_state": game_state,
+        "state_token": state_token
     }
 
 @router.post("/{session_id}/hit")
 async def hit(
     session_id: int,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db),
+    state_token: Optional[str] = Header(None, alias="X-Game-State")
 ):
     """Hit - draw another card"""
     
     # Verify session belongs to user
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id,
-        GameSession.user_id == current_user.user_id
-    ).first()
+    session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.session_id == session_id,
+            GameSession.user_id == current_user.user_id
+        )
+    )
     
     if not session:
         raise HTTPException(
@@ -117,25 +165,26 @@ async def hit(
             detail="Session not found"
         )
     
-    # Get game engine
-    if session_id not in active_games:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game session expired"
-        )
-    
-    engine = active_games[session_id]
+    # Claim the hand
+    engine, version, data = await _load_game(session_id, db, state_token)
     
     try:
         game_state = engine.hit()
         
         # If game over, settle
+        state_token = None
         if game_state["game_over"]:
             await _settle_blackjack_game(session_id, engine, db)
+        else:
+            state_token = await _save_game(session_id, engine, db, version)
         
-        return {"game_state": game_state}
+        return {"game_state": game_state, "state_token": state_token}
     
+    except HTTPException:
+        await _release_game(session_id, data, db)
+        raise
     except Exception as e:
+        await _release_game(session_id, data, db)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -144,15 +193,18 @@ async def hit(
 @router.post("/{session_id}/stand")
 async def stand(
     session_id: int,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db),
+    state_token: Optional[str] = Header(None, alias="X-Game-State")
 ):
     """Stand - end turn and let dealer play"""
     
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id,
-        GameSession.user_id == current_user.user_id
-    ).first()
+    session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.session_id == session_id,
+            GameSession.user_id == current_user.user_id
+        )
+    )
     
     if not session:
         raise HTTPException(
@@ -160,13 +212,7 @@ async def stand(
             detail="Session not found"
         )
     
-    if session_id not in active_games:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game session expired"
-        )
-    
-    engine = active_games[session_id]
+    engine, _, data = await _load_game(session_id, db, state_token)
     
     try:
         game_state = engine.stand()
@@ -174,7 +220,11 @@ async def stand(
         
         return {"game_state": game_state}
     
+    except HTTPException:
+        await _release_game(session_id, data, db)
+        raise
     except Exception as e:
+        await _release_game(session_id, data, db)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -183,15 +233,18 @@ async def stand(
 @router.post("/{session_id}/double")
 async def double_down(
     session_id: int,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db),
+    state_token: Optional[str] = Header(None, alias="X-Game-State")
 ):
     """Double down - double bet and hit once"""
     
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id,
-        GameSession.user_id == current_user.user_id
-    ).first()
+    session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.session_id == session_id,
+            GameSession.user_id == current_user.user_id
+        )
+    )
     
     if not session:
         raise HTTPException(
@@ -199,81 +252,51 @@ async def double_down(
             detail="Session not found"
         )
     
-    if session_id not in active_games:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game session expired"
-        )
-    
-    engine = active_games[session_id]
-    
-    # Get original bet
-    round_obj = db.query(GameRound).filter(
-        GameRound.session_id == session_id
-    ).first()
-    
-    bet = db.query(Bet).filter(Bet.round_id == round_obj.round_id).first()
-    original_amount = bet.bet_amount
-    
-    # Get wallet and debit additional amount
-    wallet = wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
-    wallet_service.debit_wallet(db, wallet.wallet_id, original_amount)
-    
-    # Update bet amount
-    bet.bet_amount = original_amount * 2
-    db.commit()
+    engine, _, data = await _load_game(session_id, db, state_token)
     
     try:
+        # Get original bet
+        bet = await async_round_recorder.get_round_bet(db, session_id)
+        original_amount = bet.bet_amount
+        
+        # Debit additional amount (committed together with settlement)
+        await async_wallet_service.debit_wallet(db, bet.wallet_id, original_amount, commit=False)
+        
+        # Update bet amount
+        bet.bet_amount = original_amount * 2
+        
         game_state = engine.double_down()
         await _settle_blackjack_game(session_id, engine, db)
         
         return {"game_state": game_state}
     
+    # Discard the additional debit and put the hand back
+    except HTTPException:
+        await _release_game(session_id, data, db)
+        raise
     except Exception as e:
-        # Refund the additional bet
-        wallet_service.credit_wallet(db, wallet.wallet_id, original_amount)
+        await _release_game(session_id, data, db)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
-async def _settle_blackjack_game(session_id: int, engine: BlackjackEngine, db: Session):
+async def _settle_blackjack_game(session_id: int, engine: BlackjackEngine, db: AsyncSession):
     """Settle blackjack game and update wallet"""
     
     # Get bet
-    round_obj = db.query(GameRound).filter(
-        GameRound.session_id == session_id
-    ).first()
-    
-    bet = db.query(Bet).filter(Bet.round_id == round_obj.round_id).first()
+    bet = await async_round_recorder.get_round_bet(db, session_id)
     
     # Calculate payout
     payout = engine.calculate_payout(bet.bet_amount)
     
-    # Update bet
-    bet.payout_amount = payout
-    
     if engine.result in ["win", "blackjack"]:
-        bet.bet_status = BetStatus.won
+        bet_status = BetStatus.won
     elif engine.result == "push":
-        bet.bet_status = BetStatus.placed  # Push - return bet
+        bet_status = BetStatus.placed  # Push - return bet
     else:
-        bet.bet_status = BetStatus.lost
-    
-    db.commit()
-    
-    # Credit payout to wallet
-    if payout > 0:
-        wallet_service.credit_wallet(db, bet.wallet_id, payout, commit=True)
-    
-    # Close session
-    from datetime import datetime
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id
-    ).first()
-    session.ended_at = datetime.utcnow()
-    db.commit()
+        bet_status = BetStatus.lost
     
-    # Remove from active games
-    if session_id in active_games:
-        del active_games[session_id]
\ No newline at end of file
+    # Update bet, credit payout and close session in one transaction (the
+    # hand was already taken out of the store when it was claimed)
+    await async_round_recorder.settle_round(db, session_id, payout, bet_status)
\ No newline at end of file
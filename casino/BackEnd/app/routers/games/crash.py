@@ -1,23 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Optional
 from pydantic import BaseModel
 import secrets
 import asyncio
-from ...database import get_db
-from ...models.user import User
-from ...models.game import Game, GameSession, GameRound, Bet, BetStatus
+from ...database import get_async_db
+from ...models.game import GameSession, BetStatus
 from ...models.wallet import WalletType
 from ...utils.dependencies import get_current_active_user, require_tenant
-from ...services.wallet_service import wallet_service
+from ...utils.user_cache import AuthenticatedUser
+from ...services.wallet_service import async_wallet_service
+from ...services.round_recorder import async_round_recorder
+from ...services.game_catalog import game_catalog
+from ...services.game_state_store import game_state_store
+from ...services.seed_pair_service import seed_pairs
 from ...services.game_engines.crash_engine import CrashGame
+from ...config import settings
 
 router = APIRouter(prefix="/games/crash", tags=["Crash"])
 
-# Store active crash games
-active_crash_games: Dict[str, CrashGame] = {}
-current_game_id: Optional[str] = None
+# Rounds are kept in the game state store keyed by game id, along with
+# a pointer to the round currently accepting bets
+GAME_NAMESPACE = "crash"
+CURRENT_NAMESPACE = "crash_current"
+CURRENT_KEY = "current"
+
+async def _load_game(game_id: str) -> Optional[CrashGame]:
+    data = await game_state_store.get(GAME_NAMESPACE, game_id)
+    return CrashGame.from_bytes(data) if data is not None else None
+
+async def _current_game_id() -> Optional[str]:
+    game_id = await game_state_store.get(CURRENT_NAMESPACE, CURRENT_KEY)
+    return game_id.decode() if game_id is not None else None
 
 class CrashBetInput(BaseModel):
     bet_amount: Decimal
@@ -26,11 +42,10 @@ class CrashBetInput(BaseModel):
 @router.post("/join")
 async def join_crash_game(
     bet_data: CrashBetInput,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Join the current crash game before it starts"""
-    global current_game_id
     
     # Validate auto_cashout
     if bet_data.auto_cashout and bet_data.auto_cashout < Decimal("1.01"):
@@ -39,16 +54,11 @@ async def join_crash_game(
             detail="Auto cashout must be at least 1.01x"
         )
     
-    # Get or create crash game entry
-    game = db.query(Game).filter(Game.game_name == "Crash").first()
-    if not game:
-        game = Game(game_name="Crash", rtp_percent=Decimal("99.0"))
-        db.add(game)
-        db.commit()
-        db.refresh(game)
+    # Resolve crash game entry from the in-process catalog
+    catalog_game_id = await game_catalog.get_game_id(db, "Crash")
     
     # Get user's cash wallet
-    wallet = wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
     if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -56,14 +66,35 @@ async def join_crash_game(
         )
     
     # Create or get current game
-    if not current_game_id or current_game_id not in active_crash_games:
-        game_id = f"crash_{secrets.token_hex(8)}"
-        server_seed = secrets.token_hex(32)
-        current_game_id = game_id
-        crash_game = CrashGame(game_id, server_seed)
-        active_crash_games[game_id] = crash_game
-    else:
-        crash_game = active_crash_games[current_game_id]
+    current_game_id = await _current_game_id()
+    crash_game = await _load_game(current_game_id) if current_game_id else None
+    if crash_game is None:
+        # Crash points come from the house seed pair, one nonce per round; the
+        # nonce of a round that loses the race below is skipped
+        candidate = CrashGame(f"crash_{secrets.token_hex(8)}", await seed_pairs.draw(db, None))
+        await game_state_store.set(
+            GAME_NAMESPACE, candidate.game_id, candidate.to_bytes(), settings.GAME_STATE_TTL_SECONDS
+        )
+        
+        def claim_current(data: Optional[bytes]) -> bytes:
+            # Replace only a missing or dead pointer; another joiner may have set a live one meanwhile
+            if data is None or data.decode() == current_game_id:
+                return candidate.game_id.encode()
+            return data
+        
+        game_id = (await game_state_store.update(
+            CURRENT_NAMESPACE, CURRENT_KEY, claim_current, settings.GAME_STATE_TTL_SECONDS
+        )).decode()
+        if game_id == candidate.game_id:
+            crash_game = candidate
+        else:
+            await game_state_store.delete(GAME_NAMESPACE, candidate.game_id)
+            crash_game = await _load_game(game_id)
+            if crash_game is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Crash round changed, try again"
+                )
     
     # Check if game already started
     if crash_game.game_started:
@@ -72,52 +103,47 @@ async def join_crash_game(
             detail="Game already started, wait for next round"
         )
     
-    # Debit bet amount
+    # Debit bet amount and open the round in one transaction
     try:
-        wallet_service.debit_wallet(db, wallet.wallet_id, bet_data.bet_amount)
-    except HTTPException:
+        session_id, bet_id = await async_round_recorder.open_round(
+            db,
+            user_id=current_user.user_id,
+            game_id=catalog_game_id,
+            wallet_id=wallet.wallet_id,
+            bet_amount=bet_data.bet_amount,
+            seed_pair_id=crash_game.seed_pair_id,
+            nonce=crash_game.nonce
+        )
+    except HTTPException as e:
+        if e.status_code != status.HTTP_400_BAD_REQUEST:
+            raise
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Insufficient balance"
         )
     
-    # Create game session
-    session = GameSession(
-        user_id=current_user.user_id,
-        game_id=game.game_id
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    
-    # Create game round
-    round_obj = GameRound(session_id=session.session_id)
-    db.add(round_obj)
-    db.commit()
-    db.refresh(round_obj)
-    
-    # Create bet record
-    bet_record = Bet(
-        round_id=round_obj.round_id,
-        wallet_id=wallet.wallet_id,
-        bet_amount=bet_data.bet_amount,
-        payout_amount=Decimal("0"),
-        bet_status=BetStatus.placed
-    )
-    db.add(bet_record)
-    db.commit()
-    db.refresh(bet_record)
-    
-    # Add player to crash game
-    success = crash_game.add_player_bet(
-        user_id=current_user.user_id,
-        bet_amount=bet_data.bet_amount,
-        auto_cashout=bet_data.auto_cashout
+    # Add player to crash game (re-read atomically, other players may have joined meanwhile)
+    success = False
+    
+    def add_player(data: Optional[bytes]) -> Optional[bytes]:
+        nonlocal success
+        if data is None:
+            return None
+        game = CrashGame.from_bytes(data)
+        success = game.add_player_bet(
+            user_id=current_user.user_id,
+            bet_amount=bet_data.bet_amount,
+            auto_cashout=bet_data.auto_cashout
+        )
+        return game.to_bytes() if success else data
+    
+    await game_state_store.update(
+        GAME_NAMESPACE, crash_game.game_id, add_player, settings.GAME_STATE_TTL_SECONDS
     )
     
     if not success:
-        # Refund
-        wallet_service.credit_wallet(db, wallet.wallet_id, bet_data.bet_amount)
+        # Refund by settling the opened round as cancelled, so it does not stay pending
+        await async_round_recorder.settle_round(db, session_id, bet_data.bet_amount, BetStatus.cancelled)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to join game"
@@ -125,44 +151,54 @@ async def join_crash_game(
     
     return {
         "game_id": crash_game.game_id,
-        "session_id": session.session_id,
-        "bet_id": bet_record.bet_id,
+        "session_id": session_id,
+        "bet_id": bet_id,
         "bet_amount": bet_data.bet_amount,
         "auto_cashout": bet_data.auto_cashout,
+        "seed_pair_id": crash_game.seed_pair_id,
         "server_seed_hash": crash_game.server_seed_hash,
+        "client_seed": crash_game.client_seed,
+        "nonce": crash_game.nonce,
         "message": "Waiting for game to start..."
     }
 
 @router.post("/{game_id}/cashout")
 async def cashout_crash(
     game_id: str,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Cash out from current crash game"""
     
-    if game_id not in active_crash_games:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game not found"
-        )
-    
-    crash_game = active_crash_games[game_id]
+    result = None
     
-    if not crash_game.game_started:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game not started yet"
-        )
-    
-    if crash_game.game_crashed:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game already crashed"
-        )
+    def cash_out(data: Optional[bytes]) -> Optional[bytes]:
+        nonlocal result
+        if data is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Game not found"
+            )
+        
+        crash_game = CrashGame.from_bytes(data)
+        
+        if not crash_game.game_started:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Game not started yet"
+            )
+        
+        if crash_game.game_crashed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Game already crashed"
+            )
+        
+        # Cash out player
+        result = crash_game.cash_out_player(current_user.user_id)
+        return crash_game.to_bytes() if result else data
     
-    # Cash out player
-    result = crash_game.cash_out_player(current_user.user_id)
+    await game_state_store.update(GAME_NAMESPACE, game_id, cash_out, settings.GAME_STATE_TTL_SECONDS)
     
     if not result:
         raise HTTPException(
@@ -171,30 +207,21 @@ async def cashout_crash(
         )
     
     # Get user's session and bet
-    session = db.query(GameSession).filter(
-        GameSession.user_id == current_user.user_id,
-        GameSession.ended_at == None
-    ).order_by(GameSession.session_id.desc()).first()
+    session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.user_id == current_user.user_id,
+            GameSession.ended_at == None
+        ).order_by(GameSession.session_id.desc())
+    )
     
     if session:
-        round_obj = db.query(GameRound).filter(
-            GameRound.session_id == session.session_id
-        ).first()
-        
-        bet = db.query(Bet).filter(Bet.round_id == round_obj.round_id).first()
-        
-        # Update bet
-        bet.payout_amount = result["payout"]
-        bet.bet_status = BetStatus.won
-        db.commit()
-        
-        # Credit payout
-        wallet_service.credit_wallet(db, bet.wallet_id, result["payout"])
-        
-        # Close session
-        from datetime import datetime
-        session.ended_at = datetime.utcnow()
-        db.commit()
+        # Update bet, credit payout and close session in one transaction
+        await async_round_recorder.settle_round(
+            db,
+            session.session_id,
+            result["payout"],
+            BetStatus.won
+        )
     
     return {
         "game_id": game_id,
@@ -207,25 +234,25 @@ async def cashout_crash(
 async def get_crash_state(game_id: str):
     """Get current crash game state"""
     
-    if game_id not in active_crash_games:
+    crash_game = await _load_game(game_id)
+    if crash_game is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Game not found"
         )
     
-    crash_game = active_crash_games[game_id]
     return crash_game.get_current_state()
 
 @router.get("/current")
 async def get_current_game():
     """Get current game ID"""
-    global current_game_id
+    current_game_id = await _current_game_id()
     
     if not current_game_id:
         return {"game_id": None, "message": "No active game"}
     
-    if current_game_id in active_crash_games:
-        crash_game = active_crash_games[current_game_id]
+    crash_game = await _load_game(current_game_id)
+    if crash_game is not None:
         return {
             "game_id": current_game_id,
             "state": crash_game.get_current_state()
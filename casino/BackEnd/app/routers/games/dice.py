@@ -1,14 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
+from typing import Optional
 from pydantic import BaseModel
-from ...database import get_db
-from ...models.user import User
-from ...models.game import Game, GameSession, GameRound, Bet, BetStatus
+from functools import lru_cache
+import json
+from ...database import get_async_db
 from ...models.wallet import WalletType
 from ...utils.dependencies import get_current_active_user, require_tenant
-from ...services.wallet_service import wallet_service
-from ...services.game_engines.dice_engine import DiceEngine
+from ...utils.user_cache import AuthenticatedUser
+from ...services.wallet_service import async_wallet_service
+from ...services.round_recorder import async_round_recorder
+from ...services.game_catalog import game_catalog
+from ...services.seed_pair_service import seed_pairs
+from ...services.game_engines.dice_engine import DiceEngine, HOUSE_EDGE, MULTIPLIERS, ROLL_ALGORITHMS, WIN_CHANCES
+from ...config import settings
 
 router = APIRouter(prefix="/games/dice", tags=["Dice"])
 
@@ -16,20 +24,29 @@ class DiceRollInput(BaseModel):
     bet_amount: Decimal
     target: float
     roll_over: bool = True
-    client_seed: str
-    nonce: int
+
+class DiceAutobetInput(BaseModel):
+    bet_amount: Decimal
+    target: float
+    roll_over: bool = True
+    rolls: int
+    on_win: Optional[Decimal] = None       # Stake multiplier after a win (None resets to bet_amount)
+    on_loss: Optional[Decimal] = None      # Stake multiplier after a loss (None resets to bet_amount)
+    stop_profit: Optional[Decimal] = None
+    stop_loss: Optional[Decimal] = None
 
 class DiceVerifyInput(BaseModel):
     server_seed: str
     client_seed: str
     nonce: int
     claimed_result: float
+    algorithm: str = "hmac-sha256"         # "sha256" for rolls made before seed pairs
 
 @router.post("/roll")
 async def roll_dice(
     roll_data: DiceRollInput,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Roll the dice with provably fair mechanism"""
     
@@ -40,79 +57,49 @@ async def roll_dice(
             detail="Target must be between 0 and 99.99"
         )
     
-    # Get or create dice game entry
-    game = db.query(Game).filter(Game.game_name == "Dice").first()
-    if not game:
-        game = Game(game_name="Dice", rtp_percent=Decimal("99.0"))
-        db.add(game)
-        db.commit()
-        db.refresh(game)
+    # Resolve dice game entry from the in-process catalog
+    game_id = await game_catalog.get_game_id(db, "Dice")
     
     # Get user's cash wallet
-    wallet = wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
     if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
-    # Debit bet amount
-    try:
-        wallet_service.debit_wallet(db, wallet.wallet_id, roll_data.bet_amount)
-    except HTTPException:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient balance"
-        )
-    
-    # Create game session
-    session = GameSession(
-        user_id=current_user.user_id,
-        game_id=game.game_id
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    
-    # Create game round
-    round_obj = GameRound(session_id=session.session_id)
-    db.add(round_obj)
-    db.commit()
-    db.refresh(round_obj)
-    
-    # Play dice round
+    # Play dice round on the next nonce of the player's committed seed pair
+    seed = await seed_pairs.draw(db, current_user.user_id)
     engine = DiceEngine()
     result = engine.play_round(
         bet_amount=roll_data.bet_amount,
         target=roll_data.target,
         roll_over=roll_data.roll_over,
-        client_seed=roll_data.client_seed,
-        nonce=roll_data.nonce
+        server_seed=seed["server_seed"],
+        client_seed=seed["client_seed"],
+        nonce=seed["nonce"]
     )
     
-    # Create bet record
-    bet_record = Bet(
-        round_id=round_obj.round_id,
-        wallet_id=wallet.wallet_id,
-        bet_amount=roll_data.bet_amount,
-        payout_amount=result["payout"],
-        bet_status=BetStatus.won if result["won"] else BetStatus.lost
-    )
-    db.add(bet_record)
-    db.commit()
-    
-    # Credit payout if won
-    if result["payout"] > 0:
-        wallet_service.credit_wallet(db, wallet.wallet_id, result["payout"])
-    
-    # Close session
-    from datetime import datetime
-    session.ended_at = datetime.utcnow()
-    db.commit()
+    # Debit, record and settle the round in one transaction
+    try:
+        session_id, _, bet_ids = await async_round_recorder.record_round(
+            db,
+            user_id=current_user.user_id,
+            game_id=game_id,
+            wallet_id=wallet.wallet_id,
+            bets=[result],
+            seed_pair_id=seed["seed_pair_id"],
+            nonce=seed["nonce"]
+        )
+    except HTTPException:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Insufficient balance"
+        )
     
     return {
-        "session_id": session.session_id,
-        "bet_id": bet_record.bet_id,
+        "session_id": session_id,
+        "bet_id": bet_ids[0],
         "roll_result": result["roll_result"],
         "target": result["target"],
         "roll_over": result["roll_over"],
@@ -120,29 +107,146 @@ async def roll_dice(
         "multiplier": result["multiplier"],
         "bet_amount": result["bet_amount"],
         "payout": result["payout"],
-        "server_seed": result["server_seed"],
-        "server_seed_hash": result["server_seed_hash"],
+        "seed_pair_id": seed["seed_pair_id"],
+        "server_seed_hash": seed["server_seed_hash"],
         "client_seed": result["client_seed"],
         "nonce": result["nonce"]
     }
 
+@router.post("/autobet")
+async def autobet_dice(
+    autobet_data: DiceAutobetInput,
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Roll many times with a server-side strategy in one request
+    
+    Every roll is played first, against the balance read at the start, and
+    then settled in one transaction: one wallet update for the net result
+    (a debit checked against the current balance, so a run that a
+    concurrent change left uncovered fails as a whole) and bulk-inserted
+    rounds and bets. The response is NDJSON, one line per roll and then a
+    summary line, written from the settled result; nothing is sent before
+    settlement, so it is not streamed as the rolls are played.
+    """
+    
+    # Validate target, roll count and strategy
+    if autobet_data.target < 0 or autobet_data.target > 99.99:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Target must be between 0 and 99.99"
+        )
+    
+    if autobet_data.rolls < 1 or autobet_data.rolls > settings.DICE_AUTOBET_MAX_ROLLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Rolls must be between 1 and {settings.DICE_AUTOBET_MAX_ROLLS}"
+        )
+    
+    for name in ("bet_amount", "on_win", "on_loss", "stop_profit", "stop_loss"):
+        value = getattr(autobet_data, name)
+        if value is not None and value <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{name} must be positive"
+            )
+    
+    # Resolve dice game entry from the in-process catalog
+    game_id = await game_catalog.get_game_id(db, "Dice")
+    
+    # Get user's cash wallet
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    if not wallet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wallet not found"
+        )
+    
+    # Reserve a nonce per roll; nonces left over by an early stop are skipped
+    seed = await seed_pairs.draw(db, current_user.user_id, autobet_data.rolls)
+    
+    engine = DiceEngine()
+    result = engine.play_autobet(
+        bet_amount=autobet_data.bet_amount,
+        target=autobet_data.target,
+        roll_over=autobet_data.roll_over,
+        server_seed=seed["server_seed"],
+        client_seed=seed["client_seed"],
+        first_nonce=seed["nonce"],
+        rolls=autobet_data.rolls,
+        balance=wallet.balance,
+        on_win=autobet_data.on_win,
+        on_loss=autobet_data.on_loss,
+        stop_profit=autobet_data.stop_profit,
+        stop_loss=autobet_data.stop_loss
+    )
+    
+    # Net result, rounds and bets in one transaction
+    session_id = None
+    if result["results"]:
+        try:
+            session_id, _ = await async_round_recorder.record_rounds(
+                db,
+                user_id=current_user.user_id,
+                game_id=game_id,
+                wallet_id=wallet.wallet_id,
+                rounds=result["results"],
+                seed_pair_id=seed["seed_pair_id"]
+            )
+        except HTTPException as e:
+            if e.status_code != status.HTTP_400_BAD_REQUEST:
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient balance"
+            )
+    
+    summary = {
+        "session_id": session_id,
+        "rolls": len(result["results"]),
+        "stop_reason": result["stop_reason"],
+        "multiplier": result["multiplier"],
+        "total_bet": result["total_bet"],
+        "total_payout": result["total_payout"],
+        "profit": result["profit"],
+        "seed_pair_id": seed["seed_pair_id"],
+        "server_seed_hash": seed["server_seed_hash"],
+        "client_seed": seed["client_seed"]
+    }
+    
+    def lines():
+        for roll in result["results"]:
+            yield json.dumps(jsonable_encoder(roll)) + "\n"
+        yield json.dumps(jsonable_encoder({"summary": summary})) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 @router.post("/verify")
 async def verify_dice_roll(verify_data: DiceVerifyInput):
     """Verify a dice roll result"""
+    if verify_data.algorithm not in ROLL_ALGORITHMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Algorithm must be one of {', '.join(ROLL_ALGORITHMS)}"
+        )
+    
     engine = DiceEngine()
     
     is_valid = engine.verify_roll(
         server_seed=verify_data.server_seed,
         client_seed=verify_data.client_seed,
         nonce=verify_data.nonce,
-        claimed_result=verify_data.claimed_result
+        claimed_result=verify_data.claimed_result,
+        algorithm=verify_data.algorithm
     )
     
     if is_valid:
         actual_result = engine.roll_dice(
             verify_data.server_seed,
             verify_data.client_seed,
-            verify_data.nonce
+            verify_data.nonce,
+            verify_data.algorithm
         )
         return {
             "valid": True,
@@ -165,17 +269,38 @@ async def calculate_multiplier(target: float, roll_over: bool = True):
         )
     
     engine = DiceEngine()
-    multiplier = engine.calculate_multiplier(target, roll_over)
-    
-    # Calculate win chance
-    if roll_over:
-        win_chance = (100 - target)
-    else:
-        win_chance = target
     
     return {
         "target": target,
         "roll_over": roll_over,
-        "multiplier": float(multiplier),
-        "win_chance": win_chance
-    }
\ No newline at end of file
+        "multiplier": float(engine.calculate_multiplier(target, roll_over)),
+        "win_chance": engine.win_chance(target, roll_over)
+    }
+
+@lru_cache(maxsize=1)
+def _multiplier_table() -> bytes:
+    """Full multiplier table, serialized once"""
+    return json.dumps({
+        "target_step": 0.01,
+        "house_edge": float(HOUSE_EDGE),
+        **{
+            "roll_over" if roll_over else "roll_under": {
+                "multiplier": [float(multiplier) for multiplier in MULTIPLIERS[roll_over]],
+                "win_chance": list(WIN_CHANCES[roll_over])
+            }
+            for roll_over in (True, False)
+        }
+    }, separators=(",", ":")).encode()
+
+@router.get("/multipliers")
+async def get_multiplier_table():
+    """
+    Multiplier and win chance for every target (index = target * 100)
+    
+    The table never changes, so one response serves every slider position.
+    """
+    return Response(
+        content=_multiplier_table(),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
\ No newline at end of file
@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from pydantic import BaseModel
+import json
+from ...database import get_async_db
+from ...utils.dependencies import get_current_active_user, require_tenant, require_casino_owner
+from ...utils.user_cache import AuthenticatedUser
+from ...services.seed_pair_service import seed_pairs
+from ...services.game_engines.fair_verification import parse_lines, process_pool, verify_stream
+from ...config import settings
+
+router = APIRouter(prefix="/games/fair", tags=["Provably Fair"])
+
+class RotateSeedInput(BaseModel):
+    client_seed: Optional[str] = None
+
+@router.get("/seeds")
+async def get_seed_pair(
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get your active seed pair (server seed hash, client seed, next nonce) used by dice and mines"""
+    return await seed_pairs.get_active(db, current_user.user_id)
+
+@router.post("/seeds/rotate")
+async def rotate_seed_pair(
+    rotate_data: RotateSeedInput,
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Reveal your current server seed and start a new seed pair"""
+    return await seed_pairs.rotate(db, current_user.user_id, rotate_data.client_seed)
+
+@router.get("/house")
+async def get_house_seed_pair(
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the active house seed pair used for crash rounds"""
+    return await seed_pairs.get_active(db, None)
+
+@router.post("/house/rotate")
+async def rotate_house_seed_pair(
+    rotate_data: RotateSeedInput,
+    current_user: AuthenticatedUser = Depends(require_casino_owner),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Casino Owner: Reveal the house server seed and start a new house seed pair"""
+    return await seed_pairs.rotate(db, None, rotate_data.client_seed)
+
+@router.post("/verify")
+async def verify_outcomes(
+    request: Request,
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+):
+    """
+    Verify many dice, crash and mines outcomes at once
+    
+    The body is NDJSON, one record per line: game, server_seed, client_seed,
+    nonce, claimed (plus num_mines and optionally grid_size for mines).
+    Streams one NDJSON line per mismatch, then a summary line with the
+    throughput in verifications per second. Records are checked on the
+    shared verification processes, not the event loop's threads.
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"At most {settings.FAIR_VERIFY_MAX_BYTES} bytes and {settings.FAIR_VERIFY_MAX_RECORDS} records per request"
+    )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.FAIR_VERIFY_MAX_BYTES:
+        raise too_large
+    
+    # Read incrementally so an oversized body is refused without buffering it
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.FAIR_VERIFY_MAX_BYTES:
+            raise too_large
+    lines = body.decode(errors="replace").splitlines()
+    
+    if len(lines) > settings.FAIR_VERIFY_MAX_RECORDS:
+        raise too_large
+    
+    def results():
+        stats = {}
+        for mismatch in verify_stream(
+            parse_lines(lines),
+            settings.FAIR_VERIFY_WORKERS,
+            stats=stats,
+            executor=process_pool(settings.FAIR_VERIFY_WORKERS)
+        ):
+            yield json.dumps(mismatch) + "\n"
+        yield json.dumps({"summary": stats}) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
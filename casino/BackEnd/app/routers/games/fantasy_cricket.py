@@ -1,22 +1,39 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import List, Optional
 from pydantic import BaseModel
-from ...database import get_db
-from ...models.user import User
-from ...models.game import Game, GameSession, GameRound, Bet, BetStatus
+from ...database import get_async_db
+from ...models.game import GameSession, BetStatus
 from ...models.wallet import WalletType
 from ...utils.dependencies import get_current_active_user, require_tenant, require_tenant_admin
-from ...services.wallet_service import wallet_service
+from ...utils.user_cache import AuthenticatedUser
+from ...services.wallet_service import async_wallet_service
+from ...services.round_recorder import async_round_recorder
+from ...services.game_catalog import game_catalog
+from ...services.game_state_store import game_state_store
 from ...services.game_engines.fantasy_cricket_engine import (
     FantasyCricketEngine, FantasyPlayer, PlayerRole, MatchStatus
 )
 
 router = APIRouter(prefix="/games/fantasy-cricket", tags=["Fantasy Cricket"])
 
-# Store active matches
-active_matches: Dict[str, FantasyCricketEngine] = {}
+# Matches are kept in the game state store until deleted (they outlive any TTL)
+GAME_NAMESPACE = "fantasy"
+
+async def _load_match(match_id: str) -> FantasyCricketEngine:
+    """Fetch a match from the game state store"""
+    data = await game_state_store.get(GAME_NAMESPACE, match_id)
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Match not found"
+        )
+    return FantasyCricketEngine.from_bytes(data)
+
+async def _save_match(engine: FantasyCricketEngine):
+    await game_state_store.set(GAME_NAMESPACE, engine.match_id, engine.to_bytes(), None)
 
 class CreateMatchInput(BaseModel):
     match_id: str
@@ -53,7 +70,7 @@ class UpdatePlayerStatsInput(BaseModel):
 async def create_match(match_data: CreateMatchInput):
     """Admin: Create a new fantasy cricket match"""
     
-    if match_data.match_id in active_matches:
+    if await game_state_store.get(GAME_NAMESPACE, match_data.match_id) is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Match already exists"
@@ -67,7 +84,7 @@ async def create_match(match_data: CreateMatchInput):
     )
     engine.entry_fee = match_data.entry_fee
     
-    active_matches[match_data.match_id] = engine
+    await _save_match(engine)
     
     return {
         "match_id": match_data.match_id,
@@ -82,13 +99,7 @@ async def create_match(match_data: CreateMatchInput):
 async def add_player_to_match(match_id: str, player_data: AddPlayerInput):
     """Admin: Add a player to the match"""
     
-    if match_id not in active_matches:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    engine = active_matches[match_id]
+    engine = await _load_match(match_id)
     
     player = FantasyPlayer(
         player_id=player_data.player_id,
@@ -99,6 +110,7 @@ async def add_player_to_match(match_id: str, player_data: AddPlayerInput):
     )
     
     engine.add_available_player(player)
+    await _save_match(engine)
     
     return {
         "message": "Player added successfully",
@@ -115,14 +127,9 @@ async def add_player_to_match(match_id: str, player_data: AddPlayerInput):
 async def start_match(match_id: str):
     """Admin: Start the match (lock teams)"""
     
-    if match_id not in active_matches:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    engine = active_matches[match_id]
+    engine = await _load_match(match_id)
     engine.start_match()
+    await _save_match(engine)
     
     return {
         "match_id": match_id,
@@ -135,13 +142,7 @@ async def start_match(match_id: str):
 async def update_player_stats(match_id: str, stats: UpdatePlayerStatsInput):
     """Admin: Update player performance stats"""
     
-    if match_id not in active_matches:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    engine = active_matches[match_id]
+    engine = await _load_match(match_id)
     
     # Find player in available players
     player = next(
@@ -162,6 +163,7 @@ async def update_player_stats(match_id: str, stats: UpdatePlayerStatsInput):
     player.run_outs = stats.run_outs
     player.strike_rate = stats.strike_rate
     player.economy_rate = stats.economy_rate
+    await _save_match(engine)
     
     return {
         "message": "Player stats updated",
@@ -177,17 +179,11 @@ async def update_player_stats(match_id: str, stats: UpdatePlayerStatsInput):
 @router.post("/admin/matches/{match_id}/settle", dependencies=[Depends(require_tenant_admin)])
 async def settle_match(
     match_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Admin: Settle the match and distribute prizes"""
     
-    if match_id not in active_matches:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    engine = active_matches[match_id]
+    engine = await _load_match(match_id)
     
     if engine.status != MatchStatus.LIVE:
         raise HTTPException(
@@ -197,35 +193,30 @@ async def settle_match(
     
     # Settle match
     engine.settle_match()
+    await _save_match(engine)
     
     # Update database and distribute prizes
     for team in engine.teams.values():
         # Find user's session
-        session = db.query(GameSession).filter(
-            GameSession.user_id == team.user_id,
-            GameSession.ended_at == None
-        ).order_by(GameSession.session_id.desc()).first()
+        session = await db.scalar(
+            select(GameSession).filter(
+                GameSession.user_id == team.user_id,
+                GameSession.ended_at == None
+            ).order_by(GameSession.session_id.desc())
+        )
         
         if session:
-            round_obj = db.query(GameRound).filter(
-                GameRound.session_id == session.session_id
-            ).first()
-            
-            bet = db.query(Bet).filter(Bet.round_id == round_obj.round_id).first()
-            
-            # Update bet
-            bet.payout_amount = team.prize_amount
-            bet.bet_status = BetStatus.won if team.prize_amount > 0 else BetStatus.won
-            db.commit()
-            
-            # Credit prize to wallet
-            if team.prize_amount > 0:
-                wallet_service.credit_wallet(db, bet.wallet_id, team.prize_amount)
-            
-            # Close session
-            from datetime import datetime
-            session.ended_at = datetime.utcnow()
-            db.commit()
+            # Update bet, credit prize and close session
+            await async_round_recorder.settle_round(
+                db,
+                session.session_id,
+                team.prize_amount,
+                BetStatus.won if team.prize_amount > 0 else BetStatus.won,
+                commit=False
+            )
+    
+    # Commit all settlements at once
+    await db.commit()
     
     return {
         "match_id": match_id,
@@ -240,7 +231,11 @@ async def get_available_matches():
     """Get all available matches"""
     
     matches = []
-    for match_id, engine in active_matches.items():
+    for match_id in await game_state_store.keys(GAME_NAMESPACE):
+        data = await game_state_store.get(GAME_NAMESPACE, match_id)
+        if data is None:
+            continue
+        engine = FantasyCricketEngine.from_bytes(data)
         matches.append({
             "match_id": match_id,
             "team1": engine.team1,
@@ -258,13 +253,7 @@ async def get_available_matches():
 async def get_match_players(match_id: str):
     """Get available players for a match"""
     
-    if match_id not in active_matches:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    engine = active_matches[match_id]
+    engine = await _load_match(match_id)
     
     players = [
         {
@@ -283,18 +272,12 @@ async def get_match_players(match_id: str):
 async def create_fantasy_team(
     match_id: str,
     team_data: CreateTeamInput,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a fantasy team for a match"""
     
-    if match_id not in active_matches:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    engine = active_matches[match_id]
+    engine = await _load_match(match_id)
     
     if engine.status != MatchStatus.UPCOMING:
         raise HTTPException(
@@ -302,77 +285,69 @@ async def create_fantasy_team(
             detail="Cannot create team after match starts"
         )
     
-    # Get or create fantasy cricket game entry
-    game = db.query(Game).filter(Game.game_name == "Fantasy Cricket").first()
-    if not game:
-        game = Game(game_name="Fantasy Cricket", rtp_percent=Decimal("95.0"))
-        db.add(game)
-        db.commit()
-        db.refresh(game)
+    # Resolve fantasy cricket game entry from the in-process catalog
+    game_id = await game_catalog.get_game_id(db, "Fantasy Cricket")
     
     # Get user's cash wallet
-    wallet = wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
     if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
-    # Debit entry fee
+    # Debit entry fee and open the round in one transaction
     try:
-        wallet_service.debit_wallet(db, wallet.wallet_id, engine.entry_fee)
+        session_id, _ = await async_round_recorder.open_round(
+            db,
+            user_id=current_user.user_id,
+            game_id=game_id,
+            wallet_id=wallet.wallet_id,
+            bet_amount=engine.entry_fee
+        )
     except HTTPException:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Insufficient balance"
         )
     
-    # Create game session
-    session = GameSession(
-        user_id=current_user.user_id,
-        game_id=game.game_id
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    
-    # Create game round
-    round_obj = GameRound(session_id=session.session_id)
-    db.add(round_obj)
-    db.commit()
-    db.refresh(round_obj)
-    
-    # Create bet record
-    bet_record = Bet(
-        round_id=round_obj.round_id,
-        wallet_id=wallet.wallet_id,
-        bet_amount=engine.entry_fee,
-        payout_amount=Decimal("0"),
-        bet_status=BetStatus.placed
-    )
-    db.add(bet_record)
-    db.commit()
-    
-    # Create fantasy team
-    team = engine.create_team(current_user.user_id)
+    team = None
     
-    # Add players to team
-    for player_id in team_data.player_ids:
-        player = next(
-            (p for p in engine.available_players if p.player_id == player_id),
-            None
-        )
-        if player:
-            team.add_player(player)
+    def add_team(data: Optional[bytes]) -> Optional[bytes]:
+        nonlocal engine, team
+        if data is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Match not found"
+            )
+        engine = FantasyCricketEngine.from_bytes(data)
+        
+        # Create fantasy team
+        team = engine.create_team(current_user.user_id)
+        
+        # Add players to team
+        for player_id in team_data.player_ids:
+            player = next(
+                (p for p in engine.available_players if p.player_id == player_id),
+                None
+            )
+            if player:
+                team.add_player(player)
+        
+        # Set captain and vice captain
+        team.set_captain(team_data.captain_id)
+        team.set_vice_captain(team_data.vice_captain_id)
+        
+        # Only valid teams are kept (an invalid one is refunded below)
+        return engine.to_bytes() if engine.validate_team(team) else data
     
-    # Set captain and vice captain
-    team.set_captain(team_data.captain_id)
-    team.set_vice_captain(team_data.vice_captain_id)
+    # Applied atomically so concurrent entries are not lost
+    await game_state_store.update(GAME_NAMESPACE, match_id, add_team, None)
     
     # Validate team
     if not engine.validate_team(team):
         # Refund
-        wallet_service.credit_wallet(db, wallet.wallet_id, engine.entry_fee)
+        await async_wallet_service.credit_wallet(db, wallet.wallet_id, engine.entry_fee)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid team composition"
@@ -381,7 +356,7 @@ async def create_fantasy_team(
     return {
         "team_id": team.team_id,
         "match_id": match_id,
-        "session_id": session.session_id,
+        "session_id": session_id,
         "entry_fee": engine.entry_fee,
         "players_count": len(team.players),
         "captain_id": team.captain_id,
@@ -393,13 +368,7 @@ async def create_fantasy_team(
 async def get_match_leaderboard(match_id: str):
     """Get match leaderboard"""
     
-    if match_id not in active_matches:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Match not found"
-        )
-    
-    engine = active_matches[match_id]
+    engine = await _load_match(match_id)
     
     return {
         "match_id": match_id,
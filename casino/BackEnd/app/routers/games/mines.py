@@ -1,20 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
-from typing import Dict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from pydantic import BaseModel
-from ...database import get_db
-from ...models.user import User
-from ...models.game import Game, GameSession, GameRound, Bet, BetStatus
+from functools import lru_cache
+import json
+from ...database import get_async_db
+from ...models.game import GameSession, BetStatus
 from ...models.wallet import WalletType
 from ...utils.dependencies import get_current_active_user, require_tenant
-from ...services.wallet_service import wallet_service
-from ...services.game_engines.mines_engine import MinesEngine
+from ...utils.user_cache import AuthenticatedUser
+from ...utils.game_state_token import game_state_tokens
+from ...services.wallet_service import async_wallet_service
+from ...services.round_recorder import async_round_recorder
+from ...services.game_catalog import game_catalog
+from ...services.game_state_store import game_state_store
+from ...services.seed_pair_service import seed_pairs
+from ...services.game_engines.mines_engine import MinesEngine, MAX_GRID_SIZE, multiplier_table
+from ...config import settings
 
 router = APIRouter(prefix="/games/mines", tags=["Mines"])
 
-# Store active games in memory
-active_mines_games: Dict[int, MinesEngine] = {}
+# Active boards are kept in the game state store keyed by session, or with
+# GAME_STATE_MODE="token" sealed into a token the client sends back in the
+# X-Game-State header
+GAME_NAMESPACE = "mines"
+
+async def _load_game(
+    session_id: int,
+    db: AsyncSession,
+    state_token: Optional[str],
+    claim: bool = True
+) -> Tuple[MinesEngine, Optional[int], bytes]:
+    """
+    Fetch an active board
+    
+    A claim takes the board out of the store (or, in token mode, advances
+    the round's state version, committed with the action), so concurrent
+    requests cannot both play the same board.
+    Returns: (engine, state version after the claim or None in store mode,
+    the serialized board for _release_game)
+    """
+    if settings.GAME_STATE_MODE == "token":
+        version = await async_round_recorder.get_state_version(db, session_id)
+        data = None
+        if state_token and version is not None:
+            data = game_state_tokens.open(GAME_NAMESPACE, session_id, version, state_token)
+        if data is None or (claim and not await async_round_recorder.advance_state_version(db, session_id, version)):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Game state token is invalid or already used"
+            )
+        return MinesEngine.from_bytes(data), version + 1 if claim else version, data
+    
+    if claim:
+        data = await game_state_store.take(GAME_NAMESPACE, str(session_id))
+    else:
+        data = await game_state_store.get(GAME_NAMESPACE, str(session_id))
+    if data is None:
+        # A board evicted past its TTL is forfeited, so its round does not stay open
+        started_before = datetime.utcnow() - timedelta(seconds=settings.GAME_STATE_TTL_SECONDS)
+        if await async_round_recorder.forfeit_abandoned(db, started_before, session_id=session_id):
+            await db.commit()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Game session expired or not found"
+        )
+    return MinesEngine.from_bytes(data), None, data
+
+async def _save_game(
+    session_id: int,
+    engine: MinesEngine,
+    db: AsyncSession,
+    version: Optional[int]
+) -> Optional[str]:
+    """Store a board in progress; returns its state token in token mode"""
+    if settings.GAME_STATE_MODE == "token":
+        await db.commit()
+        return game_state_tokens.seal(GAME_NAMESPACE, session_id, version, engine.to_bytes())
+    
+    await game_state_store.set(
+        GAME_NAMESPACE, str(session_id), engine.to_bytes(), settings.GAME_STATE_TTL_SECONDS
+    )
+    return None
+
+async def _release_game(session_id: int, data: bytes, db: AsyncSession) -> None:
+    """Undo a failed action and put the claimed board back"""
+    await db.rollback()
+    if settings.GAME_STATE_MODE != "token":
+        await game_state_store.set(GAME_NAMESPACE, str(session_id), data, settings.GAME_STATE_TTL_SECONDS)
 
 class MinesStartInput(BaseModel):
     bet_amount: Decimal
@@ -26,8 +103,8 @@ class MinesRevealInput(BaseModel):
 @router.post("/start")
 async def start_mines_game(
     game_data: MinesStartInput,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Start a new mines game"""
     
@@ -38,86 +115,78 @@ async def start_mines_game(
             detail="Number of mines must be between 1 and 24"
         )
     
-    # Get or create mines game entry
-    game = db.query(Game).filter(Game.game_name == "Mines").first()
-    if not game:
-        game = Game(game_name="Mines", rtp_percent=Decimal("98.0"))
-        db.add(game)
-        db.commit()
-        db.refresh(game)
+    # Resolve mines game entry from the in-process catalog
+    game_id = await game_catalog.get_game_id(db, "Mines")
     
     # Get user's cash wallet
-    wallet = wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
     if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wallet not found"
         )
     
-    # Debit bet amount
+    # Board comes from the next nonce of the player's committed seed pair
+    seed = await seed_pairs.draw(db, current_user.user_id)
+    
+    # Debit bet amount and open the round in one transaction
     try:
-        wallet_service.debit_wallet(db, wallet.wallet_id, game_data.bet_amount)
-    except HTTPException:
+        session_id, bet_id = await async_round_recorder.open_round(
+            db,
+            user_id=current_user.user_id,
+            game_id=game_id,
+            wallet_id=wallet.wallet_id,
+            bet_amount=game_data.bet_amount,
+            seed_pair_id=seed["seed_pair_id"],
+            nonce=seed["nonce"]
+        )
+    except HTTPException as e:
+        if e.status_code != status.HTTP_400_BAD_REQUEST:
+            raise
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Insufficient balance"
         )
     
-    # Create game session
-    session = GameSession(
-        user_id=current_user.user_id,
-        game_id=game.game_id
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    
-    # Create game round
-    round_obj = GameRound(session_id=session.session_id)
-    db.add(round_obj)
-    db.commit()
-    db.refresh(round_obj)
-    
-    # Create bet record (payout updated on cashout)
-    bet_record = Bet(
-        round_id=round_obj.round_id,
-        wallet_id=wallet.wallet_id,
-        bet_amount=game_data.bet_amount,
-        payout_amount=Decimal("0"),
-        bet_status=BetStatus.placed
-    )
-    db.add(bet_record)
-    db.commit()
-    db.refresh(bet_record)
-    
     # Initialize mines engine
     engine = MinesEngine(grid_size=25, num_mines=game_data.num_mines)
-    game_state = engine.start_game()
+    game_state = engine.start_game(mine_positions=MinesEngine.place_mines(
+        seed["server_seed"], seed["client_seed"], seed["nonce"], engine.grid_size, engine.num_mines
+    ))
     
-    # Store in memory
-    active_mines_games[session.session_id] = engine
+    # Store until the game is settled
+    state_token = await _save_game(session_id, engine, db, 0)
     
     return {
-        "session_id": session.session_id,
-        "bet_id": bet_record.bet_id,
+        "session_id": session_id,
+        "bet_id": bet_id,
         "bet_amount": game_data.bet_amount,
-        "game_state": game_state
+        "game_state": game_state,
+        "state_token": state_token,
+        "multipliers": [float(multiplier) for multiplier in multiplier_table(engine.grid_size)[engine.num_mines]],
+        "seed_pair_id": seed["seed_pair_id"],
+        "server_seed_hash": seed["server_seed_hash"],
+        "client_seed": seed["client_seed"],
+        "nonce": seed["nonce"]
     }
 
 @router.post("/{session_id}/reveal")
 async def reveal_tile(
     session_id: int,
     reveal_data: MinesRevealInput,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db),
+    state_token: Optional[str] = Header(None, alias="X-Game-State")
 ):
     """Reveal a tile"""
     
     # Verify session belongs to user
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id,
-        GameSession.user_id == current_user.user_id
-    ).first()
+    session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.session_id == session_id,
+            GameSession.user_id == current_user.user_id
+        )
+    )
     
     if not session:
         raise HTTPException(
@@ -125,28 +194,30 @@ async def reveal_tile(
             detail="Session not found"
         )
     
-    # Get game engine
-    if session_id not in active_mines_games:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game session expired or not found"
-        )
-    
-    engine = active_mines_games[session_id]
+    # Claim the board
+    engine, version, data = await _load_game(session_id, db, state_token)
     
     try:
         result = engine.reveal_tile(reveal_data.position)
         
         # If game over (hit mine or won), settle
+        state_token = None
         if result["game_over"]:
             await _settle_mines_game(session_id, engine, db)
+        else:
+            state_token = await _save_game(session_id, engine, db, version)
         
         return {
             "session_id": session_id,
-            "result": result
+            "result": result,
+            "state_token": state_token
         }
     
+    except HTTPException:
+        await _release_game(session_id, data, db)
+        raise
     except Exception as e:
+        await _release_game(session_id, data, db)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
@@ -155,16 +226,19 @@ async def reveal_tile(
 @router.post("/{session_id}/cashout")
 async def cashout_mines(
     session_id: int,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db),
+    state_token: Optional[str] = Header(None, alias="X-Game-State")
 ):
     """Cash out current game"""
     
     # Verify session belongs to user
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id,
-        GameSession.user_id == current_user.user_id
-    ).first()
+    session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.session_id == session_id,
+            GameSession.user_id == current_user.user_id
+        )
+    )
     
     if not session:
         raise HTTPException(
@@ -172,14 +246,8 @@ async def cashout_mines(
             detail="Session not found"
         )
     
-    # Get game engine
-    if session_id not in active_mines_games:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game session expired or not found"
-        )
-    
-    engine = active_mines_games[session_id]
+    # Claim the board
+    engine, _, data = await _load_game(session_id, db, state_token)
     
     try:
         result = engine.cash_out()
@@ -190,25 +258,63 @@ async def cashout_mines(
             "result": result
         }
     
+    except HTTPException:
+        await _release_game(session_id, data, db)
+        raise
     except Exception as e:
+        await _release_game(session_id, data, db)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
+@lru_cache(maxsize=None)
+def _multiplier_table(grid_size: int) -> bytes:
+    """A grid's multiplier table, serialized once"""
+    return json.dumps({
+        "grid_size": grid_size,
+        "multipliers": [
+            [float(multiplier) for multiplier in row]
+            for row in multiplier_table(grid_size)
+        ]
+    }, separators=(",", ":")).encode()
+
+@router.get("/multipliers")
+async def get_multiplier_table(grid_size: int = 25):
+    """
+    Multiplier for every mine count and number of safe tiles revealed
+    
+    multipliers[num_mines][revealed]; the table never changes, so the client
+    can show next-tile payouts without asking again.
+    """
+    if grid_size < 2 or grid_size > MAX_GRID_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Grid size must be between 2 and {MAX_GRID_SIZE}"
+        )
+    
+    return Response(
+        content=_multiplier_table(grid_size),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=86400"}
+    )
+
 @router.get("/{session_id}/state")
 async def get_game_state(
     session_id: int,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db),
+    state_token: Optional[str] = Header(None, alias="X-Game-State")
 ):
     """Get current game state"""
     
     # Verify session belongs to user
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id,
-        GameSession.user_id == current_user.user_id
-    ).first()
+    session = await db.scalar(
+        select(GameSession).filter(
+            GameSession.session_id == session_id,
+            GameSession.user_id == current_user.user_id
+        )
+    )
     
     if not session:
         raise HTTPException(
@@ -217,49 +323,27 @@ async def get_game_state(
         )
     
     # Get game engine
-    if session_id not in active_mines_games:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Game session expired or not found"
-        )
-    
-    engine = active_mines_games[session_id]
+    engine, _, _ = await _load_game(session_id, db, state_token, claim=False)
     
     return {
         "session_id": session_id,
         "game_state": engine.get_game_state(hide_mines=not engine.game_over)
     }
 
-async def _settle_mines_game(session_id: int, engine: MinesEngine, db: Session):
+async def _settle_mines_game(session_id: int, engine: MinesEngine, db: AsyncSession):
     """Settle mines game and update wallet"""
     
     # Get bet
-    round_obj = db.query(GameRound).filter(
-        GameRound.session_id == session_id
-    ).first()
-    
-    bet = db.query(Bet).filter(Bet.round_id == round_obj.round_id).first()
+    bet = await async_round_recorder.get_round_bet(db, session_id)
     
     # Calculate payout
     payout = engine.calculate_payout(bet.bet_amount)
     
-    # Update bet
-    bet.payout_amount = payout
-    bet.bet_status = BetStatus.won if engine.game_won else BetStatus.lost
-    db.commit()
-    
-    # Credit payout to wallet
-    if payout > 0:
-        wallet_service.credit_wallet(db, bet.wallet_id, payout)
-    
-    # Close session
-    from datetime import datetime
-    session = db.query(GameSession).filter(
-        GameSession.session_id == session_id
-    ).first()
-    session.ended_at = datetime.utcnow()
-    db.commit()
-    
-    # Remove from active games
-    if session_id in active_mines_games:
-        del active_mines_games[session_id]
\ No newline at end of file
+    # Update bet, credit payout and close session in one transaction (the
+    # board was already taken out of the store when it was claimed)
+    await async_round_recorder.settle_round(
+        db,
+        session_id,
+        payout,
+        BetStatus.won if engine.game_won else BetStatus.lost
+    )
\ No newline at end of file
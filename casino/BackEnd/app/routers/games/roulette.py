@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-from ...database import get_db
-from ...models.user import User
-from ...models.game import Game, GameSession, GameRound, Bet, BetStatus
+from ...database import get_async_db
 from ...models.wallet import WalletType
-from ...utils.dependencies import get_current_active_user, require_tenant
-from ...services.wallet_service import wallet_service
+from ...utils.dependencies import get_current_active_user, require_tenant, require_tenant_admin
+from ...utils.user_cache import AuthenticatedUser
+from ...utils.money import to_decimal
+from ...services.wallet_service import async_wallet_service
+from ...services.round_recorder import async_round_recorder
+from ...services.game_catalog import game_catalog
+from ...services.roulette_table_service import roulette_tables
 from ...services.game_engines.roulette_engine import RouletteEngine
+from ...config import settings
 
 router = APIRouter(prefix="/games/roulette", tags=["Roulette"])
 
@@ -24,8 +28,8 @@ class RouletteSpinInput(BaseModel):
 @router.post("/spin")
 async def spin_roulette(
     spin_data: RouletteSpinInput,
-    current_user: User = Depends(require_tenant),
-    db: Session = Depends(get_db)
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Place bets and spin the roulette wheel"""
     
@@ -36,16 +40,11 @@ async def spin_roulette(
             detail="At least one bet is required"
         )
     
-    # Get or create roulette game entry
-    game = db.query(Game).filter(Game.game_name == "Roulette").first()
-    if not game:
-        game = Game(game_name="Roulette", rtp_percent=Decimal("97.3"))
-        db.add(game)
-        db.commit()
-        db.refresh(game)
+    # Resolve roulette game entry from the in-process catalog
+    game_id = await game_catalog.get_game_id(db, "Roulette")
     
     # Get user's cash wallet
-    wallet = wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
     if not wallet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -55,30 +54,6 @@ async def spin_roulette(
     # Calculate total bet amount
     total_bet_amount = sum(bet.bet_amount for bet in spin_data.bets)
     
-    # Debit total bet amount
-    try:
-        wallet_service.debit_wallet(db, wallet.wallet_id, total_bet_amount)
-    except HTTPException:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient balance"
-        )
-    
-    # Create game session
-    session = GameSession(
-        user_id=current_user.user_id,
-        game_id=game.game_id
-    )
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    
-    # Create game round
-    round_obj = GameRound(session_id=session.session_id)
-    db.add(round_obj)
-    db.commit()
-    db.refresh(round_obj)
-    
     # Initialize roulette engine and play
     engine = RouletteEngine()
     bets_data = [
@@ -90,34 +65,33 @@ async def spin_roulette(
         for bet in spin_data.bets
     ]
     
-    result = engine.play_round(bets_data)
+    try:
+        result = engine.play_round(bets_data, settings.roulette_limits)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    # Create bet records for each bet
-    bet_records = []
-    for bet_data, bet_result in zip(spin_data.bets, result["bet_results"]):
-        bet_record = Bet(
-            round_id=round_obj.round_id,
+    # Debit, record every bet and settle the round in one transaction
+    try:
+        session_id, _, _ = await async_round_recorder.record_round(
+            db,
+            user_id=current_user.user_id,
+            game_id=game_id,
             wallet_id=wallet.wallet_id,
-            bet_amount=bet_data.bet_amount,
-            payout_amount=bet_result["payout"],
-            bet_status=BetStatus.won if bet_result["won"] else BetStatus.lost
+            bets=result["bet_results"],
+            compact=settings.ROULETTE_SLIP_STORAGE == "compact",
+            stream_seed=engine.seed
+        )
+    except HTTPException:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Insufficient balance"
         )
-        db.add(bet_record)
-        bet_records.append(bet_record)
-    
-    db.commit()
-    
-    # Credit total payout to wallet if any wins
-    if result["total_payout"] > 0:
-        wallet_service.credit_wallet(db, wallet.wallet_id, result["total_payout"])
-    
-    # Close session
-    from datetime import datetime
-    session.ended_at = datetime.utcnow()
-    db.commit()
     
     return {
-        "session_id": session.session_id,
+        "session_id": session_id,
         "winning_number": result["winning_number"],
         "color": result["color"],
         "bet_results": result["bet_results"],
@@ -145,4 +119,136 @@ async def get_table_info():
             "column": {"description": "Column of 12 numbers", "payout": "2:1"},
             "even_money": {"description": "Red/Black, Even/Odd, Low/High", "payout": "1:1"}
         }
-    }
\ No newline at end of file
+    }
+
+# ============= SHARED TABLES =============
+
+def _table_state(table) -> Dict:
+    last = table.last_result
+    return {
+        "table_id": table.table_id,
+        "round_number": table.round_number,
+        "closes_at": table.closes_at,
+        "slips_count": len(table.slips),
+        "last_round": {
+            "round_number": last["round_number"],
+            "winning_number": last["winning_number"],
+            "color": last["color"]
+        } if last else None
+    }
+
+@router.get("/rounds/{session_id}")
+async def get_round_slip(
+    session_id: int,
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the per-bet detail of one of your roulette rounds"""
+    bets = await async_round_recorder.get_slip(db, session_id, current_user.user_id)
+    
+    if bets is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Round not found"
+        )
+    
+    return {"session_id": session_id, "bets": bets}
+
+@router.get("/tables")
+async def list_tables():
+    """List shared-wheel tables and their open rounds"""
+    return {
+        "betting_window_seconds": roulette_tables.window_seconds,
+        "tables": [
+            _table_state(await roulette_tables.get_table(table_id))
+            for table_id in roulette_tables.table_ids
+        ]
+    }
+
+@router.get("/tables/{table_id}")
+async def get_table(table_id: str):
+    """Get a table's open round and last result"""
+    return _table_state(await roulette_tables.get_table(table_id))
+
+@router.post("/tables/{table_id}/bets")
+async def place_table_bets(
+    table_id: str,
+    spin_data: RouletteSpinInput,
+    current_user: AuthenticatedUser = Depends(require_tenant),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Place a slip on the table's open round; it is settled when the shared wheel spins"""
+    
+    if not spin_data.bets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one bet is required"
+        )
+    
+    wallet = await async_wallet_service.get_wallet(db, current_user.user_id, WalletType.cash)
+    if not wallet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wallet not found"
+        )
+    
+    return await roulette_tables.place_slip(
+        db,
+        table_id,
+        current_user.user_id,
+        wallet.wallet_id,
+        [
+            {
+                "bet_type": bet.bet_type,
+                "bet_value": bet.bet_value,
+                "bet_amount": bet.bet_amount
+            }
+            for bet in spin_data.bets
+        ]
+    )
+
+@router.get("/tables/{table_id}/liability", dependencies=[Depends(require_tenant_admin)])
+async def get_table_liability(table_id: str):
+    """Admin: House exposure of the open round for every winning number"""
+    table = await roulette_tables.get_table(table_id)
+    exposure = table.exposure
+    max_number_liability, max_table_liability = settings.roulette_limits
+    
+    return {
+        "table_id": table_id,
+        "round_number": table.round_number,
+        "total_staked": to_decimal(exposure.staked),
+        "payout_by_number": [to_decimal(payout) for payout in exposure.per_number()],
+        "max_payout": to_decimal(exposure.max_payout()),
+        "max_net_loss": to_decimal(exposure.max_net_loss()),
+        "max_number_liability": to_decimal(max_number_liability),
+        "max_table_liability": to_decimal(max_table_liability)
+    }
+
+@router.get("/tables/{table_id}/results")
+async def get_table_results(
+    table_id: str,
+    current_user: AuthenticatedUser = Depends(require_tenant)
+):
+    """Get your slips' results from the table's last spin"""
+    table = await roulette_tables.get_table(table_id)
+    last = table.last_result
+    
+    if not last:
+        return {"table_id": table_id, "round_number": None, "slips": []}
+    
+    return {
+        "table_id": table_id,
+        "round_number": last["round_number"],
+        "winning_number": last["winning_number"],
+        "color": last["color"],
+        "slips": [
+            {
+                "session_id": settlement["session_id"],
+                "bet_results": settlement["bet_results"],
+                "total_payout": settlement["total_payout"]
+            }
+            for settlement in last["settlements"]
+            if settlement["user_id"] == current_user.user_id
+        ]
+    }
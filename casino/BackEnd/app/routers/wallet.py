@@ -2,17 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
-from ..models.user import User
 from ..models.wallet import WalletType
 from ..schemas.wallet import WalletResponse, WalletDeposit, WalletWithdraw
 from ..utils.dependencies import get_current_active_user
+from ..utils.user_cache import AuthenticatedUser
 from ..services.wallet_service import wallet_service
 
 router = APIRouter(prefix="/wallet", tags=["Wallet"])
 
 @router.get("/", response_model=List[WalletResponse])
 async def get_user_wallets(
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get all wallets for the current user"""
@@ -22,7 +22,7 @@ async def get_user_wallets(
 @router.get("/{wallet_type}", response_model=WalletResponse)
 async def get_wallet_by_type(
     wallet_type: WalletType,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get a specific wallet by type"""
@@ -37,7 +37,7 @@ async def get_wallet_by_type(
 @router.post("/deposit", response_model=WalletResponse)
 async def deposit_to_wallet(
     deposit_data: WalletDeposit,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Deposit money to cash wallet"""
@@ -62,7 +62,7 @@ async def deposit_to_wallet(
 @router.post("/withdraw", response_model=WalletResponse)
 async def withdraw_from_wallet(
     withdraw_data: WalletWithdraw,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthenticatedUser = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Withdraw money from cash wallet"""
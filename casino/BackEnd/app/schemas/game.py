@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from decimal import Decimal
 from typing import Optional, Any, Dict
 from datetime import datetime
@@ -44,4 +44,15 @@ class GameProviderResponse(BaseModel):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class GameResponse(BaseModel):
+    game_id: int
+    game_name: str
+    rtp_percent: Optional[Decimal]
+
+    class Config:
+        from_attributes = True
+
+class GameRtpUpdate(BaseModel):
+    rtp_percent: Decimal = Field(..., gt=0, le=100, description="Return to player percentage (0-100)")
\ No newline at end of file
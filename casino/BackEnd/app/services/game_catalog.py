@@ -0,0 +1,64 @@
+import asyncio
+from decimal import Decimal
+from typing import Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.game import Game
+
+class GameCatalog:
+    """In-process cache of Game rows so game routers resolve game_id without a query"""
+
+    # Games served by the game routers and their advertised RTP
+    DEFAULT_GAMES = {
+        "Blackjack": Decimal("99.2"),
+        "Roulette": Decimal("97.3"),
+        "Dice": Decimal("99.0"),
+        "Mines": Decimal("98.0"),
+        "Slots": Decimal("96.0"),
+        "Crash": Decimal("99.0"),
+        "Fantasy Cricket": Decimal("95.0"),
+    }
+
+    def __init__(self):
+        self._game_ids: Dict[str, int] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def load(self, db: AsyncSession) -> None:
+        """Load all games, creating any missing default games (idempotent)"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            result = await db.execute(select(Game).order_by(Game.game_id))
+            games = list(result.scalars().all())
+
+            existing = {game.game_name for game in games}
+            missing = [
+                Game(game_name=name, rtp_percent=rtp)
+                for name, rtp in self.DEFAULT_GAMES.items()
+                if name not in existing
+            ]
+            if missing:
+                db.add_all(missing)
+                await db.commit()
+                games.extend(missing)
+
+            # Lowest game_id wins if concurrent workers created duplicates
+            game_ids: Dict[str, int] = {}
+            for game in games:
+                game_ids.setdefault(game.game_name, game.game_id)
+            self._game_ids = game_ids
+
+    def invalidate(self) -> None:
+        """Drop cached games; the next lookup reloads them"""
+        self._game_ids = {}
+
+    async def get_game_id(self, db: AsyncSession, game_name: str) -> int:
+        """Get game_id for a game name (loads the catalog only on a miss)"""
+        game_id = self._game_ids.get(game_name)
+        if game_id is None:
+            await self.load(db)
+            game_id = self._game_ids[game_name]
+        return game_id
+
+game_catalog = GameCatalog()
@@ -1,82 +1,157 @@
-import random
-from typing import List, Tuple
+import struct
+from typing import List, Optional
 from decimal import Decimal
+from app.utils.money import to_cents, to_decimal, multiply, scale
+from app.services.game_engines.rng import EngineRandom, new_seed
 
-class Card:
-    def __init__(self, suit: str, rank: str):
-        self.suit = suit
-        self.rank = rank
+SUITS = ['♠', '♥', '♦', '♣']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+
+# Cards are ints 0-51 (rank index * 4 + suit index); value and label are table lookups
+CARD_VALUES = bytes(
+    11 if rank == 'A' else 10 if rank in ('J', 'Q', 'K') else int(rank)
+    for rank in RANKS for _ in SUITS
+)
+CARD_LABELS = tuple(f"{rank}{suit}" for rank in RANKS for suit in SUITS)
+
+RESULTS = (None, "blackjack", "win", "push", "lose", "bust")
+
+class Shoe:
+    """Multi-deck shoe of int-encoded cards, reshuffled once the cut card is reached"""
     
-    def value(self) -> int:
-        """Get card value for blackjack"""
-        if self.rank in ['J', 'Q', 'K']:
-            return 10
-        elif self.rank == 'A':
-            return 11  # Ace can be 1 or 11
+    # Card count, position, cut card, shuffles, seed
+    HEADER = struct.Struct("<HHHIQ")
+    
+    def __init__(self, num_decks: int = 6, penetration: float = 0.75, seed: Optional[int] = None):
+        """
+        num_decks: Number of 52-card decks in the shoe
+        penetration: Fraction of the shoe dealt before reshuffling (0-1]
+        seed: Stored seed to replay a shoe (random when omitted)
+        """
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration must be between 0 and 1")
+        
+        self.cards = bytearray(range(52)) * num_decks
+        self.cut_card = int(len(self.cards) * penetration)
+        self.position = len(self.cards)  # Shuffled before the first round
+        self.shuffles = 0
+        self.seed = new_seed() if seed is None else seed
+    
+    def shuffle(self):
+        """Shuffle all cards back into the shoe"""
+        # Each shuffle gets its own stream derived from the seed, so a
+        # serialized shoe continues exactly as it would have in memory
+        EngineRandom(self.seed + (self.shuffles << 64)).shuffle(self.cards)
+        self.position = 0
+        self.shuffles += 1
+    
+    def needs_shuffle(self) -> bool:
+        """Check whether the cut card has been reached"""
+        return self.position >= self.cut_card
+    
+    def draw(self) -> int:
+        """Deal the next card"""
+        if self.position >= len(self.cards):
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+    
+    def to_bytes(self) -> bytes:
+        """Serialize for the game state store (header + one byte per card)"""
+        return self.HEADER.pack(
+            len(self.cards), self.position, self.cut_card, self.shuffles, self.seed
+        ) + self.cards
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Shoe":
+        num_cards, position, cut_card, shuffles, seed = cls.HEADER.unpack_from(data)
+        shoe = cls.__new__(cls)
+        shoe.cards = bytearray(data[cls.HEADER.size:cls.HEADER.size + num_cards])
+        shoe.position = position
+        shoe.cut_card = cut_card
+        shoe.shuffles = shuffles
+        shoe.seed = seed
+        return shoe
+
+class Hand:
+    """Blackjack hand keeping running totals, so adding a card and reading the value are O(1)"""
+    
+    __slots__ = ("cards", "hard_total", "aces")
+    
+    def __init__(self):
+        self.cards: List[int] = []
+        self.hard_total = 0  # Every ace counted as 1
+        self.aces = 0
+    
+    def add(self, card: int):
+        """Add a card and update the totals"""
+        self.cards.append(card)
+        card_value = CARD_VALUES[card]
+        if card_value == 11:
+            self.aces += 1
+            self.hard_total += 1
         else:
-            return int(self.rank)
+            self.hard_total += card_value
     
-    def __repr__(self):
-        return f"{self.rank}{self.suit}"
+    @property
+    def is_soft(self) -> bool:
+        """True when an ace is counted as 11"""
+        return self.aces > 0 and self.hard_total + 10 <= 21
+    
+    @property
+    def value(self) -> int:
+        """Best total, counting one ace as 11 when that does not bust"""
+        if self.aces > 0 and self.hard_total + 10 <= 21:
+            return self.hard_total + 10
+        return self.hard_total
+    
+    def __len__(self) -> int:
+        return len(self.cards)
+    
+    def __iter__(self):
+        return iter(self.cards)
 
 class BlackjackEngine:
     """Server-authoritative Blackjack engine"""
     
-    SUITS = ['♠', '♥', '♦', '♣']
-    RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+    SUITS = SUITS
+    RANKS = RANKS
     
-    def __init__(self, seed: int = None):
-        if seed:
-            random.seed(seed)
-        self.deck: List[Card] = []
-        self.player_hand: List[Card] = []
-        self.dealer_hand: List[Card] = []
+    def __init__(self, seed: int = None, shoe: Optional[Shoe] = None):
+        self.shoe = shoe or Shoe(seed=seed)
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
         self.game_over = False
         self.result = None
     
-    def create_deck(self, num_decks: int = 6) -> List[Card]:
-        """Create a shuffled deck"""
-        deck = []
-        for _ in range(num_decks):
-            for suit in self.SUITS:
-                for rank in self.RANKS:
-                    deck.append(Card(suit, rank))
-        random.shuffle(deck)
-        return deck
-    
-    def calculate_hand_value(self, hand: List[Card]) -> int:
-        """Calculate the value of a hand, handling aces"""
-        value = sum(card.value() for card in hand)
-        num_aces = sum(1 for card in hand if card.rank == 'A')
-        
-        # Adjust for aces
-        while value > 21 and num_aces > 0:
-            value -= 10
-            num_aces -= 1
-        
-        return value
+    def calculate_hand_value(self, hand: List[int]) -> int:
+        """Calculate the value of a list of cards, handling aces"""
+        totals = Hand()
+        for card in hand:
+            totals.add(card)
+        return totals.value
     
     def start_game(self) -> dict:
         """Start a new blackjack game"""
-        self.deck = self.create_deck()
-        self.player_hand = []
-        self.dealer_hand = []
+        if self.shoe.needs_shuffle():
+            self.shoe.shuffle()
+        
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
         self.game_over = False
         self.result = None
         
         # Deal initial cards
-        self.player_hand.append(self.deck.pop())
-        self.dealer_hand.append(self.deck.pop())
-        self.player_hand.append(self.deck.pop())
-        self.dealer_hand.append(self.deck.pop())
-        
-        player_value = self.calculate_hand_value(self.player_hand)
+        self.player_hand.add(self.shoe.draw())
+        self.dealer_hand.add(self.shoe.draw())
+        self.player_hand.add(self.shoe.draw())
+        self.dealer_hand.add(self.shoe.draw())
         
         # Check for natural blackjack
-        if player_value == 21:
+        if self.player_hand.value == 21:
             self.game_over = True
-            dealer_value = self.calculate_hand_value(self.dealer_hand)
-            if dealer_value == 21:
+            if self.dealer_hand.value == 21:
                 self.result = "push"
             else:
                 self.result = "blackjack"
@@ -88,10 +163,9 @@ class BlackjackEngine:
         if self.game_over:
             raise Exception("Game is already over")
         
-        self.player_hand.append(self.deck.pop())
-        player_value = self.calculate_hand_value(self.player_hand)
+        self.player_hand.add(self.shoe.draw())
         
-        if player_value > 21:
+        if self.player_hand.value > 21:
             self.game_over = True
             self.result = "bust"
         
@@ -103,12 +177,11 @@ class BlackjackEngine:
             raise Exception("Game is already over")
         
         # Dealer plays (hits until 17 or higher)
-        dealer_value = self.calculate_hand_value(self.dealer_hand)
-        while dealer_value < 17:
-            self.dealer_hand.append(self.deck.pop())
-            dealer_value = self.calculate_hand_value(self.dealer_hand)
+        while self.dealer_hand.value < 17:
+            self.dealer_hand.add(self.shoe.draw())
         
-        player_value = self.calculate_hand_value(self.player_hand)
+        dealer_value = self.dealer_hand.value
+        player_value = self.player_hand.value
         
         # Determine winner
         if dealer_value > 21:
@@ -129,10 +202,9 @@ class BlackjackEngine:
             raise Exception("Cannot double down")
         
         # Hit once
-        self.player_hand.append(self.deck.pop())
-        player_value = self.calculate_hand_value(self.player_hand)
+        self.player_hand.add(self.shoe.draw())
         
-        if player_value > 21:
+        if self.player_hand.value > 21:
             self.game_over = True
             self.result = "bust"
             return self.get_game_state(hide_dealer_card=False)
@@ -142,26 +214,59 @@ class BlackjackEngine:
     
     def get_game_state(self, hide_dealer_card: bool = False) -> dict:
         """Get current game state"""
-        dealer_hand_display = self.dealer_hand.copy()
+        dealer_hand_display = self.dealer_hand.cards
         if hide_dealer_card and len(dealer_hand_display) > 1:
-            dealer_hand_display = [dealer_hand_display[0]]
+            dealer_hand_display = dealer_hand_display[:1]
         
         return {
-            "player_hand": [str(card) for card in self.player_hand],
-            "player_value": self.calculate_hand_value(self.player_hand),
-            "dealer_hand": [str(card) for card in dealer_hand_display],
-            "dealer_value": self.calculate_hand_value(dealer_hand_display) if not hide_dealer_card else None,
+            "player_hand": [CARD_LABELS[card] for card in self.player_hand],
+            "player_value": self.player_hand.value,
+            "player_soft": self.player_hand.is_soft,
+            "dealer_hand": [CARD_LABELS[card] for card in dealer_hand_display],
+            "dealer_value": self.dealer_hand.value if not hide_dealer_card else None,
+            "dealer_soft": self.dealer_hand.is_soft if not hide_dealer_card else None,
             "game_over": self.game_over,
             "result": self.result
         }
     
+    def to_bytes(self) -> bytes:
+        """Serialize for the game state store: result, flags, both hands, then the shoe"""
+        return bytes((
+            RESULTS.index(self.result),
+            int(self.game_over),
+            len(self.player_hand),
+            len(self.dealer_hand),
+        )) + bytes(self.player_hand.cards) + bytes(self.dealer_hand.cards) + self.shoe.to_bytes()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BlackjackEngine":
+        result, game_over, player_count, dealer_count = data[:4]
+        engine = cls.__new__(cls)
+        engine.result = RESULTS[result]
+        engine.game_over = bool(game_over)
+        
+        offset = 4
+        engine.player_hand = Hand()
+        for card in data[offset:offset + player_count]:
+            engine.player_hand.add(card)
+        offset += player_count
+        
+        engine.dealer_hand = Hand()
+        for card in data[offset:offset + dealer_count]:
+            engine.dealer_hand.add(card)
+        offset += dealer_count
+        
+        engine.shoe = Shoe.from_bytes(data[offset:])
+        return engine
+    
     def calculate_payout(self, bet_amount: Decimal) -> Decimal:
         """Calculate payout based on result"""
+        stake = to_cents(bet_amount)
         if self.result == "blackjack":
-            return bet_amount * Decimal("2.5")  # 3:2 payout
+            return to_decimal(scale(stake, 5, 2))  # 3:2 payout
         elif self.result == "win":
-            return bet_amount * Decimal("2")  # 1:1 payout
+            return to_decimal(multiply(stake, 2))  # 1:1 payout
         elif self.result == "push":
-            return bet_amount  # Return original bet
+            return to_decimal(stake)  # Return original bet
         else:  # bust or lose
             return Decimal("0")
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+Blackjack expected value, basic strategy and RTP simulation
+
+Rules follow BlackjackEngine: dealer stands on all 17s, blackjack pays 3:2,
+double on any first two cards, no splits, no surrender and no dealer peek
+(a dealer two-card 21 only pushes a player 21). A player natural is settled
+immediately and pushes against a dealer natural.
+
+The exact calculation assumes an infinite deck; the Monte Carlo mode plays
+the engine itself from a finite shoe.
+
+Run from casino/BackEnd:
+    python -m app.services.game_engines.blackjack_strategy [--hands N] [--workers N]
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Tuple
+from app.services.game_engines.blackjack_engine import BlackjackEngine, Shoe, CARD_VALUES
+
+# Card values (ace = 11) and their infinite-deck probabilities
+CARD_PROBABILITIES = tuple((value, (4 if value == 10 else 1) / 13) for value in range(2, 12))
+UPCARD_LABELS = {value: "A" if value == 11 else str(value) for value in range(2, 12)}
+DEALER_TOTALS = (17, 18, 19, 20, 21)
+
+# Net return per initial unit bet for each engine result
+RESULT_RETURNS = {"blackjack": 1.5, "win": 1.0, "push": 0.0, "lose": -1.0, "bust": -1.0}
+
+
+def _add_card(hard: int, has_ace: bool, card: int) -> Tuple[int, bool]:
+    """Add a card to a (hard total with aces as 1, has ace) state"""
+    if card == 11:
+        return hard + 1, True
+    return hard + card, has_ace
+
+
+def _hand_value(hard: int, has_ace: bool) -> int:
+    return hard + 10 if has_ace and hard + 10 <= 21 else hard
+
+
+@lru_cache(maxsize=None)
+def _dealer_outcomes(hard: int, has_ace: bool) -> Tuple[float, ...]:
+    """Probabilities of the dealer finishing on 17, 18, 19, 20, 21 and bust"""
+    value = _hand_value(hard, has_ace)
+    if value > 21:
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+    if value >= 17:
+        return tuple(1.0 if value == total else 0.0 for total in DEALER_TOTALS) + (0.0,)
+
+    outcomes = [0.0] * 6
+    for card, probability in CARD_PROBABILITIES:
+        for index, outcome in enumerate(_dealer_outcomes(*_add_card(hard, has_ace, card))):
+            outcomes[index] += probability * outcome
+    return tuple(outcomes)
+
+
+def dealer_distribution(upcard: int) -> Dict[str, float]:
+    """Final dealer total probabilities for an upcard value (2-11, ace = 11)"""
+    outcomes = _dealer_outcomes(*_add_card(0, False, upcard))
+    distribution = {str(total): outcomes[index] for index, total in enumerate(DEALER_TOTALS)}
+    distribution["bust"] = outcomes[5]
+    return distribution
+
+
+@lru_cache(maxsize=None)
+def _stand_ev(player_value: int, upcard: int) -> float:
+    outcomes = _dealer_outcomes(*_add_card(0, False, upcard))
+    ev = outcomes[5]
+    for index, dealer_value in enumerate(DEALER_TOTALS):
+        if player_value > dealer_value:
+            ev += outcomes[index]
+        elif player_value < dealer_value:
+            ev -= outcomes[index]
+    return ev
+
+
+@lru_cache(maxsize=None)
+def _hit_ev(hard: int, has_ace: bool, upcard: int) -> float:
+    """EV of hitting once and then playing optimally (hit or stand)"""
+    ev = 0.0
+    for card, probability in CARD_PROBABILITIES:
+        next_hard, next_ace = _add_card(hard, has_ace, card)
+        value = _hand_value(next_hard, next_ace)
+        if value > 21:
+            ev -= probability
+        else:
+            ev += probability * max(_stand_ev(value, upcard), _hit_ev(next_hard, next_ace, upcard))
+    return ev
+
+
+def _double_ev(hard: int, has_ace: bool, upcard: int) -> float:
+    ev = 0.0
+    for card, probability in CARD_PROBABILITIES:
+        value = _hand_value(*_add_card(hard, has_ace, card))
+        ev += probability * (-1.0 if value > 21 else _stand_ev(value, upcard))
+    return 2 * ev
+
+
+def action_evs(hard: int, has_ace: bool, upcard: int, can_double: bool = True) -> Dict[str, float]:
+    """EV of each action (S = stand, H = hit, D = double) per initial unit bet"""
+    evs = {
+        "S": _stand_ev(_hand_value(hard, has_ace), upcard),
+        "H": _hit_ev(hard, has_ace, upcard),
+    }
+    if can_double:
+        evs["D"] = _double_ev(hard, has_ace, upcard)
+    return evs
+
+
+def best_action(hard: int, has_ace: bool, upcard: int, can_double: bool = True) -> str:
+    evs = action_evs(hard, has_ace, upcard, can_double)
+    return max(evs, key=evs.get)
+
+
+def basic_strategy() -> Dict[str, Dict[int, Dict[str, str]]]:
+    """
+    Basic strategy for the first decision of a hand
+
+    Returns: {"hard": {total: {upcard: action}}, "soft": {total: {upcard: action}}}
+    """
+    return {
+        "hard": {
+            total: {UPCARD_LABELS[up]: best_action(total, False, up) for up in UPCARD_LABELS}
+            for total in range(5, 21)
+        },
+        "soft": {
+            total: {UPCARD_LABELS[up]: best_action(total - 10, True, up) for up in UPCARD_LABELS}
+            for total in range(13, 21)
+        },
+    }
+
+
+def strategy_table() -> Dict[Tuple[int, bool, bool, int], str]:
+    """Action for every (hand value, is soft, can double, upcard) reachable in play"""
+    table = {}
+    for up in UPCARD_LABELS:
+        for can_double in (True, False):
+            for value in range(4, 22):
+                table[(value, False, can_double, up)] = best_action(value, False, up, can_double)
+            for value in range(12, 22):
+                table[(value, True, can_double, up)] = best_action(value - 10, True, up, can_double)
+    return table
+
+
+def exact_expected_return() -> float:
+    """Expected net return per initial unit bet under basic strategy"""
+    ev = 0.0
+    for up, up_probability in CARD_PROBABILITIES:
+        # Chance the hole card completes a dealer natural
+        dealer_natural = {11: 4 / 13, 10: 1 / 13}.get(up, 0.0)
+        for first, first_probability in CARD_PROBABILITIES:
+            for second, second_probability in CARD_PROBABILITIES:
+                probability = up_probability * first_probability * second_probability
+                hard, has_ace = _add_card(*_add_card(0, False, first), second)
+                if _hand_value(hard, has_ace) == 21:
+                    ev += probability * 1.5 * (1 - dealer_natural)
+                else:
+                    ev += probability * max(action_evs(hard, has_ace, up).values())
+    return ev
+
+
+def _simulate_hands(args: Tuple[int, int, int, float]) -> Tuple[int, float, float]:
+    """Play hands through BlackjackEngine with basic strategy; returns (hands, sum, sum of squares)"""
+    hands, seed, num_decks, penetration = args
+    strategy = strategy_table()
+    shoe = Shoe(num_decks, penetration, seed=seed)
+
+    total = 0.0
+    total_squares = 0.0
+    for _ in range(hands):
+        engine = BlackjackEngine(shoe=shoe)
+        engine.start_game()
+        stake = 1
+
+        if not engine.game_over:
+            upcard = CARD_VALUES[engine.dealer_hand.cards[0]]
+            while not engine.game_over:
+                hand = engine.player_hand
+                action = strategy[(hand.value, hand.is_soft, len(hand) == 2, upcard)]
+                if action == "D":
+                    stake = 2
+                    engine.double_down()
+                elif action == "H":
+                    engine.hit()
+                else:
+                    engine.stand()
+
+        outcome = RESULT_RETURNS[engine.result] * stake
+        total += outcome
+        total_squares += outcome * outcome
+
+    return hands, total, total_squares
+
+
+def simulate(
+    hands: int,
+    workers: int = 0,
+    num_decks: int = 6,
+    penetration: float = 0.75,
+    seed: int = None
+) -> Dict[str, float]:
+    """
+    Monte Carlo RTP across worker processes
+
+    Returns: dict with hands, rtp, std_error and the 95% confidence interval
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = random.Random(seed).sample(range(2 ** 62), workers)
+    chunks = [
+        (hands // workers + (1 if index < hands % workers else 0), seeds[index], num_decks, penetration)
+        for index in range(workers)
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_simulate_hands, chunks))
+
+    played = sum(result[0] for result in results)
+    total = sum(result[1] for result in results)
+    total_squares = sum(result[2] for result in results)
+
+    mean = total / played
+    variance = max(0.0, total_squares / played - mean * mean)
+    std_error = math.sqrt(variance / played)
+    return {
+        "hands": played,
+        "rtp": 1 + mean,
+        "std_error": std_error,
+        "ci95_low": 1 + mean - 1.96 * std_error,
+        "ci95_high": 1 + mean + 1.96 * std_error,
+    }
+
+
+def _print_strategy(strategy: Dict[str, Dict[int, Dict[str, str]]]):
+    header = " ".join(f"{label:>2}" for label in UPCARD_LABELS.values())
+    for kind in ("hard", "soft"):
+        print(f"\n{kind:<6} {header}")
+        for total, actions in strategy[kind].items():
+            print(f"{total:<6} " + " ".join(f"{action:>2}" for action in actions.values()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blackjack RTP under the engine's rules")
+    parser.add_argument("--hands", type=int, default=1_000_000, help="Monte Carlo hands (0 to skip)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count)")
+    parser.add_argument("--decks", type=int, default=6)
+    parser.add_argument("--penetration", type=float, default=0.75)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    _print_strategy(basic_strategy())
+    print(f"\nExact RTP (infinite deck, basic strategy): {100 * (1 + exact_expected_return()):.3f}%")
+
+    if args.hands > 0:
+        start = time.perf_counter()
+        result = simulate(args.hands, args.workers, args.decks, args.penetration, args.seed)
+        elapsed = time.perf_counter() - start
+        print(
+            f"Simulated RTP ({result['hands']} hands, {args.decks} decks): {100 * result['rtp']:.3f}% "
+            f"(95% CI {100 * result['ci95_low']:.3f}% - {100 * result['ci95_high']:.3f}%) "
+            f"in {elapsed:.1f}s, {result['hands'] / elapsed:,.0f} hands/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
+import json
 import random
-import hashlib
 from decimal import Decimal
 from typing import Dict, List, Optional
+from app.utils.money import to_cents, to_decimal, multiply
+from app.services.game_engines.provably_fair import hash_server_seed, words
 
 class CrashEngine:
     """Server-authoritative Crash game engine with provably fair mechanism"""
@@ -9,24 +11,19 @@ class CrashEngine:
     def __init__(self):
         self.house_edge = Decimal("0.01")  # 1% house edge
     
-    def generate_crash_point(self, server_seed: str) -> Decimal:
+    def generate_crash_point(self, server_seed: str, client_seed: str, nonce: int) -> Decimal:
         """
         Generate crash point using provably fair algorithm
         
         The crash point follows an exponential distribution
         Returns a multiplier between 1.00 and theoretically infinite (capped at 10000x)
         """
-        # Hash the server seed
-        hash_result = hashlib.sha256(server_seed.encode()).hexdigest()
+        # Top 52 bits of the first two words of the seed pair's stream
+        high, low = words(server_seed, client_seed, nonce, 2)
+        seed_value = (high << 32 | low) >> 12
         
-        # Take first 13 hex characters (52 bits)
-        hex_substring = hash_result[:13]
-        
-        # Convert to integer
-        seed_value = int(hex_substring, 16)
-        
-        # Maximum value for 13 hex chars
-        max_value = 16 ** 13
+        # Maximum value for 52 bits
+        max_value = 2 ** 52
         
         # Calculate crash point
         # Using: crash_point = 99 / (1 - random_value) * (1 - house_edge)
@@ -51,28 +48,40 @@ class CrashEngine:
     
     def hash_crash_point(self, server_seed: str) -> str:
         """Generate a hash to share before the game starts"""
-        return hashlib.sha256(server_seed.encode()).hexdigest()
+        return hash_server_seed(server_seed)
     
     def verify_crash_point(
         self,
         server_seed: str,
+        client_seed: str,
+        nonce: int,
         claimed_crash_point: Decimal,
         tolerance: Decimal = Decimal("0.01")
     ) -> bool:
-        """Verify that a crash point matches the server seed"""
-        actual_crash_point = self.generate_crash_point(server_seed)
+        """Verify that a crash point matches the seed pair and nonce"""
+        actual_crash_point = self.generate_crash_point(server_seed, client_seed, nonce)
         return abs(actual_crash_point - claimed_crash_point) <= tolerance
 
 
 class CrashGame:
     """Manages a single crash game round with multiple players"""
     
-    def __init__(self, game_id: str, server_seed: str):
+    def __init__(self, game_id: str, seed: Dict):
+        """
+        game_id: Round identifier
+        seed: draw from the house seed pair (seed_pair_id, server_seed,
+        server_seed_hash, client_seed, nonce); the server seed is only
+        revealed when that pair is rotated
+        """
         self.game_id = game_id
-        self.server_seed = server_seed
+        self.seed_pair_id = seed["seed_pair_id"]
+        self.client_seed = seed["client_seed"]
+        self.nonce = seed["nonce"]
         self.crash_engine = CrashEngine()
-        self.crash_point = self.crash_engine.generate_crash_point(server_seed)
-        self.server_seed_hash = self.crash_engine.hash_crash_point(server_seed)
+        self.crash_point = self.crash_engine.generate_crash_point(
+            seed["server_seed"], seed["client_seed"], seed["nonce"]
+        )
+        self.server_seed_hash = seed["server_seed_hash"]
         
         self.players: Dict[int, Dict] = {}  # user_id -> player_data
         self.current_multiplier = Decimal("1.00")
@@ -139,7 +148,9 @@ class CrashGame:
         
         player_data["cashed_out"] = True
         player_data["cashout_multiplier"] = self.current_multiplier
-        player_data["payout"] = player_data["bet_amount"] * self.current_multiplier
+        player_data["payout"] = to_decimal(
+            multiply(to_cents(player_data["bet_amount"]), self.current_multiplier)
+        )
         
         return {
             "user_id": user_id,
@@ -171,8 +182,10 @@ class CrashGame:
         return {
             "game_id": self.game_id,
             "crash_point": float(self.crash_point),
-            "server_seed": self.server_seed,
+            "seed_pair_id": self.seed_pair_id,
             "server_seed_hash": self.server_seed_hash,
+            "client_seed": self.client_seed,
+            "nonce": self.nonce,
             "player_results": results
         }
     
@@ -186,4 +199,60 @@ class CrashGame:
             "crash_point": float(self.crash_point) if self.game_crashed else None,
             "players_count": len(self.players),
             "active_players": sum(1 for p in self.players.values() if not p["cashed_out"])
-        }
\ No newline at end of file
+        }
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialize for the game state store as JSON
+        
+        Amounts are stored in cents and multipliers as decimal strings; each
+        player is [user_id, bet_cents, auto_cashout, cashout_multiplier,
+        payout_cents], cashed out once cashout_multiplier is set.
+        """
+        return json.dumps({
+            "game_id": self.game_id,
+            "seed_pair_id": self.seed_pair_id,
+            "client_seed": self.client_seed,
+            "nonce": self.nonce,
+            "crash_point": str(self.crash_point),
+            "server_seed_hash": self.server_seed_hash,
+            "multiplier": str(self.current_multiplier),
+            "started": self.game_started,
+            "crashed": self.game_crashed,
+            "players": [
+                [
+                    user_id,
+                    to_cents(player_data["bet_amount"]),
+                    None if player_data["auto_cashout"] is None else str(player_data["auto_cashout"]),
+                    None if player_data["cashout_multiplier"] is None else str(player_data["cashout_multiplier"]),
+                    to_cents(player_data["payout"])
+                ]
+                for user_id, player_data in self.players.items()
+            ]
+        }, separators=(",", ":")).encode()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CrashGame":
+        state = json.loads(data)
+        game = cls.__new__(cls)
+        game.game_id = state["game_id"]
+        game.seed_pair_id = state["seed_pair_id"]
+        game.client_seed = state["client_seed"]
+        game.nonce = state["nonce"]
+        game.crash_engine = CrashEngine()
+        game.crash_point = Decimal(state["crash_point"])
+        game.server_seed_hash = state["server_seed_hash"]
+        game.current_multiplier = Decimal(state["multiplier"])
+        game.game_started = state["started"]
+        game.game_crashed = state["crashed"]
+        game.players = {
+            user_id: {
+                "bet_amount": to_decimal(bet_cents),
+                "auto_cashout": None if auto_cashout is None else Decimal(auto_cashout),
+                "cashed_out": cashout_multiplier is not None,
+                "cashout_multiplier": None if cashout_multiplier is None else Decimal(cashout_multiplier),
+                "payout": to_decimal(payout_cents)
+            }
+            for user_id, bet_cents, auto_cashout, cashout_multiplier, payout_cents in state["players"]
+        }
+        return game
@@ -1,7 +1,39 @@
 import hashlib
-import secrets
 from decimal import Decimal
-from typing import Tuple
+from typing import Dict, Optional, Tuple
+from app.utils.money import to_cents, to_decimal, multiply
+from app.services.game_engines.provably_fair import hash_server_seed, words
+
+HOUSE_EDGE = Decimal("0.01")
+TARGET_STEPS = 10000  # Valid targets 0.00-99.99 at 0.01 precision
+
+# Roll derivations: "hmac-sha256" reads the seed pair's HMAC stream,
+# "sha256" is the original hash of "server:client:nonce" that rounds played
+# before seed pairs were rolled with
+ROLL_ALGORITHMS = ("hmac-sha256", "sha256")
+
+def _multiplier(win_steps: int) -> Decimal:
+    """Multiplier for a win chance of win_steps / TARGET_STEPS"""
+    if win_steps <= 0 or win_steps >= TARGET_STEPS:
+        return Decimal("0")
+    return ((1 - HOUSE_EDGE) * TARGET_STEPS / win_steps).quantize(Decimal("0.0001"))
+
+# Read-only tables indexed by target step (target * 100), keyed by roll_over
+WIN_CHANCES: Dict[bool, Tuple[float, ...]] = {
+    True: tuple((TARGET_STEPS - step) / 100 for step in range(TARGET_STEPS)),
+    False: tuple(step / 100 for step in range(TARGET_STEPS)),
+}
+MULTIPLIERS: Dict[bool, Tuple[Decimal, ...]] = {
+    True: tuple(_multiplier(TARGET_STEPS - step) for step in range(TARGET_STEPS)),
+    False: tuple(_multiplier(step) for step in range(TARGET_STEPS)),
+}
+
+def target_step(target: float) -> Optional[int]:
+    """Table index of a target, or None if it is off the 0.01 grid or out of range"""
+    step = round(target * 100)
+    if 0 <= step < TARGET_STEPS and abs(target * 100 - step) < 1e-6:
+        return step
+    return None
 
 class DiceEngine:
     """Provably fair dice game engine"""
@@ -9,38 +41,31 @@ class DiceEngine:
     def __init__(self):
         pass
     
-    def generate_server_seed(self) -> str:
-        """Generate a random server seed"""
-        return secrets.token_hex(32)
-    
     def hash_server_seed(self, server_seed: str) -> str:
         """Hash the server seed to share with client before game"""
-        return hashlib.sha256(server_seed.encode()).hexdigest()
+        return hash_server_seed(server_seed)
     
     def roll_dice(
         self,
         server_seed: str,
         client_seed: str,
-        nonce: int
+        nonce: int,
+        algorithm: str = "hmac-sha256"
     ) -> float:
         """
         Roll dice using provably fair algorithm
         Returns a number between 0.00 and 99.99
-        """
-        # Combine seeds and nonce
-        combined = f"{server_seed}:{client_seed}:{nonce}"
         
-        # Generate hash
-        hash_result = hashlib.sha256(combined.encode()).hexdigest()
-        
-        # Take first 8 characters and convert to decimal
-        hex_substring = hash_result[:8]
-        decimal_value = int(hex_substring, 16)
-        
-        # Convert to range 0-9999
-        result = (decimal_value % 10000) / 100
-        
-        return round(result, 2)
+        algorithm: one of ROLL_ALGORITHMS; new rounds always use "hmac-sha256"
+        """
+        if algorithm == "hmac-sha256":
+            # Scale the first 32-bit word of the seed pair's stream to 0-9999
+            return (words(server_seed, client_seed, nonce, 1)[0] * 10000 >> 32) / 100
+        if algorithm == "sha256":
+            # First 8 hex digits of the combined hash, reduced to 0-9999
+            hash_result = hashlib.sha256(f"{server_seed}:{client_seed}:{nonce}".encode()).hexdigest()
+            return round((int(hash_result[:8], 16) % 10000) / 100, 2)
+        raise ValueError(f"Unknown roll algorithm {algorithm!r}, expected one of {', '.join(ROLL_ALGORITHMS)}")
     
     def calculate_multiplier(self, target: float, roll_over: bool = True) -> Decimal:
         """
@@ -49,6 +74,11 @@ class DiceEngine:
         target: The target number (0-99.99)
         roll_over: True if betting roll will be over target, False if under
         """
+        step = target_step(target)
+        if step is not None:
+            return MULTIPLIERS[roll_over][step]
+        
+        # Targets off the 0.01 grid
         if roll_over:
             win_chance = (100 - target) / 100
         else:
@@ -57,12 +87,17 @@ class DiceEngine:
         if win_chance <= 0 or win_chance >= 1:
             return Decimal("0")
         
-        # House edge: 1%
-        house_edge = Decimal("0.01")
-        multiplier = (Decimal("1") - house_edge) / Decimal(str(win_chance))
+        multiplier = (Decimal("1") - HOUSE_EDGE) / Decimal(str(win_chance))
         
         return multiplier.quantize(Decimal("0.0001"))
     
+    def win_chance(self, target: float, roll_over: bool = True) -> float:
+        """Win chance in percent"""
+        step = target_step(target)
+        if step is not None:
+            return WIN_CHANCES[roll_over][step]
+        return 100 - target if roll_over else target
+    
     def check_win(
         self,
         roll_result: float,
@@ -80,19 +115,16 @@ class DiceEngine:
         bet_amount: Decimal,
         target: float,
         roll_over: bool,
+        server_seed: str,
         client_seed: str,
         nonce: int
     ) -> dict:
         """
-        Play a round of dice
+        Play a round of dice with a draw from the player's seed pair
         
         Returns:
-            dict with server_seed, server_seed_hash, roll_result, won, payout, multiplier
+            dict with client_seed, nonce, roll_result, won, payout, multiplier
         """
-        # Generate server seed
-        server_seed = self.generate_server_seed()
-        server_seed_hash = self.hash_server_seed(server_seed)
-        
         # Roll dice
         roll_result = self.roll_dice(server_seed, client_seed, nonce)
         
@@ -102,14 +134,12 @@ class DiceEngine:
         # Calculate payout
         if won:
             multiplier = self.calculate_multiplier(target, roll_over)
-            payout = bet_amount * multiplier
+            payout = to_decimal(multiply(to_cents(bet_amount), multiplier))
         else:
             multiplier = Decimal("0")
             payout = Decimal("0")
         
         return {
-            "server_seed": server_seed,
-            "server_seed_hash": server_seed_hash,
             "client_seed": client_seed,
             "nonce": nonce,
             "roll_result": roll_result,
@@ -121,13 +151,91 @@ class DiceEngine:
             "bet_amount": bet_amount
         }
     
+    def play_autobet(
+        self,
+        bet_amount: Decimal,
+        target: float,
+        roll_over: bool,
+        server_seed: str,
+        client_seed: str,
+        first_nonce: int,
+        rolls: int,
+        balance: Decimal,
+        on_win: Optional[Decimal] = None,
+        on_loss: Optional[Decimal] = None,
+        stop_profit: Optional[Decimal] = None,
+        stop_loss: Optional[Decimal] = None
+    ) -> dict:
+        """
+        Play up to rolls consecutive rounds on nonces first_nonce, first_nonce + 1, ...
+        
+        on_win / on_loss: multiply the stake by this after a win / loss
+        (None resets it to bet_amount, so both None is a fixed bet)
+        stop_profit / stop_loss: stop once the net profit reaches stop_profit,
+        or before a roll that could take the net loss past stop_loss
+        balance: stop before a stake the running balance cannot cover
+        
+        Returns:
+            dict with results (nonce, roll_result, won, bet_amount, payout per roll),
+            multiplier, total_bet, total_payout, profit, stop_reason
+        """
+        multiplier = self.calculate_multiplier(target, roll_over)
+        base_cents = to_cents(bet_amount)
+        stake = base_cents
+        balance_cents = to_cents(balance)
+        stop_profit_cents = to_cents(stop_profit) if stop_profit is not None else None
+        stop_loss_cents = to_cents(stop_loss) if stop_loss is not None else None
+        
+        results = []
+        total_bet = total_payout = 0
+        stop_reason = "completed"
+        for nonce in range(first_nonce, first_nonce + rolls):
+            profit = total_payout - total_bet
+            if stop_profit_cents is not None and profit >= stop_profit_cents:
+                stop_reason = "stop_profit"
+                break
+            if stop_loss_cents is not None and profit - stake < -stop_loss_cents:
+                stop_reason = "stop_loss"
+                break
+            if stake < 1 or stake > balance_cents:
+                stop_reason = "insufficient_balance"
+                break
+            
+            roll_result = self.roll_dice(server_seed, client_seed, nonce)
+            won = self.check_win(roll_result, target, roll_over)
+            payout = multiply(stake, multiplier) if won else 0
+            
+            total_bet += stake
+            total_payout += payout
+            balance_cents += payout - stake
+            results.append({
+                "nonce": nonce,
+                "roll_result": roll_result,
+                "won": won,
+                "bet_amount": to_decimal(stake),
+                "payout": to_decimal(payout)
+            })
+            
+            factor = on_win if won else on_loss
+            stake = base_cents if factor is None else multiply(stake, factor)
+        
+        return {
+            "results": results,
+            "multiplier": float(multiplier),
+            "total_bet": to_decimal(total_bet),
+            "total_payout": to_decimal(total_payout),
+            "profit": to_decimal(total_payout - total_bet),
+            "stop_reason": stop_reason
+        }
+    
     def verify_roll(
         self,
         server_seed: str,
         client_seed: str,
         nonce: int,
-        claimed_result: float
+        claimed_result: float,
+        algorithm: str = "hmac-sha256"
     ) -> bool:
         """Verify that a roll result is correct"""
-        actual_result = self.roll_dice(server_seed, client_seed, nonce)
+        actual_result = self.roll_dice(server_seed, client_seed, nonce, algorithm)
         return abs(actual_result - claimed_result) < 0.01
\ No newline at end of file
@@ -1,5 +1,8 @@
+import pickle
 from typing import Dict, List, Optional
 from decimal import Decimal
+from fractions import Fraction
+from app.utils.money import to_cents, to_decimal, multiply
 from datetime import datetime
 from enum import Enum
 
@@ -247,11 +250,12 @@ class FantasyCricketEngine:
         for prize_rule in self.prize_distribution:
             rank_from = prize_rule["rank_from"]
             rank_to = prize_rule["rank_to"]
-            percentage = Decimal(str(prize_rule["percentage"])) / Decimal("100")
+            percentage = Fraction(prize_rule["percentage"], 100)
             
-            prize_for_range = self.prize_pool * percentage
+            # Shares round down to the cent; leftover cents stay with the house
+            prize_for_range = multiply(to_cents(self.prize_pool), percentage)
             num_winners = rank_to - rank_from + 1
-            prize_per_winner = prize_for_range / Decimal(str(num_winners))
+            prize_per_winner = to_decimal(prize_for_range // num_winners)
             
             for team in sorted_teams:
                 if rank_from <= team.rank <= rank_to:
@@ -274,4 +278,12 @@ class FantasyCricketEngine:
                 "prize_amount": float(team.prize_amount)
             }
             for idx, team in enumerate(sorted_teams)
-        ]
\ No newline at end of file
+        ]
+    
+    def to_bytes(self) -> bytes:
+        """Serialize for the game state store (teams keep sharing the pool's player objects)"""
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FantasyCricketEngine":
+        return pickle.loads(data)
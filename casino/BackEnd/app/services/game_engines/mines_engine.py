@@ -1,10 +1,40 @@
-import random
-from typing import List, Set
+import struct
+from functools import lru_cache
+from typing import Iterable, List, Set, Tuple
 from decimal import Decimal
+from app.utils.money import to_cents, to_decimal, multiply
+from app.services.game_engines.rng import EngineRandom
+from app.services.game_engines.provably_fair import words
+
+HOUSE_EDGE = Decimal("0.98")  # Applied on every safe reveal
+MAX_GRID_SIZE = 64
+
+@lru_cache(maxsize=None)
+def multiplier_table(grid_size: int) -> Tuple[Tuple[Decimal, ...], ...]:
+    """
+    Multipliers for a grid, built once and shared read-only by every game
+    
+    Returns: table[num_mines][revealed safe tiles] for 0 <= num_mines < grid_size
+    """
+    table = []
+    for num_mines in range(grid_size):
+        # Each safe reveal multiplies by tiles left / safe tiles left, less the house edge
+        multiplier = Decimal("1.0")
+        row = [multiplier]
+        for revealed in range(grid_size - num_mines):
+            multiplier *= (Decimal(grid_size - revealed) / Decimal(grid_size - num_mines - revealed)) * HOUSE_EDGE
+            row.append(multiplier.quantize(Decimal("0.01")))
+        table.append(tuple(row))
+    return tuple(table)
+
+multiplier_table(25)  # Default grid
 
 class MinesEngine:
     """Server-authoritative Mines game engine"""
     
+    # Grid size, mine count, flags, multiplier in hundredths, seed
+    HEADER = struct.Struct("<BBBIQ")
+    
     def __init__(self, grid_size: int = 25, num_mines: int = 5):
         """
         Initialize mines game
@@ -19,11 +49,28 @@ class MinesEngine:
         self.game_over = False
         self.game_won = False
         self.multiplier = Decimal("1.0")
+        self.seed = None
+    
+    @staticmethod
+    def place_mines(server_seed: str, client_seed: str, nonce: int, grid_size: int, num_mines: int) -> List[int]:
+        """Provably fair mine positions: a Fisher-Yates shuffle driven by the seed pair's stream"""
+        tiles = list(range(grid_size))
+        for index, word in enumerate(words(server_seed, client_seed, nonce, num_mines)):
+            pick = index + (word * (grid_size - index) >> 32)
+            tiles[index], tiles[pick] = tiles[pick], tiles[index]
+        return tiles[:num_mines]
     
-    def start_game(self, seed: int = None) -> dict:
-        """Start a new game and place mines randomly"""
-        if seed:
-            random.seed(seed)
+    def start_game(self, seed: int = None, mine_positions: Iterable[int] = None) -> dict:
+        """
+        Start a new game
+        
+        seed: stored seed to replay a randomly placed board
+        mine_positions: place the mines here instead (see place_mines)
+        """
+        if mine_positions is None:
+            rng = EngineRandom(seed)
+            self.seed = rng.stream_seed
+            mine_positions = rng.sample(range(self.grid_size), self.num_mines)
         
         # Reset game state
         self.revealed_positions = set()
@@ -31,8 +78,7 @@ class MinesEngine:
         self.game_won = False
         self.multiplier = Decimal("1.0")
         
-        # Place mines randomly
-        self.mine_positions = set(random.sample(range(self.grid_size), self.num_mines))
+        self.mine_positions = set(mine_positions)
         
         return {
             "grid_size": self.grid_size,
@@ -43,33 +89,8 @@ class MinesEngine:
         }
     
     def calculate_multiplier(self) -> Decimal:
-        """Calculate current multiplier based on revealed tiles"""
-        num_revealed = len(self.revealed_positions)
-        if num_revealed == 0:
-            return Decimal("1.0")
-        
-        # Calculate based on probability
-        # Each safe tile revealed increases multiplier
-        safe_tiles_remaining = self.grid_size - self.num_mines - num_revealed
-        total_tiles_remaining = self.grid_size - num_revealed
-        
-        if total_tiles_remaining <= 0:
-            return Decimal("1.0")
-        
-        # House edge: 2%
-        house_edge = Decimal("0.98")
-        
-        # Multiplier increases with each safe reveal
-        base_multiplier = Decimal(str(self.grid_size - self.num_mines)) / Decimal(str(self.grid_size))
-        
-        multiplier = Decimal("1.0")
-        for i in range(num_revealed):
-            tiles_left = self.grid_size - i
-            safe_left = self.grid_size - self.num_mines - i
-            if safe_left > 0 and tiles_left > 0:
-                multiplier *= (Decimal(str(tiles_left)) / Decimal(str(safe_left))) * house_edge
-        
-        return multiplier.quantize(Decimal("0.01"))
+        """Calculate current multiplier based on revealed tiles (table lookup)"""
+        return multiplier_table(self.grid_size)[self.num_mines][len(self.revealed_positions)]
     
     def reveal_tile(self, position: int) -> dict:
         """
@@ -146,7 +167,37 @@ class MinesEngine:
         if not self.game_won:
             return Decimal("0")
         
-        return bet_amount * self.multiplier
+        return to_decimal(multiply(to_cents(bet_amount), self.multiplier))
+    
+    def to_bytes(self) -> bytes:
+        """Serialize for the game state store: header, then mine and revealed bitmaps"""
+        mask_size = (self.grid_size + 7) // 8
+        mines = sum(1 << position for position in self.mine_positions)
+        revealed = sum(1 << position for position in self.revealed_positions)
+        return self.HEADER.pack(
+            self.grid_size,
+            self.num_mines,
+            int(self.game_over) | int(self.game_won) << 1,
+            to_cents(self.multiplier),
+            self.seed or 0
+        ) + mines.to_bytes(mask_size, "little") + revealed.to_bytes(mask_size, "little")
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MinesEngine":
+        grid_size, num_mines, flags, multiplier, seed = cls.HEADER.unpack_from(data)
+        mask_size = (grid_size + 7) // 8
+        offset = cls.HEADER.size
+        mines = int.from_bytes(data[offset:offset + mask_size], "little")
+        revealed = int.from_bytes(data[offset + mask_size:offset + 2 * mask_size], "little")
+        
+        engine = cls(grid_size, num_mines)
+        engine.mine_positions = {position for position in range(grid_size) if mines >> position & 1}
+        engine.revealed_positions = {position for position in range(grid_size) if revealed >> position & 1}
+        engine.game_over = bool(flags & 1)
+        engine.game_won = bool(flags & 2)
+        engine.multiplier = to_decimal(multiplier)
+        engine.seed = seed
+        return engine
     
     def get_game_state(self, hide_mines: bool = True) -> dict:
         """Get current game state"""
@@ -0,0 +1,31 @@
+import hashlib
+import hmac
+import secrets
+import struct
+from typing import List
+
+def generate_server_seed() -> str:
+    """Random server seed (kept secret until the seed pair is rotated)"""
+    return secrets.token_hex(32)
+
+def generate_client_seed() -> str:
+    return secrets.token_hex(8)
+
+def hash_server_seed(server_seed: str) -> str:
+    """Commitment shown to the player before any round uses the seed"""
+    return hashlib.sha256(server_seed.encode()).hexdigest()
+
+def words(server_seed: str, client_seed: str, nonce: int, count: int) -> List[int]:
+    """
+    First count 32-bit words of a round's HMAC-SHA256 stream
+
+    Block i of the stream is HMAC-SHA256(server_seed, "client_seed:nonce:i"),
+    read as big-endian words, so one round costs one HMAC per eight words.
+    Dice, mines and crash all derive their outcomes from this stream.
+    """
+    key = server_seed.encode()
+    stream = b"".join(
+        hmac.new(key, f"{client_seed}:{nonce}:{block}".encode(), hashlib.sha256).digest()
+        for block in range((count + 7) // 8)
+    )
+    return list(struct.unpack_from(f">{count}I", stream))
@@ -0,0 +1,20 @@
+import random
+import secrets
+from typing import Optional
+
+def new_seed() -> int:
+    """63-bit seed from the OS CSPRNG (fits GameRound.stream_seed, a signed BIGINT)"""
+    return secrets.randbits(63)
+
+
+class EngineRandom(random.Random):
+    """
+    Independent Mersenne Twister stream owned by one engine instance
+
+    Seeded from the OS CSPRNG unless a stored seed is given for replay, so
+    seeding one game never touches the module-level RNG other games use.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.stream_seed = new_seed() if seed is None else seed
+        super().__init__(self.stream_seed)
@@ -1,6 +1,181 @@
-import random
-from typing import List, Dict
+import json
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 from decimal import Decimal
+from app.utils.money import to_cents, to_decimal, multiply
+from app.services.game_engines.rng import EngineRandom
+
+RED_NUMBERS = [1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36]
+BLACK_NUMBERS = [2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35]
+
+NO_PAYOUT = Decimal("0")
+
+def number_mask(numbers: Iterable[int]) -> int:
+    """37-bit mask with bit n set for each number n covered"""
+    mask = 0
+    for number in numbers:
+        mask |= 1 << number
+    return mask
+
+# Bets that take no value
+OUTSIDE_BET_MASKS: Dict[str, int] = {
+    "red": number_mask(RED_NUMBERS),
+    "black": number_mask(BLACK_NUMBERS),
+    "even": number_mask(range(2, 37, 2)),
+    "odd": number_mask(range(1, 37, 2)),
+    "low": number_mask(range(1, 19)),
+    "high": number_mask(range(19, 37)),
+    "dozen1": number_mask(range(1, 13)),
+    "dozen2": number_mask(range(13, 25)),
+    "dozen3": number_mask(range(25, 37)),
+    "column1": number_mask(range(1, 37, 3)),
+    "column2": number_mask(range(2, 37, 3)),
+    "column3": number_mask(range(3, 37, 3)),
+}
+
+def _inside_bet_table() -> Dict[str, Dict[FrozenSet[int], int]]:
+    """
+    Every legal split, street, corner and line on the single-zero layout
+
+    Rows are (1, 2, 3), (4, 5, 6) ... (34, 35, 36). Zero splits with 1, 2
+    and 3, and also forms the 0-1-2 / 0-2-3 streets and the 0-1-2-3 corner.
+    """
+    splits = [(0, 1), (0, 2), (0, 3)]
+    streets = [(0, 1, 2), (0, 2, 3)]
+    corners = [(0, 1, 2, 3)]
+    lines = []
+    for number in range(1, 37):
+        column = (number - 1) % 3
+        if column < 2:
+            splits.append((number, number + 1))
+        if number <= 33:
+            splits.append((number, number + 3))
+        if column == 0:
+            streets.append((number, number + 1, number + 2))
+            if number <= 31:
+                lines.append(tuple(range(number, number + 6)))
+        if column < 2 and number <= 32:
+            corners.append((number, number + 1, number + 3, number + 4))
+
+    return {
+        bet_type: {frozenset(numbers): number_mask(numbers) for numbers in groups}
+        for bet_type, groups in (
+            ("split", splits), ("street", streets), ("corner", corners), ("line", lines)
+        )
+    }
+
+INSIDE_BET_MASKS = _inside_bet_table()
+
+# Net payout per unit staked ("to one")
+PAYOUTS: Dict[str, int] = {
+    "straight": 35,  # Single number: 35:1
+    "split": 17,     # Two numbers: 17:1
+    "street": 11,    # Three numbers: 11:1
+    "corner": 8,     # Four numbers: 8:1
+    "line": 5,       # Six numbers: 5:1
+    **{bet_type: 2 for bet_type in ("dozen1", "dozen2", "dozen3", "column1", "column2", "column3")},
+    **{bet_type: 1 for bet_type in ("red", "black", "even", "odd", "low", "high")},
+}
+
+def compile_bet(bet_type: str, bet_value: Any = None) -> int:
+    """
+    Validate a bet and compile it to the mask of numbers it covers
+
+    bet_value: the number for straight bets, the list of numbers for
+    split/street/corner/line; ignored for outside bets
+    Raises ValueError for unknown bet types, bad numbers or numbers that
+    do not form a legal group on the layout.
+    """
+    mask = OUTSIDE_BET_MASKS.get(bet_type)
+    if mask is not None:
+        return mask
+
+    if bet_type == "straight":
+        try:
+            number = int(bet_value)
+        except (TypeError, ValueError):
+            raise ValueError("Straight bet needs a number")
+        if not 0 <= number <= 36:
+            raise ValueError("Number must be between 0 and 36")
+        return 1 << number
+
+    table = INSIDE_BET_MASKS.get(bet_type)
+    if table is None:
+        raise ValueError(f"Unknown bet type: {bet_type}")
+
+    try:
+        if not isinstance(bet_value, (list, tuple)):
+            raise TypeError
+        numbers = frozenset(map(int, bet_value))
+    except (TypeError, ValueError):
+        raise ValueError(f"{bet_type.capitalize()} bet needs a list of numbers")
+
+    mask = table.get(numbers)
+    if mask is None or len(numbers) != len(bet_value):  # Repeated numbers are not a group
+        raise ValueError(f"Numbers {list(bet_value)} are not a valid {bet_type}")
+    return mask
+
+# Exposure keeps the 37 per-number totals in 64-bit lanes of one int, so
+# adding a bet to every number it covers is a single multiply-add
+LANE_BITS = 64
+LANE_MASK = (1 << LANE_BITS) - 1
+
+@lru_cache(maxsize=None)
+def _lanes(mask: int) -> int:
+    """Spread a 37-bit number mask to a 1 in the low bit of each covered lane"""
+    return sum(1 << (LANE_BITS * number) for number in range(37) if mask >> number & 1)
+
+class Exposure:
+    """
+    House liability across all 37 outcomes, in cents
+
+    payouts: amount paid back (stake included) if each number wins
+    staked: total stake collected
+    """
+    
+    __slots__ = ("payouts", "staked")
+    
+    def __init__(self, payouts: int = 0, staked: int = 0):
+        self.payouts = payouts
+        self.staked = staked
+    
+    @classmethod
+    def of(cls, compiled: List[Tuple[int, int, int]]) -> "Exposure":
+        """Exposure of a compiled slip"""
+        # Sum per distinct mask first so the wide multiply-add runs once per group
+        by_mask: Dict[int, int] = {}
+        staked = 0
+        for mask, stake_cents, returns in compiled:
+            by_mask[mask] = by_mask.get(mask, 0) + stake_cents * returns
+            staked += stake_cents
+        return cls(sum(payout * _lanes(mask) for mask, payout in by_mask.items()), staked)
+    
+    def __add__(self, other: "Exposure") -> "Exposure":
+        return Exposure(self.payouts + other.payouts, self.staked + other.staked)
+    
+    def per_number(self) -> List[int]:
+        """Payout owed for each winning number 0-36"""
+        return [self.payouts >> (LANE_BITS * number) & LANE_MASK for number in range(37)]
+    
+    def max_payout(self) -> int:
+        return max(self.per_number())
+    
+    def max_net_loss(self) -> int:
+        """Worst-case house loss after keeping every losing stake"""
+        return self.max_payout() - self.staked
+    
+    def check_limits(self, max_number_liability: int, max_table_liability: int):
+        """
+        Raise ValueError if any number would pay out more than
+        max_number_liability, or the worst outcome would cost the house more
+        than max_table_liability (both in cents)
+        """
+        per_number = self.per_number()
+        worst = max(range(37), key=per_number.__getitem__)
+        if per_number[worst] > max_number_liability:
+            raise ValueError(f"Bets on {worst} exceed the table's maximum payout per number")
+        if per_number[worst] - self.staked > max_table_liability:
+            raise ValueError("Bets exceed the table's maximum liability")
 
 class RouletteEngine:
     """Server-authoritative Roulette engine (European style - single zero)"""
@@ -9,160 +184,300 @@ class RouletteEngine:
     NUMBERS = list(range(0, 37))  # 0-36
     
     # Red numbers in European roulette
-    RED_NUMBERS = [1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36]
-    BLACK_NUMBERS = [2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35]
+    RED_NUMBERS = RED_NUMBERS
+    BLACK_NUMBERS = BLACK_NUMBERS
+    
+    RED_MASK = OUTSIDE_BET_MASKS["red"]
     
     def __init__(self, seed: int = None):
-        if seed:
-            random.seed(seed)
+        self.rng = EngineRandom(seed)
+        self.seed = self.rng.stream_seed
     
     def spin(self) -> int:
         """Spin the wheel and return winning number"""
-        return random.choice(self.NUMBERS)
+        return self.rng.choice(self.NUMBERS)
     
     def get_color(self, number: int) -> str:
         """Get color of a number"""
+        return self.color_of(number)
+    
+    @classmethod
+    def color_of(cls, number: int) -> str:
         if number == 0:
             return "green"
-        elif number in self.RED_NUMBERS:
+        elif cls.RED_MASK >> number & 1:
             return "red"
         else:
             return "black"
     
-    def check_bet(self, bet_type: str, bet_value: any, winning_number: int) -> bool:
-        """Check if a bet wins"""
-        
-        if bet_type == "straight":
-            # Bet on single number
-            return int(bet_value) == winning_number
-        
-        elif bet_type == "red":
-            return winning_number in self.RED_NUMBERS
-        
-        elif bet_type == "black":
-            return winning_number in self.BLACK_NUMBERS
-        
-        elif bet_type == "even":
-            return winning_number != 0 and winning_number % 2 == 0
-        
-        elif bet_type == "odd":
-            return winning_number != 0 and winning_number % 2 == 1
-        
-        elif bet_type == "low":
-            # 1-18
-            return 1 <= winning_number <= 18
-        
-        elif bet_type == "high":
-            # 19-36
-            return 19 <= winning_number <= 36
-        
-        elif bet_type == "dozen1":
-            # 1-12
-            return 1 <= winning_number <= 12
-        
-        elif bet_type == "dozen2":
-            # 13-24
-            return 13 <= winning_number <= 24
-        
-        elif bet_type == "dozen3":
-            # 25-36
-            return 25 <= winning_number <= 36
-        
-        elif bet_type == "column1":
-            # 1, 4, 7, 10, 13, 16, 19, 22, 25, 28, 31, 34
-            return winning_number > 0 and (winning_number - 1) % 3 == 0
-        
-        elif bet_type == "column2":
-            # 2, 5, 8, 11, 14, 17, 20, 23, 26, 29, 32, 35
-            return winning_number > 0 and (winning_number - 2) % 3 == 0
-        
-        elif bet_type == "column3":
-            # 3, 6, 9, 12, 15, 18, 21, 24, 27, 30, 33, 36
-            return winning_number > 0 and winning_number % 3 == 0
-        
-        elif bet_type == "split":
-            # Bet on two adjacent numbers
-            numbers = bet_value if isinstance(bet_value, list) else []
-            return winning_number in numbers
-        
-        elif bet_type == "street":
-            # Bet on a row of three numbers
-            numbers = bet_value if isinstance(bet_value, list) else []
-            return winning_number in numbers
-        
-        elif bet_type == "corner":
-            # Bet on four numbers that meet at a corner
-            numbers = bet_value if isinstance(bet_value, list) else []
-            return winning_number in numbers
-        
-        elif bet_type == "line":
-            # Bet on two adjacent streets (6 numbers)
-            numbers = bet_value if isinstance(bet_value, list) else []
-            return winning_number in numbers
-        
-        return False
+    def check_bet(self, bet_type: str, bet_value: Any, winning_number: int) -> bool:
+        """Check if a bet wins (raises ValueError for an invalid bet)"""
+        return bool(compile_bet(bet_type, bet_value) >> winning_number & 1)
     
     def get_payout_multiplier(self, bet_type: str) -> Decimal:
         """Get payout multiplier for bet type"""
-        payouts = {
-            "straight": Decimal("35"),      # Single number: 35:1
-            "split": Decimal("17"),         # Two numbers: 17:1
-            "street": Decimal("11"),        # Three numbers: 11:1
-            "corner": Decimal("8"),         # Four numbers: 8:1
-            "line": Decimal("5"),           # Six numbers: 5:1
-            "dozen1": Decimal("2"),         # Dozen: 2:1
-            "dozen2": Decimal("2"),
-            "dozen3": Decimal("2"),
-            "column1": Decimal("2"),        # Column: 2:1
-            "column2": Decimal("2"),
-            "column3": Decimal("2"),
-            "red": Decimal("1"),            # Even money: 1:1
-            "black": Decimal("1"),
-            "even": Decimal("1"),
-            "odd": Decimal("1"),
-            "low": Decimal("1"),
-            "high": Decimal("1"),
-        }
-        return payouts.get(bet_type, Decimal("0"))
+        return Decimal(PAYOUTS.get(bet_type, 0))
     
-    def play_round(self, bets: List[Dict]) -> Dict:
+    @staticmethod
+    def compile_bets(bets: List[Dict]) -> List[Tuple[int, int, int]]:
         """
-        Play a round of roulette
-        
+        Validate a slip before the spin
+
         bets: List of dicts with keys: bet_type, bet_value, bet_amount
-        Returns: dict with winning_number, color, results
+        Returns: (mask, stake in cents, cents returned per staked cent incl. stake) per bet
         """
-        winning_number = self.spin()
-        color = self.get_color(winning_number)
+        compiled = []
+        for bet in bets:
+            mask = compile_bet(bet["bet_type"], bet.get("bet_value"))
+            stake_cents = to_cents(bet["bet_amount"])
+            if stake_cents <= 0:
+                raise ValueError("Bet amount must be positive")
+            compiled.append((mask, stake_cents, PAYOUTS[bet["bet_type"]] + 1))
+        return compiled
+    
+    def settle_bets(self, bets: List[Dict], compiled: List[Tuple[int, int, int]], winning_number: int) -> Dict:
+        """
+        Resolve a compiled slip against a winning number
         
+        Returns: dict with bet_results and total_payout
+        """
         results = []
-        total_payout = Decimal("0")
+        total_payout_cents = 0
         
-        for bet in bets:
-            bet_type = bet["bet_type"]
-            bet_value = bet.get("bet_value")
-            bet_amount = Decimal(str(bet["bet_amount"]))
-            
-            is_winner = self.check_bet(bet_type, bet_value, winning_number)
+        # One bit test per bet
+        for bet, (mask, stake_cents, returns) in zip(bets, compiled):
+            is_winner = bool(mask >> winning_number & 1)
             
             if is_winner:
-                multiplier = self.get_payout_multiplier(bet_type)
-                payout = bet_amount * (multiplier + 1)  # Include original bet
-                total_payout += payout
+                payout_cents = multiply(stake_cents, returns)  # Include original bet
+                total_payout_cents += payout_cents
+                payout = to_decimal(payout_cents)
             else:
-                payout = Decimal("0")
+                payout = NO_PAYOUT
             
             results.append({
-                "bet_type": bet_type,
-                "bet_value": bet_value,
-                "bet_amount": bet_amount,
+                "bet_type": bet["bet_type"],
+                "bet_value": bet.get("bet_value"),
+                "bet_amount": to_decimal(stake_cents),
                 "won": is_winner,
                 "payout": payout
             })
         
         return {
-            "winning_number": winning_number,
-            "color": color,
             "bet_results": results,
-            "total_payout": total_payout
-        }
\ No newline at end of file
+            "total_payout": to_decimal(total_payout_cents)
+        }
+    
+    def play_round(self, bets: List[Dict], limits: Optional[Tuple[int, int]] = None) -> Dict:
+        """
+        Play a round of roulette
+        
+        bets: List of dicts with keys: bet_type, bet_value, bet_amount
+        limits: (max payout per number, max table liability) in cents
+        Returns: dict with winning_number, color, results
+        Raises ValueError (before spinning) if any bet is invalid or the slip
+        exceeds the limits
+        """
+        compiled = self.compile_bets(bets)
+        if limits is not None:
+            Exposure.of(compiled).check_limits(*limits)
+        
+        winning_number = self.spin()
+        
+        return {
+            "winning_number": winning_number,
+            "color": self.get_color(winning_number),
+            **self.settle_bets(bets, compiled, winning_number)
+        }
+
+
+class RouletteTable:
+    """
+    Shared wheel: slips from every player are collected while the betting
+    window is open, then one spin settles them all
+    """
+    
+    def __init__(self, table_id: str, round_number: int, closes_at: float):
+        self.table_id = table_id
+        self.round_number = round_number
+        self.closes_at = closes_at  # Unix time the betting window closes
+        self.slips: List[Dict] = []  # user_id, wallet_id, session_id, bets, compiled (stakes already debited)
+        self.exposure = Exposure()  # Running total of the open round
+        self.last_result: Optional[Dict] = None
+    
+    def is_open(self, now: float) -> bool:
+        return now < self.closes_at
+    
+    def add_slip(
+        self,
+        user_id: int,
+        wallet_id: int,
+        bets: List[Dict],
+        now: float,
+        exposure: Optional[Exposure] = None,
+        limits: Optional[Tuple[int, int]] = None,
+        compiled: Optional[List[Tuple[int, int, int]]] = None,
+        session_id: Optional[int] = None
+    ) -> bool:
+        """
+        Add a validated slip; False once the betting window has closed
+        
+        exposure: the slip's exposure (computed from bets when omitted)
+        limits: (max payout per number, max table liability) in cents for the
+        round's running total; raises ValueError if the slip would exceed them
+        compiled: the slip's compiled bets (compiled from bets when omitted),
+        kept so the spin does not compile them again
+        session_id: the open round the slip was recorded as when it was debited
+        """
+        if not self.is_open(now):
+            return False
+        
+        if compiled is None:
+            compiled = RouletteEngine.compile_bets(bets)
+        if exposure is None:
+            exposure = Exposure.of(compiled)
+        total = self.exposure + exposure
+        if limits is not None:
+            total.check_limits(*limits)
+        
+        self.slips.append({
+            "user_id": user_id,
+            "wallet_id": wallet_id,
+            "session_id": session_id,
+            "bets": bets,
+            "compiled": compiled
+        })
+        self.exposure = total
+        return True
+    
+    def spin(self, engine: RouletteEngine, next_closes_at: float) -> Dict:
+        """
+        Spin once for every slip and open the next round
+        
+        Returns: dict with round_number, winning_number, color, seed, per-slip
+        settlements and recorded (False until the settlements are in the database)
+        """
+        winning_number = engine.spin()
+        settlements = [
+            {
+                "user_id": slip["user_id"],
+                "wallet_id": slip["wallet_id"],
+                "session_id": slip["session_id"],
+                **engine.settle_bets(slip["bets"], slip["compiled"], winning_number)
+            }
+            for slip in self.slips
+        ]
+        result = {
+            "round_number": self.round_number,
+            "winning_number": winning_number,
+            "color": engine.get_color(winning_number),
+            "seed": engine.seed,
+            "settlements": settlements,
+            "recorded": not settlements
+        }
+        
+        self.last_result = result
+        self.round_number += 1
+        self.closes_at = next_closes_at
+        self.slips = []
+        self.exposure = Exposure()
+        return result
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialize for the game state store as JSON
+        
+        Each open slip is [user_id, wallet_id, session_id, [[bet_type,
+        bet_value, mask, stake_cents], ...]]; the last result keeps one
+        [bet_type, bet_value, stake_cents, payout_cents] row per bet of each
+        settled slip, until and after it is recorded.
+        """
+        last = self.last_result
+        return json.dumps({
+            "table_id": self.table_id,
+            "round": self.round_number,
+            "closes_at": self.closes_at,
+            "slips": [
+                [
+                    slip["user_id"],
+                    slip["wallet_id"],
+                    slip["session_id"],
+                    [
+                        [bet["bet_type"], bet.get("bet_value"), mask, stake_cents]
+                        for bet, (mask, stake_cents, _) in zip(slip["bets"], slip["compiled"])
+                    ]
+                ]
+                for slip in self.slips
+            ],
+            "exposure": [self.exposure.payouts, self.exposure.staked],
+            "last": {
+                "round": last["round_number"],
+                "number": last["winning_number"],
+                "seed": last["seed"],
+                "recorded": last["recorded"],
+                "slips": [
+                    [
+                        settlement["user_id"],
+                        settlement["wallet_id"],
+                        settlement["session_id"],
+                        [
+                            [bet["bet_type"], bet["bet_value"], to_cents(bet["bet_amount"]), to_cents(bet["payout"])]
+                            for bet in settlement["bet_results"]
+                        ]
+                    ]
+                    for settlement in last["settlements"]
+                ]
+            } if last else None
+        }, separators=(",", ":")).encode()
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RouletteTable":
+        state = json.loads(data)
+        table = cls(state["table_id"], state["round"], state["closes_at"])
+        table.slips = [
+            {
+                "user_id": user_id,
+                "wallet_id": wallet_id,
+                "session_id": session_id,
+                "bets": [
+                    {"bet_type": bet_type, "bet_value": bet_value, "bet_amount": to_decimal(stake_cents)}
+                    for bet_type, bet_value, _, stake_cents in bets
+                ],
+                "compiled": [
+                    (mask, stake_cents, PAYOUTS[bet_type] + 1)
+                    for bet_type, _, mask, stake_cents in bets
+                ]
+            }
+            for user_id, wallet_id, session_id, bets in state["slips"]
+        ]
+        table.exposure = Exposure(*state["exposure"])
+        
+        last = state["last"]
+        if last is not None:
+            table.last_result = {
+                "round_number": last["round"],
+                "winning_number": last["number"],
+                "color": RouletteEngine.color_of(last["number"]),
+                "seed": last["seed"],
+                "recorded": last["recorded"],
+                "settlements": [
+                    {
+                        "user_id": user_id,
+                        "wallet_id": wallet_id,
+                        "session_id": session_id,
+                        "bet_results": [
+                            {
+                                "bet_type": bet_type,
+                                "bet_value": bet_value,
+                                "bet_amount": to_decimal(stake_cents),
+                                "won": payout_cents > 0,
+                                "payout": to_decimal(payout_cents) if payout_cents else NO_PAYOUT
+                            }
+                            for bet_type, bet_value, stake_cents, payout_cents in bets
+                        ],
+                        "total_payout": to_decimal(sum(payout_cents for *_, payout_cents in bets))
+                    }
+                    for user_id, wallet_id, session_id, bets in last["slips"]
+                ]
+            }
+        return table
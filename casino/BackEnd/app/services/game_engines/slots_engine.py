@@ -1,6 +1,7 @@
-import random
 from typing import List, Dict
 from decimal import Decimal
+from app.utils.money import to_cents, to_decimal, multiply
+from app.services.game_engines.rng import EngineRandom
 
 class SlotsEngine:
     """Server-authoritative Slots game engine (3x3 grid)"""
@@ -16,9 +17,11 @@ class SlotsEngine:
         "🔔": {"weight": 15, "payout": {3: 5}},              # Bell
     }
     
-    def __init__(self, rows: int = 3, cols: int = 3):
+    def __init__(self, rows: int = 3, cols: int = 3, seed: int = None):
         self.rows = rows
         self.cols = cols
+        self.rng = EngineRandom(seed)
+        self.seed = self.rng.stream_seed
         self.rtp_percent = 96.0  # Return to Player percentage
     
     def get_weighted_symbol(self) -> str:
@@ -30,7 +33,7 @@ class SlotsEngine:
             symbols.append(symbol)
             weights.append(data["weight"])
         
-        return random.choices(symbols, weights=weights, k=1)[0]
+        return self.rng.choices(symbols, weights=weights, k=1)[0]
     
     def spin(self) -> List[List[str]]:
         """Spin the reels and return grid"""
@@ -143,12 +146,12 @@ class SlotsEngine:
         wins = self.check_winning_lines(grid)
         
         # Calculate total multiplier
-        total_multiplier = Decimal("0")
-        for win in wins:
-            total_multiplier += Decimal(str(win["multiplier"]))
+        total_multiplier = sum(win["multiplier"] for win in wins)
         
-        # Calculate payout
-        payout = bet_amount * total_multiplier if total_multiplier > 0 else Decimal("0")
+        # Calculate payout (whole-number multipliers, exact in cents)
+        payout = Decimal("0")
+        if total_multiplier > 0:
+            payout = to_decimal(multiply(to_cents(bet_amount), total_multiplier))
         
         return {
             "grid": grid,
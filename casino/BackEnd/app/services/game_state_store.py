@@ -0,0 +1,191 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config import settings
+
+# Receives the current value (None if missing) and returns the new one (None deletes)
+StateUpdate = Callable[[Optional[bytes]], Optional[bytes]]
+
+class GameStateStore(ABC):
+    """
+    Store for serialized active-game state (engines between requests)
+
+    Values are opaque bytes grouped by namespace ("blackjack", "mines", ...).
+    A ttl of None keeps the value until it is deleted.
+    """
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def keys(self, namespace: str) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update(self, namespace: str, key: str, fn: StateUpdate, ttl: Optional[float]) -> Optional[bytes]:
+        """Atomically replace a value with fn(current value); returns the new value"""
+        raise NotImplementedError
+
+    async def take(self, namespace: str, key: str) -> Optional[bytes]:
+        """Atomically remove a value and return it, so only one caller gets it"""
+        taken = None
+
+        def claim(current: Optional[bytes]) -> None:
+            nonlocal taken
+            taken = current
+            return None
+
+        await self.update(namespace, key, claim, None)
+        return taken
+
+
+class InMemoryGameStateStore(GameStateStore):
+    """
+    Process-local store with per-entry TTL
+
+    Entries with a TTL (active games) are bounded by max_entries with LRU
+    eviction. Entries without one (seed pair nonces, shared tables) are
+    kept until deleted, since losing them would reissue nonces or drop
+    debited slips. Only suitable for a single worker; also the stand-in
+    for tests.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, bytes]]" = OrderedDict()
+        self._persistent: Dict[Tuple[str, str], bytes] = {}
+
+    def _get(self, namespace: str, key: str) -> Optional[bytes]:
+        value = self._persistent.get((namespace, key))
+        if value is not None:
+            return value
+
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[(namespace, key)]
+            return None
+
+        self._entries.move_to_end((namespace, key))
+        return value
+
+    def _set(self, namespace: str, key: str, value: bytes, ttl: Optional[float]) -> None:
+        if ttl is None:
+            self._entries.pop((namespace, key), None)
+            self._persistent[(namespace, key)] = value
+            return
+
+        self._persistent.pop((namespace, key), None)
+        self._entries[(namespace, key)] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end((namespace, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return self._get(namespace, key)
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float]) -> None:
+        self._set(namespace, key, value, ttl)
+
+    def _delete(self, namespace: str, key: str) -> None:
+        self._entries.pop((namespace, key), None)
+        self._persistent.pop((namespace, key), None)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        self._delete(namespace, key)
+
+    async def keys(self, namespace: str) -> List[str]:
+        return [
+            key for (entry_namespace, key) in [*self._persistent, *self._entries]
+            if entry_namespace == namespace and self._get(namespace, key) is not None
+        ]
+
+    async def update(self, namespace: str, key: str, fn: StateUpdate, ttl: Optional[float]) -> Optional[bytes]:
+        # No await between read and write, so this is atomic on the event loop
+        value = fn(self._get(namespace, key))
+        if value is None:
+            self._delete(namespace, key)
+        else:
+            self._set(namespace, key, value, ttl)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._persistent.clear()
+
+
+class RedisGameStateStore(GameStateStore):
+    """
+    Store shared by all workers through Redis
+
+    update() uses WATCH/MULTI and retries when another worker changed the
+    key in between. Pass client to run against a local Redis stand-in.
+    """
+
+    def __init__(self, url: Optional[str] = None, key_prefix: str = "game:", client=None):
+        if client is None:
+            from redis.asyncio import Redis
+            client = Redis.from_url(url)
+
+        self.key_prefix = key_prefix
+        self._client = client
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.key_prefix}{namespace}:{key}"
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        return await self._client.get(self._key(namespace, key))
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: Optional[float]) -> None:
+        await self._client.set(self._key(namespace, key), value, px=int(ttl * 1000) if ttl is not None else None)
+
+    async def delete(self, namespace: str, key: str) -> None:
+        await self._client.delete(self._key(namespace, key))
+
+    async def keys(self, namespace: str) -> List[str]:
+        prefix = self._key(namespace, "")
+        keys = []
+        async for redis_key in self._client.scan_iter(match=f"{prefix}*"):
+            if isinstance(redis_key, bytes):
+                redis_key = redis_key.decode()
+            keys.append(redis_key[len(prefix):])
+        return keys
+
+    async def update(self, namespace: str, key: str, fn: StateUpdate, ttl: Optional[float]) -> Optional[bytes]:
+        from redis.exceptions import WatchError
+
+        redis_key = self._key(namespace, key)
+        async with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(redis_key)
+                    value = fn(await pipe.get(redis_key))
+                    pipe.multi()
+                    if value is None:
+                        pipe.delete(redis_key)
+                    else:
+                        pipe.set(redis_key, value, px=int(ttl * 1000) if ttl is not None else None)
+                    await pipe.execute()
+                    return value
+                except WatchError:
+                    await asyncio.sleep(0)
+
+game_state_store = (
+    RedisGameStateStore(settings.GAME_STATE_REDIS_URL)
+    if settings.GAME_STATE_REDIS_URL
+    else InMemoryGameStateStore(settings.GAME_STATE_MAX_ENTRIES)
+)
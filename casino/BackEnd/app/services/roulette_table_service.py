@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.game_catalog import game_catalog
+from app.services.game_state_store import game_state_store
+from app.services.round_recorder import async_round_recorder
+from app.services.game_engines.roulette_engine import Exposure, RouletteEngine, RouletteTable
+
+logger = logging.getLogger(__name__)
+
+class RouletteTableService:
+    """
+    Shared-wheel roulette tables
+
+    Stakes are debited when a slip is placed, in the same transaction that
+    opens the slip's round. Every table closes its betting window on the same
+    wall-clock boundaries; one scheduler then spins each table once and
+    settles all of its slips in a single transaction.
+    Table state lives in the game state store, and the spin is claimed with
+    an atomic update, so with several workers each round is spun once. A spin
+    stays in the table state until it is recorded: the table does not spin
+    again before that, and the scheduler retries the recording on every tick.
+    Slips whose round never reached the table state (a worker stopped between
+    the debit and the table update) are refunded.
+    """
+
+    NAMESPACE = "roulette_table"
+    RECORD_ATTEMPTS = 3
+
+    def __init__(self, table_ids: List[str], window_seconds: int):
+        self.table_ids = table_ids
+        self.window_seconds = window_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    def next_close(self, now: float) -> float:
+        """End of the betting window containing now (shared by every table)"""
+        return (math.floor(now / self.window_seconds) + 1) * self.window_seconds
+
+    def _check_table(self, table_id: str):
+        if table_id not in self.table_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Table not found"
+            )
+
+    def _load(self, table_id: str, data: Optional[bytes]) -> RouletteTable:
+        if data is None:
+            return RouletteTable(table_id, 1, self.next_close(time.time()))
+        return RouletteTable.from_bytes(data)
+
+    async def get_table(self, table_id: str) -> RouletteTable:
+        self._check_table(table_id)
+        return self._load(table_id, await game_state_store.get(self.NAMESPACE, table_id))
+
+    async def place_slip(
+        self,
+        db: AsyncSession,
+        table_id: str,
+        user_id: int,
+        wallet_id: int,
+        bets: List[Dict]
+    ) -> Dict:
+        """
+        Validate and debit a slip, then add it to the table's open round
+
+        Returns: dict with table_id, round_number, closes_at, total_bet, session_id
+        """
+        self._check_table(table_id)
+
+        # Reject invalid slips, or slips over the limits on their own, before debiting
+        limits = settings.roulette_limits
+        try:
+            compiled = RouletteEngine.compile_bets(bets)
+            exposure = Exposure.of(compiled)
+            exposure.check_limits(*limits)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        total_bet = sum((bet["bet_amount"] for bet in bets), Decimal("0"))
+        game_id = await game_catalog.get_game_id(db, "Roulette")
+        session_id = await async_round_recorder.open_slip(
+            db,
+            user_id,
+            game_id,
+            wallet_id,
+            bets,
+            compact=settings.ROULETTE_SLIP_STORAGE == "compact"
+        )
+
+        table = None
+        added = False
+        rejected = None
+
+        def add_slip(data: Optional[bytes]) -> Optional[bytes]:
+            nonlocal table, added, rejected
+            table = self._load(table_id, data)
+            try:
+                # The round's running exposure is checked under the same atomic update
+                added = table.add_slip(
+                    user_id, wallet_id, bets, time.time(), exposure, limits, compiled, session_id
+                )
+            except ValueError as e:
+                rejected = str(e)
+            return table.to_bytes() if added else data
+
+        try:
+            await game_state_store.update(self.NAMESPACE, table_id, add_slip, None)
+        except Exception:
+            await async_round_recorder.cancel_slip(db, session_id)
+            raise
+
+        if not added:
+            # Refund
+            await async_round_recorder.cancel_slip(db, session_id)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=rejected or "Betting window closed, place the slip on the next round"
+            )
+
+        return {
+            "table_id": table_id,
+            "round_number": table.round_number,
+            "closes_at": table.closes_at,
+            "total_bet": total_bet,
+            "session_id": session_id
+        }
+
+    async def settle_due_tables(self) -> List[Dict]:
+        """Spin every table whose betting window has closed and record the results"""
+        now = time.time()
+        results = []
+
+        for table_id in self.table_ids:
+            # A spin that could not be recorded is retried before the table spins again
+            last = (await self.get_table(table_id)).last_result
+            if last and not last["recorded"] and not await self._record(table_id, last):
+                continue
+
+            result = None
+
+            def spin(data: Optional[bytes]) -> Optional[bytes]:
+                nonlocal result
+                table = self._load(table_id, data)
+                if table.is_open(now) or (table.last_result and not table.last_result["recorded"]):
+                    return table.to_bytes()
+                result = table.spin(RouletteEngine(), self.next_close(now))
+                return table.to_bytes()
+
+            await game_state_store.update(self.NAMESPACE, table_id, spin, None)
+
+            if result is not None:
+                if result["settlements"]:
+                    await self._record(table_id, result)
+                results.append(result)
+
+        await self._refund_orphans(now)
+        return results
+
+    async def _record(self, table_id: str, result: Dict) -> bool:
+        """
+        One transaction for every slip of the round, retried on failure
+
+        Returns: True once recorded; the result is then marked recorded in the
+        table state, otherwise it is kept there for the next tick
+        """
+        for attempt in range(1, self.RECORD_ATTEMPTS + 1):
+            try:
+                async with AsyncSessionLocal() as db:
+                    await async_round_recorder.record_table_round(
+                        db,
+                        result["settlements"],
+                        stream_seed=result["seed"]
+                    )
+                break
+            except Exception:
+                if attempt == self.RECORD_ATTEMPTS:
+                    logger.exception(
+                        "Could not record roulette table %s round %s, retrying next tick",
+                        table_id, result["round_number"]
+                    )
+                    return False
+                await asyncio.sleep(attempt)
+
+        def mark_recorded(data: Optional[bytes]) -> Optional[bytes]:
+            table = self._load(table_id, data)
+            if table.last_result and table.last_result["round_number"] == result["round_number"]:
+                table.last_result["recorded"] = True
+            return table.to_bytes()
+
+        await game_state_store.update(self.NAMESPACE, table_id, mark_recorded, None)
+        return True
+
+    async def _refund_orphans(self, now: float):
+        """Refund open slips older than two betting windows that no table holds"""
+        started_before = datetime.utcfromtimestamp(now) - timedelta(seconds=2 * self.window_seconds)
+        async with AsyncSessionLocal() as db:
+            game_id = await game_catalog.get_game_id(db, "Roulette")
+            session_ids = await async_round_recorder.open_sessions(db, game_id, started_before)
+            if not session_ids:
+                return
+
+            held = set()
+            for table_id in self.table_ids:
+                table = await self.get_table(table_id)
+                held.update(slip["session_id"] for slip in table.slips)
+                if table.last_result and not table.last_result["recorded"]:
+                    held.update(settlement["session_id"] for settlement in table.last_result["settlements"])
+
+            for session_id in session_ids:
+                if session_id not in held:
+                    logger.warning("Refunding roulette table slip %s missing from every table", session_id)
+                    await async_round_recorder.cancel_slip(db, session_id)
+
+    async def run(self):
+        """Scheduler loop: wake at each window boundary and settle all tables"""
+        while True:
+            now = time.time()
+            await asyncio.sleep(self.next_close(now) - now + 0.05)
+            try:
+                await self.settle_due_tables()
+            except Exception:
+                logger.exception("Roulette table settlement failed")
+
+    def start(self):
+        if self.table_ids and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+roulette_tables = RouletteTableService(
+    settings.roulette_tables_list,
+    settings.ROULETTE_BETTING_WINDOW_SECONDS
+)
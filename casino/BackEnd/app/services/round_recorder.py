@@ -0,0 +1,563 @@
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import selectinload
+from decimal import Decimal
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from app.models.game import GameSession, GameRound, Bet, BetStatus, SeedPair
+from app.services.wallet_service import async_wallet_service
+from app.utils.money import to_cents, to_decimal
+
+SLIP_FORMAT = 1
+
+def pack_slip(bets: List[Dict]) -> Dict:
+    """
+    Compact form of a multi-bet slip for GameRound.slip
+
+    One [bet_type, bet_value, stake_cents, payout_cents] row per bet
+    """
+    return {
+        "v": SLIP_FORMAT,
+        "bets": [
+            [bet["bet_type"], bet.get("bet_value"), to_cents(bet["bet_amount"]), to_cents(bet["payout"])]
+            for bet in bets
+        ]
+    }
+
+def unpack_slip(slip: Dict) -> List[Dict]:
+    """Per-bet detail of a packed slip"""
+    return [
+        {
+            "bet_type": bet_type,
+            "bet_value": bet_value,
+            "bet_amount": to_decimal(stake_cents),
+            "payout": to_decimal(payout_cents),
+            "won": payout_cents > 0
+        }
+        for bet_type, bet_value, stake_cents, payout_cents in slip["bets"]
+    ]
+
+def _bet_records(round_obj: GameRound, wallet_id: int, bets: List[Dict], compact: bool) -> List[Bet]:
+    """
+    Bet rows for a settled round
+
+    compact: a single Bet with the slip totals, the per-bet detail packed
+    into round_obj.slip (one row instead of one per chip)
+    """
+    if compact:
+        round_obj.slip = pack_slip(bets)
+        total_bet = sum((Decimal(str(bet["bet_amount"])) for bet in bets), Decimal("0"))
+        total_payout = sum((Decimal(str(bet["payout"])) for bet in bets), Decimal("0"))
+        return [
+            Bet(
+                round=round_obj,
+                wallet_id=wallet_id,
+                bet_amount=total_bet,
+                payout_amount=total_payout,
+                bet_status=BetStatus.won if total_payout > 0 else BetStatus.lost
+            )
+        ]
+
+    return [
+        Bet(
+            round=round_obj,
+            wallet_id=wallet_id,
+            bet_amount=bet["bet_amount"],
+            payout_amount=bet["payout"],
+            bet_status=BetStatus.won if bet["won"] else BetStatus.lost
+        )
+        for bet in bets
+    ]
+
+class AsyncRoundRecorder:
+    """Records game rounds in a single database transaction
+
+    The wallet debit, session/round/bet inserts, payout credit and session
+    close are flushed together and committed once instead of committing
+    after every step.
+    """
+
+    @staticmethod
+    async def record_round(
+        db: AsyncSession,
+        user_id: int,
+        game_id: int,
+        wallet_id: int,
+        bets: List[Dict],
+        compact: bool = False,
+        seed_pair_id: Optional[int] = None,
+        nonce: Optional[int] = None,
+        stream_seed: Optional[int] = None
+    ) -> Tuple[int, int, List[int]]:
+        """
+        Record a complete instant round (dice, slots, roulette)
+
+        bets: List of dicts with keys: bet_amount, payout, won
+        (plus bet_type, bet_value when compact)
+        compact: store the slip in GameRound.slip behind one summary Bet
+        seed_pair_id, nonce: provably fair draw the round was played with
+        stream_seed: seed of the engine's RNG stream, to replay the outcome
+        Returns: (session_id, round_id, bet_ids)
+        """
+        total_bet = sum((Decimal(str(bet["bet_amount"])) for bet in bets), Decimal("0"))
+        total_payout = sum((Decimal(str(bet["payout"])) for bet in bets), Decimal("0"))
+
+        try:
+            await async_wallet_service.debit_wallet(db, wallet_id, total_bet, commit=False)
+
+            session = GameSession(
+                user_id=user_id,
+                game_id=game_id,
+                ended_at=datetime.utcnow()
+            )
+            round_obj = GameRound(session=session, seed_pair_id=seed_pair_id, nonce=nonce, stream_seed=stream_seed)
+            bet_records = _bet_records(round_obj, wallet_id, bets, compact)
+            db.add(session)
+            db.add(round_obj)
+            db.add_all(bet_records)
+
+            if total_payout > 0:
+                await async_wallet_service.credit_wallet(db, wallet_id, total_payout, commit=False)
+
+            await db.flush()
+            recorded = (
+                session.session_id,
+                round_obj.round_id,
+                [bet_record.bet_id for bet_record in bet_records]
+            )
+            await db.commit()
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        return recorded
+
+    @staticmethod
+    async def open_round(
+        db: AsyncSession,
+        user_id: int,
+        game_id: int,
+        wallet_id: int,
+        bet_amount: Decimal,
+        seed_pair_id: Optional[int] = None,
+        nonce: Optional[int] = None,
+        stream_seed: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Debit the stake and open a session with a placed bet
+
+        seed_pair_id, nonce: provably fair draw the round was played with;
+        rejected with 409 if the pair has been rotated out since the draw
+        stream_seed: seed of the engine's RNG stream, to replay the outcome
+        Returns: (session_id, bet_id)
+        """
+        try:
+            if seed_pair_id is not None:
+                # Shared lock: a concurrent rotation waits for this round, or this waits for it
+                active = await db.scalar(
+                    select(SeedPair.is_active)
+                    .where(SeedPair.seed_pair_id == seed_pair_id)
+                    .with_for_update(read=True)
+                )
+                if not active:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Seed pair was rotated, start the game again"
+                    )
+
+            await async_wallet_service.debit_wallet(db, wallet_id, bet_amount, commit=False)
+
+            session = GameSession(user_id=user_id, game_id=game_id)
+            round_obj = GameRound(session=session, seed_pair_id=seed_pair_id, nonce=nonce, stream_seed=stream_seed)
+            bet_record = Bet(
+                round=round_obj,
+                wallet_id=wallet_id,
+                bet_amount=bet_amount,
+                payout_amount=Decimal("0"),
+                bet_status=BetStatus.placed
+            )
+            db.add(session)
+            db.add(round_obj)
+            db.add(bet_record)
+
+            await db.flush()
+            opened = (session.session_id, bet_record.bet_id)
+            await db.commit()
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        return opened
+
+    @staticmethod
+    async def open_slip(
+        db: AsyncSession,
+        user_id: int,
+        game_id: int,
+        wallet_id: int,
+        bets: List[Dict],
+        compact: bool = False
+    ) -> int:
+        """
+        Debit a shared-wheel slip and open its round with placed bets
+
+        The slip is recorded in the same transaction as the debit, so the
+        stake is never taken without a round to settle or refund.
+
+        bets: List of dicts with keys: bet_type, bet_value, bet_amount
+        compact: store the slip in GameRound.slip behind one summary Bet
+        Returns: session_id
+        """
+        total_bet = sum((Decimal(str(bet["bet_amount"])) for bet in bets), Decimal("0"))
+
+        try:
+            await async_wallet_service.debit_wallet(db, wallet_id, total_bet, commit=False)
+
+            session = GameSession(user_id=user_id, game_id=game_id)
+            round_obj = GameRound(session=session)
+            bet_records = _bet_records(
+                round_obj,
+                wallet_id,
+                [{**bet, "payout": Decimal("0"), "won": False} for bet in bets],
+                compact
+            )
+            for bet_record in bet_records:
+                bet_record.bet_status = BetStatus.placed
+            db.add(session)
+            db.add(round_obj)
+            db.add_all(bet_records)
+
+            await db.flush()
+            session_id = session.session_id
+            await db.commit()
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        return session_id
+
+    @staticmethod
+    async def cancel_slip(db: AsyncSession, session_id: int) -> bool:
+        """
+        Refund an open slip and close its round as cancelled
+
+        Returns: False if the round was already settled
+        """
+        try:
+            closed = await db.execute(
+                update(GameSession)
+                .where(GameSession.session_id == session_id, GameSession.ended_at.is_(None))
+                .values(ended_at=datetime.utcnow())
+            )
+            if closed.rowcount != 1:
+                await db.rollback()
+                return False
+
+            bets = list(await db.scalars(
+                select(Bet).join(GameRound).where(GameRound.session_id == session_id)
+            ))
+            for bet in bets:
+                bet.bet_status = BetStatus.cancelled
+                bet.payout_amount = bet.bet_amount
+            await async_wallet_service.credit_wallet(
+                db, bets[0].wallet_id, sum((bet.bet_amount for bet in bets), Decimal("0")), commit=False
+            )
+            await db.commit()
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        return True
+
+    @staticmethod
+    async def open_sessions(db: AsyncSession, game_id: int, started_before: datetime) -> List[int]:
+        """Sessions of a game still open that started before started_before"""
+        return list(await db.scalars(
+            select(GameSession.session_id).where(
+                GameSession.game_id == game_id,
+                GameSession.ended_at.is_(None),
+                GameSession.started_at < started_before
+            )
+        ))
+
+    @staticmethod
+    async def record_table_round(
+        db: AsyncSession,
+        settlements: List[Dict],
+        stream_seed: Optional[int] = None
+    ) -> List[int]:
+        """
+        Settle every slip of one shared-wheel spin in a single transaction
+
+        Each slip's round was opened by open_slip when its stake was debited,
+        so this closes the rounds with a conditional UPDATE, sets the bet
+        results and credits all winnings in one bulk UPDATE. Rounds closed
+        already are skipped, so a retried spin is never paid twice.
+
+        settlements: List of dicts with keys: session_id, wallet_id, bet_results, total_payout
+        stream_seed: seed of the wheel's RNG stream, stored on every slip's round
+        Returns: session_ids settled by this call
+        """
+        try:
+            closed = set((await db.execute(
+                update(GameSession)
+                .where(
+                    GameSession.session_id.in_([settlement["session_id"] for settlement in settlements]),
+                    GameSession.ended_at.is_(None)
+                )
+                .values(ended_at=datetime.utcnow())
+                .returning(GameSession.session_id)
+            )).scalars())
+
+            rounds = {
+                round_obj.session_id: round_obj
+                for round_obj in await db.scalars(
+                    select(GameRound)
+                    .where(GameRound.session_id.in_(closed))
+                    .options(selectinload(GameRound.bets))
+                )
+            }
+
+            session_ids = []
+            payouts: Dict[int, Decimal] = {}
+            for settlement in settlements:
+                round_obj = rounds.get(settlement["session_id"])
+                if round_obj is None:
+                    continue
+                round_obj.stream_seed = stream_seed
+                bet_results = settlement["bet_results"]
+
+                if round_obj.slip is not None:
+                    round_obj.slip = pack_slip(bet_results)
+                    results = [{"payout": settlement["total_payout"], "won": settlement["total_payout"] > 0}]
+                else:
+                    results = bet_results
+                for bet, bet_result in zip(sorted(round_obj.bets, key=lambda bet: bet.bet_id), results):
+                    bet.payout_amount = bet_result["payout"]
+                    bet.bet_status = BetStatus.won if bet_result["won"] else BetStatus.lost
+                session_ids.append(settlement["session_id"])
+
+                if settlement["total_payout"] > 0:
+                    wallet_id = settlement["wallet_id"]
+                    payouts[wallet_id] = payouts.get(wallet_id, Decimal("0")) + settlement["total_payout"]
+
+            await async_wallet_service.credit_wallets(db, payouts, commit=False)
+            await db.commit()
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        return session_ids
+
+    @staticmethod
+    async def record_rounds(
+        db: AsyncSession,
+        user_id: int,
+        game_id: int,
+        wallet_id: int,
+        rounds: List[Dict],
+        seed_pair_id: Optional[int] = None
+    ) -> Tuple[int, List[int]]:
+        """
+        Record a batch of instant rounds (dice autobet) in a single transaction
+
+        One session holds every round. Only the net result touches the
+        wallet (one debit or credit, the debit checked against the current
+        balance), and rounds and bets are bulk inserted with one
+        executemany each.
+
+        rounds: List of dicts with keys: bet_amount, payout, won, nonce
+        seed_pair_id: provably fair seed pair the nonces were drawn from
+        Returns: (session_id, round_ids)
+        """
+        total_bet = sum((Decimal(str(round_data["bet_amount"])) for round_data in rounds), Decimal("0"))
+        total_payout = sum((Decimal(str(round_data["payout"])) for round_data in rounds), Decimal("0"))
+
+        try:
+            if total_payout < total_bet:
+                await async_wallet_service.debit_wallet(db, wallet_id, total_bet - total_payout, commit=False)
+            elif total_payout > total_bet:
+                await async_wallet_service.credit_wallet(db, wallet_id, total_payout - total_bet, commit=False)
+
+            session = GameSession(user_id=user_id, game_id=game_id, ended_at=datetime.utcnow())
+            db.add(session)
+            await db.flush()
+
+            result = await db.execute(
+                insert(GameRound).returning(GameRound.round_id, sort_by_parameter_order=True),
+                [
+                    {"session_id": session.session_id, "seed_pair_id": seed_pair_id, "nonce": round_data["nonce"]}
+                    for round_data in rounds
+                ]
+            )
+            round_ids = list(result.scalars())
+
+            await db.execute(
+                insert(Bet),
+                [
+                    {
+                        "round_id": round_id,
+                        "wallet_id": wallet_id,
+                        "bet_amount": round_data["bet_amount"],
+                        "payout_amount": round_data["payout"],
+                        "bet_status": BetStatus.won if round_data["won"] else BetStatus.lost
+                    }
+                    for round_id, round_data in zip(round_ids, rounds)
+                ]
+            )
+            session_id = session.session_id
+            await db.commit()
+
+        except Exception as e:
+            await db.rollback()
+            raise e
+
+        return session_id, round_ids
+
+    @staticmethod
+    async def get_slip(db: AsyncSession, session_id: int, user_id: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Per-bet detail of a session's round, from either storage (audits)
+
+        user_id: only return the round if it belongs to this user
+        Returns: list of dicts with bet_amount, payout, won (plus bet_type,
+        bet_value for compact slips), or None if there is no such round
+        """
+        query = select(GameRound).filter(GameRound.session_id == session_id)
+        if user_id is not None:
+            query = query.join(GameSession).filter(GameSession.user_id == user_id)
+        round_obj = await db.scalar(query)
+        if round_obj is None:
+            return None
+        if round_obj.slip is not None:
+            return unpack_slip(round_obj.slip)
+
+        bets = await db.scalars(select(Bet).filter(Bet.round_id == round_obj.round_id).order_by(Bet.bet_id))
+        return [
+            {
+                "bet_amount": bet.bet_amount,
+                "payout": bet.payout_amount,
+                "won": bet.bet_status == BetStatus.won
+            }
+            for bet in bets
+        ]
+
+    @staticmethod
+    async def get_round_bet(db: AsyncSession, session_id: int) -> Optional[Bet]:
+        """Get the bet placed in a session's round"""
+        result = await db.execute(
+            select(Bet).join(GameRound).filter(GameRound.session_id == session_id)
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_state_version(db: AsyncSession, session_id: int) -> Optional[int]:
+        """Current state version of a session's round"""
+        return await db.scalar(
+            select(GameRound.state_version).filter(GameRound.session_id == session_id)
+        )
+
+    @staticmethod
+    async def advance_state_version(db: AsyncSession, session_id: int, version: int) -> bool:
+        """
+        Move the round from version to version + 1 (not committed)
+
+        Returns: False if the round is no longer at version (state already used)
+        """
+        result = await db.execute(
+            update(GameRound)
+            .where(GameRound.session_id == session_id, GameRound.state_version == version)
+            .values(state_version=version + 1)
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    async def settle_round(
+        db: AsyncSession,
+        session_id: int,
+        payout: Decimal,
+        bet_status: BetStatus,
+        commit: bool = True
+    ) -> Optional[Bet]:
+        """
+        Set the bet result, credit the payout and close the session
+
+        The session is closed with a conditional UPDATE first, so a round
+        settled concurrently is rejected instead of paid twice.
+        """
+        bet = await AsyncRoundRecorder.get_round_bet(db, session_id)
+        if not bet:
+            return None
+
+        closed = await db.execute(
+            update(GameSession)
+            .where(GameSession.session_id == session_id, GameSession.ended_at.is_(None))
+            .values(ended_at=datetime.utcnow())
+        )
+        if closed.rowcount != 1:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Game is already settled"
+            )
+
+        bet.payout_amount = payout
+        bet.bet_status = bet_status
+
+        if payout > 0:
+            await async_wallet_service.credit_wallet(db, bet.wallet_id, payout, commit=False)
+
+        if commit:
+            await db.commit()
+
+        return bet
+
+    @staticmethod
+    async def forfeit_abandoned(
+        db: AsyncSession,
+        started_before: datetime,
+        seed_pair_id: Optional[int] = None,
+        session_id: Optional[int] = None
+    ) -> int:
+        """
+        Close open rounds started before started_before, their bets lost
+
+        Their game state has outlived GAME_STATE_TTL_SECONDS, so they can no
+        longer be played or settled otherwise. Not committed.
+        seed_pair_id / session_id: only rounds drawn from this pair / this session
+        Returns: number of sessions closed
+        """
+        query = (
+            select(GameSession.session_id)
+            .join(GameRound, GameRound.session_id == GameSession.session_id)
+            .where(GameSession.ended_at.is_(None), GameSession.started_at < started_before)
+        )
+        if seed_pair_id is not None:
+            query = query.where(GameRound.seed_pair_id == seed_pair_id)
+        if session_id is not None:
+            query = query.where(GameSession.session_id == session_id)
+        session_ids = list(await db.scalars(query))
+        if not session_ids:
+            return 0
+
+        closed = await db.execute(
+            update(GameSession)
+            .where(GameSession.session_id.in_(session_ids), GameSession.ended_at.is_(None))
+            .values(ended_at=datetime.utcnow())
+        )
+        await db.execute(
+            update(Bet)
+            .where(
+                Bet.round_id.in_(select(GameRound.round_id).where(GameRound.session_id.in_(session_ids))),
+                Bet.bet_status == BetStatus.placed
+            )
+            .values(bet_status=BetStatus.lost, payout_amount=Decimal("0"))
+        )
+        return closed.rowcount
+
+async_round_recorder = AsyncRoundRecorder()
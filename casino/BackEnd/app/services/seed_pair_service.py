@@ -0,0 +1,254 @@
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.game import GameRound, GameSession, SeedPair
+from app.services.round_recorder import async_round_recorder
+from app.services.game_state_store import game_state_store
+from app.services.game_engines.provably_fair import (
+    generate_client_seed,
+    generate_server_seed,
+    hash_server_seed
+)
+
+class SeedPairService:
+    """
+    Provably fair seed pairs: a committed server seed, a client seed and a
+    server-owned nonce, one active pair per user plus a house pair for crash
+
+    The active pair is cached in the game state store and each draw bumps
+    its nonce with an atomic update, so rounds never write the pair; the
+    nonce is stored on the round instead. The pair row is only written when
+    it is created or rotated out (revealing the server seed). The entry is
+    stored without a TTL, so it is never evicted; every worker must share
+    the store (Redis), or each would count nonces on its own. After a
+    restart the next nonce is recovered from the rounds recorded with the
+    pair; a nonce whose round was never recorded (a crash round nobody
+    joined) may then be issued again, but it settled no bet.
+    """
+
+    NAMESPACE = "seed_pair"
+    HOUSE_KEY = "house"
+    MAX_CLIENT_SEED_LENGTH = 64
+
+    # Seed pair id, next nonce; then the server seed, its hash and the client seed
+    _ENTRY = struct.Struct("<QQ64s64s")
+
+    def _key(self, user_id: Optional[int]) -> str:
+        return self.HOUSE_KEY if user_id is None else str(user_id)
+
+    def _pack(self, pair: Dict) -> bytes:
+        return self._ENTRY.pack(
+            pair["seed_pair_id"],
+            pair["nonce"],
+            pair["server_seed"].encode(),
+            pair["server_seed_hash"].encode()
+        ) + pair["client_seed"].encode()
+
+    def _unpack(self, data: bytes) -> Dict:
+        seed_pair_id, nonce, server_seed, server_seed_hash = self._ENTRY.unpack_from(data)
+        return {
+            "seed_pair_id": seed_pair_id,
+            "server_seed": server_seed.decode(),
+            "server_seed_hash": server_seed_hash.decode(),
+            "client_seed": data[self._ENTRY.size:].decode(),
+            "nonce": nonce
+        }
+
+    def _new_pair(self, user_id: Optional[int], client_seed: Optional[str]) -> SeedPair:
+        if client_seed is not None and not 0 < len(client_seed) <= self.MAX_CLIENT_SEED_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Client seed must be 1-{self.MAX_CLIENT_SEED_LENGTH} characters"
+            )
+
+        server_seed = generate_server_seed()
+        return SeedPair(
+            user_id=user_id,
+            server_seed=server_seed,
+            server_seed_hash=hash_server_seed(server_seed),
+            client_seed=client_seed or generate_client_seed(),
+            nonce=0,
+            is_active=True
+        )
+
+    async def _load(self, db: AsyncSession, user_id: Optional[int]) -> Tuple[bytes, Optional[int]]:
+        """
+        Read the active pair from the database, creating one if there is none
+
+        Returns: (cache entry, id of the pair if it was just created)
+        """
+        pair = await db.scalar(
+            select(SeedPair)
+            .filter(SeedPair.user_id == user_id, SeedPair.is_active == True)
+            .order_by(SeedPair.seed_pair_id.desc())
+        )
+
+        if pair is None:
+            pair = self._new_pair(user_id, None)
+            db.add(pair)
+            await db.commit()
+            created = pair.seed_pair_id
+            nonce = 0
+        else:
+            created = None
+            last_nonce = await db.scalar(
+                select(func.max(GameRound.nonce)).filter(GameRound.seed_pair_id == pair.seed_pair_id)
+            )
+            nonce = max(pair.nonce, last_nonce + 1 if last_nonce is not None else 0)
+
+        return self._pack({
+            "seed_pair_id": pair.seed_pair_id,
+            "server_seed": pair.server_seed,
+            "server_seed_hash": pair.server_seed_hash,
+            "client_seed": pair.client_seed,
+            "nonce": nonce
+        }), created
+
+    async def _update(self, db: AsyncSession, user_id: Optional[int], advance: int) -> Dict:
+        """Atomically read the cached pair and move its nonce on by advance"""
+        key = self._key(user_id)
+
+        while True:
+            loaded = created = None
+            if await game_state_store.get(self.NAMESPACE, key) is None:
+                loaded, created = await self._load(db, user_id)
+
+            pair = None
+
+            def next_nonce(data: Optional[bytes]) -> Optional[bytes]:
+                nonlocal pair
+                data = data if data is not None else loaded
+                if data is None:
+                    return None  # Evicted since the check, load it again
+                pair = self._unpack(data)
+                return self._pack(dict(pair, nonce=pair["nonce"] + advance))
+
+            await game_state_store.update(self.NAMESPACE, key, next_nonce, None)
+
+            if created is not None and (pair is None or pair["seed_pair_id"] != created):
+                # Another request created and cached a pair first; drop the unused one
+                await db.execute(delete(SeedPair).where(SeedPair.seed_pair_id == created))
+                await db.commit()
+
+            if pair is not None:
+                return pair
+
+    async def draw(self, db: AsyncSession, user_id: Optional[int], count: int = 1) -> Dict:
+        """
+        Take the next nonce of the user's active pair (None for the house pair)
+
+        count: reserve this many consecutive nonces (batched rolls)
+        Returns: dict with seed_pair_id, server_seed, server_seed_hash, client_seed
+        and the first nonce
+        """
+        return await self._update(db, user_id, count)
+
+    async def get_active(self, db: AsyncSession, user_id: Optional[int]) -> Dict:
+        """
+        Public view of the active pair
+
+        Returns: dict with seed_pair_id, server_seed_hash, client_seed and the next nonce
+        """
+        pair = await self._update(db, user_id, 0)
+        del pair["server_seed"]
+        return pair
+
+    async def rotate(
+        self,
+        db: AsyncSession,
+        user_id: Optional[int],
+        client_seed: Optional[str] = None
+    ) -> Dict:
+        """
+        Replace the active pair and reveal its server seed
+
+        Refused while a round drawn from the pair is still open (a mines
+        board, a crash round), since the revealed seed would give its
+        outcome away. Rounds started more than GAME_STATE_TTL_SECONDS ago
+        are abandoned (their state has been evicted) and are forfeited
+        instead. Retiring the pair first locks its row; open_round checks
+        the pair under a shared lock, so a round cannot be opened on it
+        while it is being revealed.
+
+        client_seed: seed for the new pair (random if not given)
+        Returns: dict with the revealed previous pair and the new active pair
+        """
+        key = self._key(user_id)
+        current = await self._update(db, user_id, 0)  # Make sure a pair is cached
+
+        new_pair = self._new_pair(user_id, client_seed)
+        await db.execute(
+            update(SeedPair)
+            .where(SeedPair.seed_pair_id == current["seed_pair_id"])
+            .values(is_active=False)
+        )
+        await async_round_recorder.forfeit_abandoned(
+            db,
+            datetime.utcnow() - timedelta(seconds=settings.GAME_STATE_TTL_SECONDS),
+            seed_pair_id=current["seed_pair_id"]
+        )
+        open_rounds = await db.scalar(
+            select(func.count(GameRound.round_id))
+            .join(GameSession, GameRound.session_id == GameSession.session_id)
+            .filter(GameRound.seed_pair_id == current["seed_pair_id"], GameSession.ended_at.is_(None))
+        )
+        if open_rounds:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Finish the open games played with this seed pair before rotating it"
+            )
+
+        db.add(new_pair)
+        await db.flush()
+        new_entry = {
+            "seed_pair_id": new_pair.seed_pair_id,
+            "server_seed": new_pair.server_seed,
+            "server_seed_hash": new_pair.server_seed_hash,
+            "client_seed": new_pair.client_seed,
+            "nonce": 0
+        }
+
+        previous = None
+
+        def swap(data: Optional[bytes]) -> Optional[bytes]:
+            nonlocal previous
+            previous = self._unpack(data) if data is not None else None
+            return self._pack(new_entry)
+
+        # Draws after the swap use the new pair; the old one's final nonce is fixed here
+        await game_state_store.update(self.NAMESPACE, key, swap, None)
+
+        try:
+            if previous is not None:
+                await db.execute(
+                    update(SeedPair)
+                    .where(SeedPair.seed_pair_id == previous["seed_pair_id"])
+                    .values(is_active=False, nonce=previous["nonce"], revealed_at=datetime.utcnow())
+                )
+            # Any other pair left active (evicted mid-rotation) is retired too
+            await db.execute(
+                update(SeedPair)
+                .where(
+                    SeedPair.user_id == user_id,
+                    SeedPair.is_active == True,
+                    SeedPair.seed_pair_id != new_pair.seed_pair_id
+                )
+                .values(is_active=False, revealed_at=datetime.utcnow())
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            # Reload from the database on the next draw
+            await game_state_store.delete(self.NAMESPACE, key)
+            raise
+
+        active = dict(new_entry)
+        del active["server_seed"]
+        return {"previous": previous, "active": active}
+
+seed_pairs = SeedPairService()
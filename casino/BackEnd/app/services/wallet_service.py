@@ -1,13 +1,33 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, select, update
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, Optional
 from fastapi import HTTPException, status
 from app.models.wallet import Wallet, WalletType
 from app.models.user import User
+from app.config import settings
+from app.utils.money import Rounding, to_cents, to_decimal
 
 class WalletService:
-    """Server-authoritative wallet service with atomic transactions"""
+    """
+    Server-authoritative wallet service with atomic transactions
+    
+    Balance checks rely on SELECT ... FOR UPDATE row locks. SQLite ignores
+    FOR UPDATE, so concurrent writers there can lose updates; use the
+    conditional engine (WALLET_ENGINE="conditional") when testing on SQLite.
+    """
+    
+    @staticmethod
+    def to_amount(amount: Decimal) -> Decimal:
+        """Round an amount to whole cents (half up, as Numeric(18, 2) would) and require it to be positive"""
+        cents = to_cents(amount, Rounding.half_up)
+        if cents <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Amount must be positive"
+            )
+        return to_decimal(cents)
     
     @staticmethod
     def create_wallets_for_user(db: Session, user_id: int) -> list[Wallet]:
@@ -55,11 +75,7 @@ class WalletService:
         commit: bool = True
     ) -> Wallet:
         """Credit amount to wallet (atomic)"""
-        if amount <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Amount must be positive"
-            )
+        amount = WalletService.to_amount(amount)
         
         # Lock the row for update
         wallet = db.query(Wallet).filter(
@@ -88,11 +104,7 @@ class WalletService:
         commit: bool = True
     ) -> Wallet:
         """Debit amount from wallet (atomic with balance check)"""
-        if amount <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Amount must be positive"
-            )
+        amount = WalletService.to_amount(amount)
         
         # Lock the row for update
         wallet = db.query(Wallet).filter(
@@ -127,17 +139,18 @@ class WalletService:
         amount: Decimal
     ) -> tuple[Wallet, Wallet]:
         """Transfer amount between wallets (atomic transaction)"""
-        if amount <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Amount must be positive"
-            )
+        amount = WalletService.to_amount(amount)
         
         try:
-            # Debit from source (this locks the row)
+            # Lock both rows in wallet_id order so concurrent transfers cannot deadlock
+            db.query(Wallet).filter(
+                Wallet.wallet_id.in_([from_wallet_id, to_wallet_id])
+            ).order_by(Wallet.wallet_id).with_for_update().all()
+            
+            # Debit from source (row already locked)
             from_wallet = WalletService.debit_wallet(db, from_wallet_id, amount, commit=False)
             
-            # Credit to destination (this locks the row)
+            # Credit to destination (row already locked)
             to_wallet = WalletService.credit_wallet(db, to_wallet_id, amount, commit=False)
             
             # Commit both operations atomically
@@ -162,4 +175,287 @@ class WalletService:
             )
         return wallet.balance
 
-wallet_service = WalletService()
\ No newline at end of file
+
+class ConditionalWalletService(WalletService):
+    """Wallet service that applies each balance change as one conditional UPDATE ... RETURNING"""
+    
+    @staticmethod
+    def credit_wallet(
+        db: Session,
+        wallet_id: int,
+        amount: Decimal,
+        commit: bool = True
+    ) -> Wallet:
+        """Credit amount to wallet (single UPDATE)"""
+        amount = WalletService.to_amount(amount)
+        
+        wallet = db.execute(
+            update(Wallet)
+            .where(Wallet.wallet_id == wallet_id)
+            .values(balance=Wallet.balance + amount)
+            .returning(Wallet)
+        ).scalar_one_or_none()
+        
+        if not wallet:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Wallet not found"
+            )
+        
+        if commit:
+            db.commit()
+        
+        return wallet
+    
+    @staticmethod
+    def debit_wallet(
+        db: Session,
+        wallet_id: int,
+        amount: Decimal,
+        commit: bool = True
+    ) -> Wallet:
+        """Debit amount from wallet (single UPDATE guarded by the balance check)"""
+        amount = WalletService.to_amount(amount)
+        
+        wallet = db.execute(
+            update(Wallet)
+            .where(Wallet.wallet_id == wallet_id, Wallet.balance >= amount)
+            .values(balance=Wallet.balance - amount)
+            .returning(Wallet)
+        ).scalar_one_or_none()
+        
+        if not wallet:
+            # No row updated: tell a missing wallet apart from a short balance
+            if db.get(Wallet, wallet_id) is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Wallet not found"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient balance"
+            )
+        
+        if commit:
+            db.commit()
+        
+        return wallet
+    
+    @staticmethod
+    def transfer_between_wallets(
+        db: Session,
+        from_wallet_id: int,
+        to_wallet_id: int,
+        amount: Decimal
+    ) -> tuple[Wallet, Wallet]:
+        """Transfer amount between wallets (atomic, rows updated in wallet_id order)"""
+        amount = WalletService.to_amount(amount)
+        
+        try:
+            # Each UPDATE locks its row, so apply them in wallet_id order
+            if from_wallet_id < to_wallet_id:
+                from_wallet = ConditionalWalletService.debit_wallet(db, from_wallet_id, amount, commit=False)
+                to_wallet = ConditionalWalletService.credit_wallet(db, to_wallet_id, amount, commit=False)
+            else:
+                to_wallet = ConditionalWalletService.credit_wallet(db, to_wallet_id, amount, commit=False)
+                from_wallet = ConditionalWalletService.debit_wallet(db, from_wallet_id, amount, commit=False)
+            
+            db.commit()
+            
+            return from_wallet, to_wallet
+        
+        except Exception as e:
+            db.rollback()
+            raise e
+
+
+class AsyncWalletService:
+    """Async wallet service for handlers running on AsyncSession"""
+    
+    @staticmethod
+    async def get_wallet(
+        db: AsyncSession,
+        user_id: int,
+        type_of_wallet: WalletType = WalletType.cash
+    ) -> Optional[Wallet]:
+        """Get a specific wallet for a user"""
+        result = await db.execute(
+            select(Wallet).filter(
+                Wallet.user_id == user_id,
+                Wallet.type_of_wallet == type_of_wallet
+            )
+        )
+        return result.scalars().first()
+    
+    @staticmethod
+    async def credit_wallet(
+        db: AsyncSession,
+        wallet_id: int,
+        amount: Decimal,
+        commit: bool = True
+    ) -> Wallet:
+        """Credit amount to wallet (atomic)"""
+        amount = WalletService.to_amount(amount)
+        
+        # Lock the row for update
+        result = await db.execute(
+            select(Wallet).filter(Wallet.wallet_id == wallet_id).with_for_update()
+        )
+        wallet = result.scalars().first()
+        
+        if not wallet:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Wallet not found"
+            )
+        
+        wallet.balance += amount
+        
+        if commit:
+            await db.commit()
+        
+        return wallet
+    
+    @staticmethod
+    async def debit_wallet(
+        db: AsyncSession,
+        wallet_id: int,
+        amount: Decimal,
+        commit: bool = True
+    ) -> Wallet:
+        """Debit amount from wallet (atomic with balance check)"""
+        amount = WalletService.to_amount(amount)
+        
+        # Lock the row for update
+        result = await db.execute(
+            select(Wallet).filter(Wallet.wallet_id == wallet_id).with_for_update()
+        )
+        wallet = result.scalars().first()
+        
+        if not wallet:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Wallet not found"
+            )
+        
+        if wallet.balance < amount:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient balance"
+            )
+        
+        wallet.balance -= amount
+        
+        if commit:
+            await db.commit()
+        
+        return wallet
+    
+    @staticmethod
+    async def credit_wallets(
+        db: AsyncSession,
+        amounts: Dict[int, Decimal],
+        commit: bool = True
+    ) -> None:
+        """
+        Credit many wallets with one executemany UPDATE (bulk settlement)
+        
+        amounts: wallet_id -> amount; applied in wallet_id order so concurrent
+        bulk credits lock rows in the same order
+        """
+        params = [
+            {"target_wallet_id": wallet_id, "amount": WalletService.to_amount(amount)}
+            for wallet_id, amount in sorted(amounts.items())
+        ]
+        if params:
+            wallets = Wallet.__table__
+            await db.execute(
+                update(wallets)
+                .where(wallets.c.wallet_id == bindparam("target_wallet_id"))
+                .values(balance=wallets.c.balance + bindparam("amount")),
+                params
+            )
+        
+        if commit:
+            await db.commit()
+
+
+class AsyncConditionalWalletService(AsyncWalletService):
+    """Async wallet service that applies each balance change as one conditional UPDATE ... RETURNING"""
+    
+    @staticmethod
+    async def credit_wallet(
+        db: AsyncSession,
+        wallet_id: int,
+        amount: Decimal,
+        commit: bool = True
+    ) -> Wallet:
+        """Credit amount to wallet (single UPDATE)"""
+        amount = WalletService.to_amount(amount)
+        
+        result = await db.execute(
+            update(Wallet)
+            .where(Wallet.wallet_id == wallet_id)
+            .values(balance=Wallet.balance + amount)
+            .returning(Wallet)
+        )
+        wallet = result.scalar_one_or_none()
+        
+        if not wallet:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Wallet not found"
+            )
+        
+        if commit:
+            await db.commit()
+        
+        return wallet
+    
+    @staticmethod
+    async def debit_wallet(
+        db: AsyncSession,
+        wallet_id: int,
+        amount: Decimal,
+        commit: bool = True
+    ) -> Wallet:
+        """Debit amount from wallet (single UPDATE guarded by the balance check)"""
+        amount = WalletService.to_amount(amount)
+        
+        result = await db.execute(
+            update(Wallet)
+            .where(Wallet.wallet_id == wallet_id, Wallet.balance >= amount)
+            .values(balance=Wallet.balance - amount)
+            .returning(Wallet)
+        )
+        wallet = result.scalar_one_or_none()
+        
+        if not wallet:
+            # No row updated: tell a missing wallet apart from a short balance
+            if await db.get(Wallet, wallet_id) is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Wallet not found"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Insufficient balance"
+            )
+        
+        if commit:
+            await db.commit()
+        
+        return wallet
+
+
+wallet_service = (
+    ConditionalWalletService()
+    if settings.WALLET_ENGINE == "conditional"
+    else WalletService()
+)
+
+async_wallet_service = (
+    AsyncConditionalWalletService()
+    if settings.WALLET_ENGINE == "conditional"
+    else AsyncWalletService()
+)
\ No newline at end of file
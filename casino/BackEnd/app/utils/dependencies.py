@@ -1,17 +1,20 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
 from ..models.user import User, UserType
 from ..utils.security import decode_access_token
+from ..utils.user_cache import AuthenticatedUser, user_cache
+from ..utils.token_revocation import token_revocations
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedUser:
+    """Get current authenticated user from token claims, falling back to the user cache"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,15 +31,36 @@ async def get_current_user(
         
     user_id = int(user_id_str)
     
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if user is None:
+    version = payload.get("ver")
+    if version is not None and await token_revocations.is_revoked(user_id, version):
         raise credentials_exception
     
+    # Tokens with complete claims authorize without touching the database
+    role = payload.get("role")
+    tenant_id = payload.get("tenant_id")
+    if version is not None and role is not None and (
+        tenant_id is not None or role == UserType.casino_owner.value
+    ):
+        return AuthenticatedUser(
+            user_id=user_id,
+            role=UserType(role),
+            tenant_id=tenant_id,
+            is_active=True  # Only issued to active users; deactivation revokes them
+        )
+    
+    # Tokens issued before region selection (or without claims) load the user
+    user = user_cache.get(user_id)
+    if user is None:
+        db_user = await db.scalar(select(User).filter(User.user_id == user_id))
+        if db_user is None:
+            raise credentials_exception
+        user = user_cache.set(db_user)
+    
     return user
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_user)
+) -> AuthenticatedUser:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(
@@ -57,8 +81,8 @@ async def get_current_active_user(
 #     return current_user
 
 async def require_tenant(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+) -> AuthenticatedUser:
     """Require user to have a tenant assigned"""
     if current_user.tenant_id is None:
         raise HTTPException(
@@ -68,8 +92,8 @@ async def require_tenant(
     return current_user
 
 async def require_casino_owner(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+) -> AuthenticatedUser:
     """Require casino_owner role"""
     if current_user.role != UserType.casino_owner:
         raise HTTPException(
@@ -79,8 +103,8 @@ async def require_casino_owner(
     return current_user
 
 async def require_tenant_admin(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthenticatedUser = Depends(get_current_active_user)
+) -> AuthenticatedUser:
     """Require admin role (Tenant level)"""
     if current_user.role != UserType.admin:
         raise HTTPException(
@@ -0,0 +1,56 @@
+import base64
+import hashlib
+import os
+import struct
+from typing import Optional
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from ..config import settings
+
+class GameStateTokenCodec:
+    """
+    Seals serialized engine state into an opaque token held by the client
+
+    AES-256-GCM with a random 96-bit nonce. The game, session id and state
+    version are bound in as associated data, so a token only opens for the
+    round state it was issued for; once the round's state_version moves on,
+    every older token stops decrypting.
+    """
+
+    FORMAT = 1
+    _AAD = struct.Struct("<BQI")  # Format, session id, state version
+
+    def __init__(self, key: bytes):
+        self._aead = AESGCM(key)
+
+    def _aad(self, game: str, session_id: int, version: int) -> bytes:
+        return game.encode() + self._AAD.pack(self.FORMAT, session_id, version)
+
+    def seal(self, game: str, session_id: int, version: int, state: bytes) -> str:
+        """Encrypt and authenticate state; returns a URL-safe token"""
+        nonce = os.urandom(12)
+        sealed = self._aead.encrypt(nonce, state, self._aad(game, session_id, version))
+        return base64.urlsafe_b64encode(bytes((self.FORMAT,)) + nonce + sealed).rstrip(b"=").decode()
+
+    def open(self, game: str, session_id: int, version: int, token: str) -> Optional[bytes]:
+        """Decrypt a token; None if it is malformed, forged or for another state version"""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except ValueError:
+            return None
+
+        if len(raw) < 13 or raw[0] != self.FORMAT:
+            return None
+
+        try:
+            return self._aead.decrypt(raw[1:13], raw[13:], self._aad(game, session_id, version))
+        except InvalidTag:
+            return None
+
+def _token_key() -> bytes:
+    if settings.GAME_STATE_TOKEN_KEY:
+        return bytes.fromhex(settings.GAME_STATE_TOKEN_KEY)
+    # Derived so the JWT signing key is never used directly for encryption
+    return hashlib.sha256(b"game-state-token:" + settings.SECRET_KEY.encode()).digest()
+
+game_state_tokens = GameStateTokenCodec(_token_key())
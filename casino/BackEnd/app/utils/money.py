@@ -0,0 +1,79 @@
+import enum
+from decimal import Decimal
+from fractions import Fraction
+from typing import NewType, Tuple, Union
+
+MINOR_UNITS = 100  # Cents per unit, matches Numeric(18, 2) wallet balances
+
+# Amount of money in integer minor units. A NewType rather than a wrapper
+# class so hot paths do plain int arithmetic with no per-value objects; it
+# is only used in annotations (calling it costs more than the math itself).
+Cents = NewType("Cents", int)
+
+class Rounding(str, enum.Enum):
+    """Rounding policy applied when an amount falls between two cents"""
+    down = "down"            # Toward zero - payouts never exceed the exact amount
+    half_up = "half_up"      # Half away from zero - how Postgres rounds into Numeric(18, 2)
+    half_even = "half_even"  # Banker's rounding - unbiased over many operations
+
+
+def _divide(numerator: int, denominator: int, rounding: Rounding) -> int:
+    """Integer division of numerator by a positive denominator with explicit rounding"""
+    if rounding is Rounding.down and numerator >= 0:
+        return numerator // denominator
+
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder:
+        if rounding is Rounding.half_up:
+            if 2 * remainder >= denominator:
+                quotient += 1
+        elif rounding is Rounding.half_even:
+            if 2 * remainder > denominator or (2 * remainder == denominator and quotient & 1):
+                quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def as_ratio(value: Union[int, float, Decimal, Fraction, str]) -> Tuple[int, int]:
+    """Exact (numerator, denominator) of a multiplier or amount"""
+    if isinstance(value, Decimal):
+        return value.as_integer_ratio()
+    if isinstance(value, int):
+        return value, 1
+    if isinstance(value, Fraction):
+        return value.numerator, value.denominator
+    if isinstance(value, float):
+        return Decimal(str(value)).as_integer_ratio()  # Shortest repr, not the binary expansion
+    return Decimal(value).as_integer_ratio()
+
+
+def to_cents(
+    amount: Union[int, float, Decimal, Fraction, str],
+    rounding: Rounding = Rounding.half_up
+) -> Cents:
+    """Convert an amount in units (e.g. Decimal("10.50")) to cents"""
+    numerator, denominator = as_ratio(amount)
+    if MINOR_UNITS % denominator == 0:
+        return numerator * (MINOR_UNITS // denominator)  # Whole cents, no rounding
+    return _divide(numerator * MINOR_UNITS, denominator, rounding)
+
+
+def to_decimal(cents: Cents) -> Decimal:
+    """Exact Decimal with two places, e.g. Decimal("10.50")"""
+    return Decimal(cents).scaleb(-2)
+
+
+def scale(cents: Cents, numerator: int, denominator: int, rounding: Rounding = Rounding.down) -> Cents:
+    """Scale by numerator / denominator, e.g. scale(stake, 5, 2) for a 3:2 blackjack"""
+    return _divide(cents * numerator, denominator, rounding)
+
+
+def multiply(
+    cents: Cents,
+    multiplier: Union[int, float, Decimal, Fraction, str],
+    rounding: Rounding = Rounding.down
+) -> Cents:
+    """Scale by a multiplier (payouts round down by default)"""
+    if isinstance(multiplier, int):
+        return cents * multiplier
+    numerator, denominator = as_ratio(multiplier)
+    return _divide(cents * numerator, denominator, rounding)
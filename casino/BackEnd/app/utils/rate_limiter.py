@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import HTTPException, Request, status
+from ..config import settings
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: int, refill_per_second: float) -> float:
+    """Tokens in a bucket after refilling for the time elapsed since updated_at"""
+    return min(float(capacity), tokens + max(0.0, now - updated_at) * refill_per_second)
+
+
+class InMemoryRateLimitBackend:
+    """
+    Process-local token buckets
+
+    Stand-in for the shared backend in development and tests. Each worker
+    process keeps its own buckets, so limits are per worker.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        """Take one token from a bucket; returns (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+            tokens = _refill(tokens, updated_at, now, capacity, refill_per_second)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (1 - tokens) / refill_per_second
+        return allowed, retry_after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisRateLimitBackend:
+    """
+    Token buckets shared by all workers through Redis
+
+    The refill-and-take step runs as a single Lua script so concurrent
+    workers cannot both spend the last token. Pass client to run against a
+    local Redis stand-in.
+    """
+
+    TAKE_SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, url: Optional[str], key_prefix: str = "ratelimit:", client=None):
+        if client is None:
+            from redis.asyncio import Redis
+            client = Redis.from_url(url)
+
+        self.key_prefix = key_prefix
+        self._client = client
+        self._take = self._client.register_script(self.TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: int, refill_per_second: float) -> Tuple[bool, float]:
+        """Take one token from a bucket; returns (allowed, retry_after_seconds)"""
+        allowed, tokens = await self._take(
+            keys=[self.key_prefix + key],
+            args=[capacity, refill_per_second, time.time()]
+        )
+        tokens = float(tokens)
+        retry_after = 0.0 if allowed else (1 - tokens) / refill_per_second
+        return bool(allowed), retry_after
+
+
+class AuthThrottle:
+    """Token-bucket throttling of login and signup by client IP and by email"""
+
+    def __init__(self, backend, ip_burst: int, ip_per_minute: float, email_burst: int, email_per_minute: float):
+        self.backend = backend
+        self.ip_burst = ip_burst
+        self.ip_rate = ip_per_minute / 60
+        self.email_burst = email_burst
+        self.email_rate = email_per_minute / 60
+
+    async def check(self, request: Request, action: str, email: Optional[str] = None) -> None:
+        """Raise 429 if the client IP or the email is over its limit"""
+        client_ip = request.client.host if request.client else "unknown"
+        allowed, retry_after = await self.backend.take(
+            f"{action}:ip:{client_ip}", self.ip_burst, self.ip_rate
+        )
+
+        if allowed and email:
+            allowed, retry_after = await self.backend.take(
+                f"{action}:email:{email.lower()}", self.email_burst, self.email_rate
+            )
+
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+            )
+
+auth_throttle = AuthThrottle(
+    RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+    if settings.RATE_LIMIT_REDIS_URL else InMemoryRateLimitBackend(),
+    ip_burst=settings.AUTH_RATE_LIMIT_IP_BURST,
+    ip_per_minute=settings.AUTH_RATE_LIMIT_IP_PER_MINUTE,
+    email_burst=settings.AUTH_RATE_LIMIT_EMAIL_BURST,
+    email_per_minute=settings.AUTH_RATE_LIMIT_EMAIL_PER_MINUTE
+)
@@ -2,11 +2,21 @@ from datetime import timezone
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
 from ..config import settings
+from .token_cache import token_cache
+import asyncio
 import hashlib
 
-pass_context = CryptContext(schemes=["argon2"],deprecated="auto") # bcrypt allows only 72 bytes long (argon2_cffi)
+pass_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM
+) # bcrypt allows only 72 bytes long (argon2_cffi)
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
@@ -18,6 +28,57 @@ def verify_password(plain_password:str, hashed_password: str):
     sha256_hash = hashlib.sha256(plain_password.encode("utf-8")).hexdigest()
     return pass_context.verify(sha256_hash,hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also return a new hash if the stored one uses outdated Argon2 parameters"""
+    sha256_hash = hashlib.sha256(plain_password.encode("utf-8")).hexdigest()
+    return pass_context.verify_and_update(sha256_hash, hashed_password)
+
+class PasswordHasher:
+    """Runs Argon2 hashing in a bounded process pool so it never blocks the event loop"""
+    
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 64):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    async def _run(self, fn, *args):
+        """Run fn in the pool, rejecting the request when the queue is full"""
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+        
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self.pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password"""
+        return await self._run(get_password_hash, password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password and return (valid, new_hash or None)"""
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+    
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS or None,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -30,9 +91,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode a JWT access token"""
+    """Decode a JWT access token (verified payloads are cached until exp)"""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        token_cache.set(token, payload)
         return payload
     except JWTError as e:
         return None
\ No newline at end of file
@@ -0,0 +1,101 @@
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from ..config import settings
+
+class TokenRevocationList:
+    """
+    In-memory filter of revoked access tokens
+
+    Tracks, per user, the lowest token version still accepted. Entries are
+    kept only as long as an access token can live, since older tokens have
+    expired by then anyway. Revocations only reach the worker that made
+    them; stand-in for the shared list in development and tests.
+    """
+
+    def __init__(self, retention_seconds: float):
+        self.retention_seconds = retention_seconds
+        self._min_versions: Dict[int, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    async def revoke(self, user_id: int, min_version: int) -> None:
+        """Reject every token for user_id issued with a version below min_version"""
+        with self._lock:
+            current = self._min_versions.get(user_id)
+            if current is not None and current[0] > min_version:
+                min_version = current[0]
+            self._min_versions[user_id] = (min_version, time.monotonic() + self.retention_seconds)
+
+    async def is_revoked(self, user_id: int, version: int) -> bool:
+        """Check whether a token version has been revoked"""
+        entry = self._min_versions.get(user_id)
+        if entry is None:
+            return False
+
+        min_version, expires_at = entry
+        if expires_at <= time.monotonic():
+            with self._lock:
+                self._min_versions.pop(user_id, None)
+            return False
+
+        return version < min_version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._min_versions.clear()
+
+
+class RedisTokenRevocationList:
+    """
+    Revoked token versions shared by all workers through Redis
+
+    One key per user holds the lowest accepted version and expires with the
+    last token it could reject. Raising it runs as a Lua script so a late
+    revocation never lowers a newer one. Pass client to run against a local
+    Redis stand-in.
+    """
+
+    REVOKE_SCRIPT = """
+    local current = tonumber(redis.call('GET', KEYS[1]))
+    local version = tonumber(ARGV[1])
+    if current == nil or current < version then
+        redis.call('SET', KEYS[1], ARGV[1])
+    end
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        retention_seconds: float,
+        key_prefix: str = "revoked:",
+        client=None
+    ):
+        if client is None:
+            from redis.asyncio import Redis
+            client = Redis.from_url(url)
+
+        self.retention_seconds = retention_seconds
+        self.key_prefix = key_prefix
+        self._client = client
+        self._revoke = self._client.register_script(self.REVOKE_SCRIPT)
+
+    async def revoke(self, user_id: int, min_version: int) -> None:
+        """Reject every token for user_id issued with a version below min_version"""
+        await self._revoke(
+            keys=[f"{self.key_prefix}{user_id}"],
+            args=[min_version, math.ceil(self.retention_seconds)]
+        )
+
+    async def is_revoked(self, user_id: int, version: int) -> bool:
+        """Check whether a token version has been revoked"""
+        min_version = await self._client.get(f"{self.key_prefix}{user_id}")
+        return min_version is not None and version < int(min_version)
+
+token_revocations = (
+    RedisTokenRevocationList(settings.TOKEN_REVOCATION_REDIS_URL, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+    if settings.TOKEN_REVOCATION_REDIS_URL
+    else TokenRevocationList(settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+)
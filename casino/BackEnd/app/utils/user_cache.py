@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from ..config import settings
+from ..models.user import User, UserType
+
+class AuthenticatedUser(NamedTuple):
+    """User fields checked by the auth dependencies"""
+    user_id: int
+    role: UserType
+    tenant_id: Optional[int]
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        return cls(
+            user_id=user.user_id,
+            role=user.role,
+            tenant_id=user.tenant_id,
+            is_active=user.is_active
+        )
+
+
+class UserCache:
+    """
+    Bounded LRU cache of authenticated users with a TTL
+
+    Entries are dropped explicitly when an admin changes a user's status or
+    tenant. The TTL bounds staleness for changes made on other workers.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, tuple[float, AuthenticatedUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[AuthenticatedUser]:
+        """Get a cached user, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user: User) -> AuthenticatedUser:
+        """Cache the auth fields of a freshly loaded user"""
+        cached = AuthenticatedUser.from_user(user)
+        with self._lock:
+            self._entries[cached.user_id] = (time.monotonic() + self.ttl_seconds, cached)
+            self._entries.move_to_end(cached.user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user so the next request reloads it"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+user_cache = UserCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,80 @@
+"""
+BlackjackEngine.start_game: per-round Card-object deck vs int shoe
+
+Run from casino/BackEnd:
+    python -m benchmarks.blackjack_shoe [rounds]
+
+The legacy path rebuilds and shuffles 312 Card objects every round (as
+start_game did before the shoe). The router deals every hand from a fresh
+bytearray shoe ("fresh"), so no shoe carries over between hands to be
+counted; "shoe" keeps one shoe until the cut card for comparison.
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+for key in ("DATABASE_URL", "SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "sqlite://" if key == "DATABASE_URL" else "bench")
+
+from app.services.game_engines.blackjack_engine import BlackjackEngine, Shoe, RANKS, SUITS
+
+
+class LegacyCard:
+    def __init__(self, suit: str, rank: str):
+        self.suit = suit
+        self.rank = rank
+
+    def value(self) -> int:
+        if self.rank in ['J', 'Q', 'K']:
+            return 10
+        elif self.rank == 'A':
+            return 11
+        else:
+            return int(self.rank)
+
+
+def legacy_hand_value(hand) -> int:
+    value = sum(card.value() for card in hand)
+    num_aces = sum(1 for card in hand if card.rank == 'A')
+    while value > 21 and num_aces > 0:
+        value -= 10
+        num_aces -= 1
+    return value
+
+
+def legacy_start_game():
+    deck = [LegacyCard(suit, rank) for _ in range(6) for suit in SUITS for rank in RANKS]
+    random.shuffle(deck)
+    player_hand = [deck.pop(), deck.pop()]
+    dealer_hand = [deck.pop(), deck.pop()]
+    return legacy_hand_value(player_hand), legacy_hand_value(dealer_hand)
+
+
+def measure(name: str, start_game, rounds: int):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        start_game()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for _ in range(100):
+        start_game()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<8} {elapsed / rounds * 1e6:>8.2f} us/round  peak alloc over 100 rounds {peak / 1024:>8.1f} KiB")
+
+
+def main(rounds: int):
+    shoe = Shoe()
+    print(f"{rounds} rounds")
+    measure("legacy", legacy_start_game, rounds)
+    measure("fresh", lambda: BlackjackEngine(shoe=Shoe()).start_game(), rounds)
+    measure("shoe", lambda: BlackjackEngine(shoe=shoe).start_game(), rounds)
+    print(f"shoe reshuffles: {shoe.shuffles}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,93 @@
+"""
+Dice autobet: one record_round per roll vs one record_rounds per batch
+
+Run from casino/BackEnd:
+    python -m benchmarks.dice_autobet [rolls] [batches]
+
+Plays the same rolls with DiceEngine.play_autobet and records them either
+one round per transaction (what a client looping /games/dice/roll costs)
+or as a single batch, counting commits and statements. Uses a throwaway
+SQLite database unless DATABASE_URL is already set; SQLite sends the bulk
+round insert one row at a time, so the batch statement count is lower on
+PostgreSQL.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+for key in ("SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "bench")
+
+from sqlalchemy import event
+from app.database import Base, engine, AsyncSessionLocal, async_engine
+from app.services.round_recorder import async_round_recorder
+from app.services.game_engines.dice_engine import DiceEngine
+from app.services.game_engines.provably_fair import generate_client_seed, generate_server_seed
+from benchmarks.roulette_tables import setup
+
+commits = 0
+statements = 0
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def _count_commit(conn):
+    global commits
+    commits += 1
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    statements += 1
+
+
+def report(label: str, elapsed: float, rolls: int):
+    print(
+        f"{label:<10} {commits / rolls:>6.3f} commits/roll {statements / rolls:>6.3f} statements/roll "
+        f"{rolls / elapsed:>9.0f} rolls/s"
+    )
+
+
+async def main(rolls: int, batches: int):
+    global commits, statements
+    Base.metadata.create_all(engine)
+    game_id, [(user_id, wallet_id)] = setup(1)
+    server_seed, client_seed = generate_server_seed(), generate_client_seed()
+    dice = DiceEngine()
+    played = [
+        dice.play_autobet(
+            Decimal("1"), 50.0, True, server_seed, client_seed, batch * rolls, rolls,
+            Decimal("1000000"), on_loss=Decimal("2")
+        )["results"]
+        for batch in range(batches)
+    ]
+    total = sum(len(results) for results in played)
+    print(f"{batches} batches of up to {rolls} rolls ({total} rolls, martingale on loss)")
+
+    async with AsyncSessionLocal() as db:
+        commits = statements = 0
+        start = time.perf_counter()
+        for results in played:
+            for roll in results:
+                await async_round_recorder.record_round(db, user_id, game_id, wallet_id, [roll], nonce=roll["nonce"])
+        report("per roll", time.perf_counter() - start, total)
+
+        commits = statements = 0
+        start = time.perf_counter()
+        for results in played:
+            await async_round_recorder.record_rounds(db, user_id, game_id, wallet_id, results)
+        report("batch", time.perf_counter() - start, total)
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    ))
@@ -0,0 +1,87 @@
+"""
+Payout arithmetic: Decimal products vs integer minor units (cents)
+
+Run from casino/BackEnd:
+    python -m benchmarks.money [payouts]
+
+Both paths compute dice/mines-style payouts (stake x 4-place multiplier) and
+blackjack 3:2 payouts; the Decimal path quantizes to cents the way the
+Numeric(18, 2) column would.
+"""
+import os
+import random
+import sys
+import time
+from decimal import Decimal, ROUND_DOWN
+
+for key in ("DATABASE_URL", "SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "sqlite://" if key == "DATABASE_URL" else "bench")
+
+from app.utils.money import multiply, scale, to_cents, to_decimal
+
+CENT = Decimal("0.01")
+
+
+def decimal_path(stakes, multipliers) -> Decimal:
+    total = Decimal("0")
+    for stake, multiplier in zip(stakes, multipliers):
+        total += (stake * multiplier).quantize(CENT, rounding=ROUND_DOWN)
+        total += (stake * Decimal("2.5")).quantize(CENT, rounding=ROUND_DOWN)
+    return total
+
+
+def cents_from_decimal_path(stakes, multipliers) -> Decimal:
+    """Decimal stake and multiplier converted to cents on every payout (engine boundary)"""
+    total = 0
+    for stake, multiplier in zip(stakes, multipliers):
+        cents = to_cents(stake)
+        total += multiply(cents, multiplier)
+        total += scale(cents, 5, 2)
+    return to_decimal(total)
+
+
+def cents_path(stakes_cents, multiplier_units) -> Decimal:
+    """Stakes already in cents and multipliers in 1/10000 units"""
+    total = 0
+    for stake, units in zip(stakes_cents, multiplier_units):
+        total += scale(stake, units, 10000)
+        total += scale(stake, 5, 2)
+    return to_decimal(total)
+
+
+def int_path(stakes_cents, multiplier_units) -> Decimal:
+    """The same arithmetic inlined, as a floor for the helpers"""
+    total = 0
+    for stake, units in zip(stakes_cents, multiplier_units):
+        total += stake * units // 10000
+        total += stake * 5 // 2
+    return to_decimal(total)
+
+
+def main(payouts: int):
+    rng = random.Random(7)
+    stakes = [Decimal(rng.randint(1, 100000)).scaleb(-2) for _ in range(payouts)]
+    multipliers = [Decimal(rng.randint(10100, 990000)).scaleb(-4) for _ in range(payouts)]
+    stakes_cents = [to_cents(stake) for stake in stakes]
+    multiplier_units = [int(multiplier.scaleb(4)) for multiplier in multipliers]
+
+    runs = [
+        ("Decimal", lambda: decimal_path(stakes, multipliers)),
+        ("cents (from Decimal)", lambda: cents_from_decimal_path(stakes, multipliers)),
+        ("cents", lambda: cents_path(stakes_cents, multiplier_units)),
+        ("inline int", lambda: int_path(stakes_cents, multiplier_units)),
+    ]
+    totals = set()
+    print(f"{payouts} rounds, 2 payouts each")
+    for name, run in runs:
+        start = time.perf_counter()
+        total = run()
+        elapsed = time.perf_counter() - start
+        totals.add(total)
+        print(f"{name:<20} {elapsed / (2 * payouts) * 1e9:>8.1f} ns/payout  total={total}")
+
+    assert len(totals) == 1, "payout totals differ"
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,59 @@
+"""
+Login throughput (Argon2 verifications per second) against worker count
+
+Run from casino/BackEnd:
+    python -m benchmarks.password_hashing [logins]
+
+Compares verifying inline on the event loop with the PasswordHasher
+process pool at 1, 2, 4, ... up to os.cpu_count() workers.
+"""
+import asyncio
+import os
+import sys
+import time
+
+for key in ("DATABASE_URL", "SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "sqlite://" if key == "DATABASE_URL" else "bench")
+
+from app.utils.security import PasswordHasher, get_password_hash, verify_password
+
+
+async def inline_logins(hashed: str, logins: int) -> float:
+    start = time.perf_counter()
+    for _ in range(logins):
+        verify_password("correct horse battery staple", hashed)
+    return logins / (time.perf_counter() - start)
+
+
+async def pooled_logins(hashed: str, logins: int, workers: int) -> float:
+    hasher = PasswordHasher(max_workers=workers, max_pending=logins)
+    # Warm the pool so process start-up is not measured
+    await asyncio.gather(*(hasher.hash("warmup") for _ in range(workers)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        hasher.verify_and_update("correct horse battery staple", hashed)
+        for _ in range(logins)
+    ))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    return logins / elapsed
+
+
+async def main(logins: int):
+    cpus = os.cpu_count() or 1
+    hashed = get_password_hash("correct horse battery staple")
+    print(f"{cpus} CPUs, {logins} logins per run")
+    print(f"{'inline':<10} {await inline_logins(hashed, logins):>8.1f} logins/s (blocks the event loop)")
+
+    workers = 1
+    while True:
+        rate = await pooled_logins(hashed, logins, workers)
+        print(f"{workers:>2} workers {rate:>8.1f} logins/s")
+        if workers >= cpus:
+            break
+        workers = min(workers * 2, cpus)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 64))
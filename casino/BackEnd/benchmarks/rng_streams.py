@@ -0,0 +1,58 @@
+"""
+Draw throughput: shared module RNG vs per-engine EngineRandom streams
+
+Run from casino/BackEnd:
+    python -m benchmarks.rng_streams [draws]
+
+Also times creating a stream (one CSPRNG read plus seeding) and checks that
+a stored seed replays the same mines board and shoe order.
+"""
+import os
+import random
+import secrets
+import sys
+import time
+
+for key in ("DATABASE_URL", "SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "sqlite://" if key == "DATABASE_URL" else "bench")
+
+from app.services.game_engines.rng import EngineRandom
+from app.services.game_engines.mines_engine import MinesEngine
+from app.services.game_engines.blackjack_engine import Shoe
+
+
+def rate(draw, draws: int) -> float:
+    start = time.perf_counter()
+    for _ in range(draws):
+        draw(37)
+    return draws / (time.perf_counter() - start)
+
+
+def main(draws: int):
+    print(f"{draws} draws of randrange(37)")
+    print(f"{'module random':<16} {rate(random.randrange, draws):>14,.0f} draws/s")
+    print(f"{'EngineRandom':<16} {rate(EngineRandom().randrange, draws):>14,.0f} draws/s")
+    print(f"{'SystemRandom':<16} {rate(secrets.SystemRandom().randrange, draws):>14,.0f} draws/s")
+
+    streams = 20000
+    start = time.perf_counter()
+    for _ in range(streams):
+        EngineRandom()
+    print(f"{'new stream':<16} {(time.perf_counter() - start) / streams * 1e6:>14.2f} us")
+
+    engine = MinesEngine(num_mines=5)
+    engine.start_game()
+    replay = MinesEngine(num_mines=5)
+    replay.start_game(seed=engine.seed)
+    assert replay.mine_positions == engine.mine_positions
+
+    shoe = Shoe()
+    shoe.shuffle()
+    replayed = Shoe(seed=shoe.seed)
+    replayed.shuffle()
+    assert replayed.cards == shoe.cards
+    print("replay from stored seed: ok")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
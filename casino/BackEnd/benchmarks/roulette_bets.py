@@ -0,0 +1,119 @@
+"""
+RouletteEngine: if/elif bet checks vs compiled 37-bit masks
+
+Run from casino/BackEnd:
+    python -m benchmarks.roulette_bets [bets per slip] [slips]
+
+The legacy path is check_bet as it was before the mask tables (list scans
+for red/black, membership in the submitted list for inside bets). The
+compiled path validates the slip once and resolves each bet with a
+single bit test; both paths resolve the same slips against the same
+winning numbers.
+"""
+import os
+import random
+from decimal import Decimal
+import sys
+import time
+
+for key in ("DATABASE_URL", "SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "sqlite://" if key == "DATABASE_URL" else "bench")
+
+from app.services.game_engines.roulette_engine import (
+    RouletteEngine, INSIDE_BET_MASKS, OUTSIDE_BET_MASKS, RED_NUMBERS, BLACK_NUMBERS
+)
+
+ONE = Decimal("1")
+
+
+def legacy_check_bet(bet_type, bet_value, winning_number) -> bool:
+    if bet_type == "straight":
+        return int(bet_value) == winning_number
+    elif bet_type == "red":
+        return winning_number in RED_NUMBERS
+    elif bet_type == "black":
+        return winning_number in BLACK_NUMBERS
+    elif bet_type == "even":
+        return winning_number != 0 and winning_number % 2 == 0
+    elif bet_type == "odd":
+        return winning_number != 0 and winning_number % 2 == 1
+    elif bet_type == "low":
+        return 1 <= winning_number <= 18
+    elif bet_type == "high":
+        return 19 <= winning_number <= 36
+    elif bet_type == "dozen1":
+        return 1 <= winning_number <= 12
+    elif bet_type == "dozen2":
+        return 13 <= winning_number <= 24
+    elif bet_type == "dozen3":
+        return 25 <= winning_number <= 36
+    elif bet_type == "column1":
+        return winning_number > 0 and (winning_number - 1) % 3 == 0
+    elif bet_type == "column2":
+        return winning_number > 0 and (winning_number - 2) % 3 == 0
+    elif bet_type == "column3":
+        return winning_number > 0 and winning_number % 3 == 0
+    elif bet_type in ("split", "street", "corner", "line"):
+        numbers = bet_value if isinstance(bet_value, list) else []
+        return winning_number in numbers
+    return False
+
+
+def random_slip(rng: random.Random, size: int):
+    inside = [(bet_type, sorted(numbers)) for bet_type, table in INSIDE_BET_MASKS.items() for numbers in table]
+    slip = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.3:
+            slip.append({"bet_type": "straight", "bet_value": rng.randrange(37), "bet_amount": ONE})
+        elif kind < 0.6:
+            bet_type, numbers = rng.choice(inside)
+            slip.append({"bet_type": bet_type, "bet_value": numbers, "bet_amount": ONE})
+        else:
+            slip.append({"bet_type": rng.choice(list(OUTSIDE_BET_MASKS)), "bet_value": None, "bet_amount": ONE})
+    return slip
+
+
+def main(size: int, slips: int):
+    rng = random.Random(7)
+    engine = RouletteEngine(seed=7)
+    slip_set = [random_slip(rng, size) for _ in range(slips)]
+    winners = [rng.randrange(37) for _ in range(slips)]
+
+    start = time.perf_counter()
+    legacy = [
+        [legacy_check_bet(bet["bet_type"], bet["bet_value"], winner) for bet in slip]
+        for slip, winner in zip(slip_set, winners)
+    ]
+    legacy_time = (time.perf_counter() - start) / slips
+
+    start = time.perf_counter()
+    compiled_slips = [engine.compile_bets(slip) for slip in slip_set]
+    compile_time = (time.perf_counter() - start) / slips
+
+    start = time.perf_counter()
+    masked = [
+        [bool(mask >> winner & 1) for mask, _, _ in compiled]
+        for compiled, winner in zip(compiled_slips, winners)
+    ]
+    resolve_time = (time.perf_counter() - start) / slips
+
+    assert legacy == masked, "mask resolution disagrees with the legacy checks"
+
+    start = time.perf_counter()
+    for slip in slip_set:
+        engine.play_round(slip)
+    round_time = (time.perf_counter() - start) / slips
+
+    print(f"{slips} slips of {size} bets")
+    print(f"legacy check_bet      {legacy_time * 1e6:>9.1f} us/slip")
+    print(f"mask resolve          {resolve_time * 1e6:>9.1f} us/slip")
+    print(f"compile + validate    {compile_time * 1e6:>9.1f} us/slip")
+    print(f"full play_round       {round_time * 1e6:>9.1f} us/slip")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    )
@@ -0,0 +1,69 @@
+"""
+Roulette liability: per-number loop vs lane-packed Exposure
+
+Run from casino/BackEnd:
+    python -m benchmarks.roulette_liability [bets per slip] [slips]
+
+The naive path adds each bet's payout to a 37-entry list for every number
+it covers. Exposure keeps the 37 totals in 64-bit lanes of one int, so each
+bet is one multiply-add whatever it covers. Both start from compiled slips
+(validation is measured in benchmarks.roulette_bets) and must agree.
+"""
+import os
+import random
+import sys
+import time
+
+for key in ("DATABASE_URL", "SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "sqlite://" if key == "DATABASE_URL" else "bench")
+
+from app.services.game_engines.roulette_engine import RouletteEngine, Exposure
+from benchmarks.roulette_bets import random_slip
+
+
+def naive_exposure(compiled):
+    payouts = [0] * 37
+    staked = 0
+    for mask, stake_cents, returns in compiled:
+        payout = stake_cents * returns
+        for number in range(37):
+            if mask >> number & 1:
+                payouts[number] += payout
+        staked += stake_cents
+    return payouts, staked
+
+
+def main(size: int, slips: int):
+    rng = random.Random(11)
+    compiled_slips = [RouletteEngine.compile_bets(random_slip(rng, size)) for _ in range(slips)]
+
+    start = time.perf_counter()
+    naive = [naive_exposure(compiled) for compiled in compiled_slips]
+    naive_time = (time.perf_counter() - start) / slips
+
+    start = time.perf_counter()
+    packed = [Exposure.of(compiled) for compiled in compiled_slips]
+    packed_time = (time.perf_counter() - start) / slips
+
+    for (payouts, staked), exposure in zip(naive, packed):
+        assert payouts == exposure.per_number() and staked == exposure.staked
+
+    table = Exposure()
+    start = time.perf_counter()
+    for exposure in packed:
+        total = table + exposure
+        total.check_limits(10 ** 15, 10 ** 15)
+        table = total
+    check_time = (time.perf_counter() - start) / slips
+
+    print(f"{slips} slips of {size} bets")
+    print(f"naive per-number loop     {naive_time * 1e6:>9.1f} us/slip")
+    print(f"lane-packed Exposure      {packed_time * 1e6:>9.1f} us/slip")
+    print(f"table total + limit check {check_time * 1e6:>9.1f} us/slip")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 300,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    )
@@ -0,0 +1,88 @@
+"""
+Roulette slip storage: one Bet row per chip vs the compact packed slip
+
+Run from casino/BackEnd:
+    python -m benchmarks.roulette_slip_storage [bets per slip] [rounds]
+
+Records the same slips with record_round in both ROULETTE_SLIP_STORAGE
+modes and counts the bet rows inserted, the statements sent and the time
+per round, then reads one compact round back through get_slip. Uses a
+throwaway SQLite database unless DATABASE_URL is already set.
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+for key in ("SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "bench")
+
+from sqlalchemy import event, func, select
+from app.database import Base, engine, AsyncSessionLocal, async_engine
+from app.models.game import Bet
+from app.services.round_recorder import async_round_recorder
+from app.services.game_engines.roulette_engine import RouletteEngine
+from benchmarks.roulette_bets import random_slip
+from benchmarks.roulette_tables import setup
+
+statements = 0
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    statements += 1
+
+
+async def record(game_id, user_id, wallet_id, results, compact):
+    global statements
+    session_ids = []
+    async with AsyncSessionLocal() as db:
+        bet_rows = -await db.scalar(select(func.count(Bet.bet_id)))
+        statements = 0
+        start = time.perf_counter()
+        for bet_results in results:
+            session_id, _, _ = await async_round_recorder.record_round(
+                db, user_id, game_id, wallet_id, bet_results, compact=compact
+            )
+            session_ids.append(session_id)
+        elapsed = time.perf_counter() - start
+        round_statements = statements
+        bet_rows += await db.scalar(select(func.count(Bet.bet_id)))
+
+    rounds = len(results)
+    label = "compact" if compact else "rows"
+    print(
+        f"{label:<8} {bet_rows / rounds:>7.1f} bet rows/round "
+        f"{round_statements / rounds:>7.1f} statements/round {elapsed / rounds * 1e3:>8.2f} ms/round"
+    )
+    return session_ids
+
+
+async def main(size: int, rounds: int):
+    Base.metadata.create_all(engine)
+    game_id, [(user_id, wallet_id)] = setup(1)
+    rng = random.Random(1)
+    results = [RouletteEngine().play_round(random_slip(rng, size))["bet_results"] for _ in range(rounds)]
+
+    print(f"{rounds} rounds, {size} bets per slip")
+    await record(game_id, user_id, wallet_id, results, compact=False)
+    session_ids = await record(game_id, user_id, wallet_id, results, compact=True)
+
+    async with AsyncSessionLocal() as db:
+        bets = await async_round_recorder.get_slip(db, session_ids[0], user_id)
+    assert len(bets) == size and sum(bet["payout"] for bet in bets) == sum(bet["payout"] for bet in results[0])
+    print(f"get_slip on a compact round returned all {len(bets)} bets")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    ))
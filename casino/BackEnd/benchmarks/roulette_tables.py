@@ -0,0 +1,149 @@
+"""
+Roulette settlement: one private spin per slip vs one shared spin per table
+
+Run from casino/BackEnd:
+    python -m benchmarks.roulette_tables [players] [rounds]
+
+The private path records each player's slip with record_round (its own
+debit, inserts, credit and commit). The table path spins once and records
+every slip with record_table_round (stakes are debited and the slip's round
+opened at placement with open_slip, which is timed separately). Uses a throwaway SQLite database unless DATABASE_URL
+is already set; SQLite sends batched ORM inserts one row at a time, so the
+statement count of the settle step is lower on PostgreSQL.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+for key in ("SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "bench")
+
+from sqlalchemy import event
+from app.database import Base, engine, SessionLocal, AsyncSessionLocal, async_engine
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.models.wallet import Wallet, WalletType
+from app.models.game import Game
+from app.services.round_recorder import async_round_recorder
+from app.services.game_engines.roulette_engine import RouletteEngine, RouletteTable
+
+SLIP = [
+    {"bet_type": "red", "bet_value": None, "bet_amount": Decimal("1")},
+    {"bet_type": "straight", "bet_value": 17, "bet_amount": Decimal("1")},
+    {"bet_type": "corner", "bet_value": [1, 2, 4, 5], "bet_amount": Decimal("1")},
+]
+
+commits = 0
+statements = 0
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def _count_commit(conn):
+    global commits
+    commits += 1
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    statements += 1
+
+
+def setup(players: int):
+    db = SessionLocal()
+    tenant = Tenant(tenant_name="bench")
+    game = Game(game_name="Roulette", rtp_percent=Decimal("97.3"))
+    db.add_all([tenant, game])
+    db.flush()
+    users = [
+        User(first_name="bench", email=f"bench{index}@example.com", password="-", tenant_id=tenant.tenant_id)
+        for index in range(players)
+    ]
+    db.add_all(users)
+    db.flush()
+    wallets = [
+        Wallet(user_id=user.user_id, balance=Decimal("1000000"), type_of_wallet=WalletType.cash)
+        for user in users
+    ]
+    db.add_all(wallets)
+    db.commit()
+    players = [(user.user_id, wallet.wallet_id) for user, wallet in zip(users, wallets)]
+    game_id = game.game_id
+    db.close()
+    return game_id, players
+
+
+def report(label: str, elapsed: float, rounds: int, round_commits: int, round_statements: int):
+    print(
+        f"{label:<22} {round_commits / rounds:>7.1f} commits/round "
+        f"{round_statements / rounds:>7.1f} statements/round {elapsed / rounds * 1e3:>8.2f} ms/round"
+    )
+
+
+async def private_spins(game_id, players, rounds):
+    global commits, statements
+    commits = statements = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        async with AsyncSessionLocal() as db:
+            for user_id, wallet_id in players:
+                result = RouletteEngine().play_round(SLIP)
+                await async_round_recorder.record_round(db, user_id, game_id, wallet_id, result["bet_results"])
+    report("private spin per slip", time.perf_counter() - start, rounds, commits, statements)
+
+
+async def shared_table(game_id, players, rounds):
+    global commits, statements
+    placement = settlement = 0.0
+    placement_commits = placement_statements = settlement_commits = settlement_statements = 0
+    table = RouletteTable("bench", 1, 0)
+
+    for _ in range(rounds):
+        async with AsyncSessionLocal() as db:
+            commits = statements = 0
+            start = time.perf_counter()
+            for user_id, wallet_id in players:
+                compiled = RouletteEngine.compile_bets(SLIP)
+                session_id = await async_round_recorder.open_slip(db, user_id, game_id, wallet_id, SLIP)
+                table.slips.append({
+                    "user_id": user_id,
+                    "wallet_id": wallet_id,
+                    "session_id": session_id,
+                    "bets": SLIP,
+                    "compiled": compiled
+                })
+            placement += time.perf_counter() - start
+            placement_commits += commits
+            placement_statements += statements
+
+            commits = statements = 0
+            start = time.perf_counter()
+            result = table.spin(RouletteEngine(), 0)
+            await async_round_recorder.record_table_round(db, result["settlements"])
+            settlement += time.perf_counter() - start
+            settlement_commits += commits
+            settlement_statements += statements
+
+    report("table: place slips", placement, rounds, placement_commits, placement_statements)
+    report("table: settle round", settlement, rounds, settlement_commits, settlement_statements)
+
+
+async def main(players: int, rounds: int):
+    Base.metadata.create_all(engine)
+    game_id, players_list = setup(players)
+    print(f"{players} players x {rounds} rounds, {len(SLIP)} bets per slip")
+    await private_spins(game_id, players_list, rounds)
+    await shared_table(game_id, players_list, rounds)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    ))
@@ -0,0 +1,119 @@
+"""
+Commits per round: legacy per-step commits vs AsyncRoundRecorder
+
+Run from casino/BackEnd:
+    python -m benchmarks.round_commits [rounds]
+
+Uses a throwaway SQLite database unless DATABASE_URL is already set.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+for key in ("SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "bench")
+
+from sqlalchemy import event
+from app.database import Base, engine, SessionLocal, AsyncSessionLocal, async_engine
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.models.wallet import Wallet, WalletType
+from app.models.game import Game, GameSession, GameRound, Bet, BetStatus
+from app.services.wallet_service import async_wallet_service
+from app.services.round_recorder import async_round_recorder
+from app.services.game_engines.dice_engine import DiceEngine
+
+commits = 0
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def _count_commit(conn):
+    global commits
+    commits += 1
+
+
+async def legacy_round(db, user_id, game_id, wallet_id, result):
+    """The per-step flow the game routers used before the round recorder"""
+    await async_wallet_service.debit_wallet(db, wallet_id, result["bet_amount"])
+
+    session = GameSession(user_id=user_id, game_id=game_id)
+    db.add(session)
+    await db.commit()
+
+    round_obj = GameRound(session_id=session.session_id)
+    db.add(round_obj)
+    await db.commit()
+
+    bet_record = Bet(
+        round_id=round_obj.round_id,
+        wallet_id=wallet_id,
+        bet_amount=result["bet_amount"],
+        payout_amount=result["payout"],
+        bet_status=BetStatus.won if result["won"] else BetStatus.lost
+    )
+    db.add(bet_record)
+    await db.commit()
+
+    if result["payout"] > 0:
+        await async_wallet_service.credit_wallet(db, wallet_id, result["payout"])
+
+    session.ended_at = datetime.utcnow()
+    await db.commit()
+
+
+async def recorder_round(db, user_id, game_id, wallet_id, result):
+    await async_round_recorder.record_round(db, user_id, game_id, wallet_id, [result])
+
+
+async def run(label, play, rounds):
+    global commits
+    user_id, game_id, wallet_id = setup()
+    dice = DiceEngine()
+
+    async with AsyncSessionLocal() as db:
+        commits = 0
+        start = time.perf_counter()
+        for nonce in range(rounds):
+            result = dice.play_round(Decimal("1.00"), 50.0, True, "bench-server", "bench-client", nonce)
+            await play(db, user_id, game_id, wallet_id, result)
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{label:<14} {commits / rounds:>6.2f} commits/round  "
+        f"{rounds / elapsed:>9.1f} rounds/s"
+    )
+
+
+def setup():
+    db = SessionLocal()
+    tenant = Tenant(tenant_name="bench")
+    db.add(tenant)
+    db.flush()
+    user = User(first_name="bench", email=f"bench{time.time_ns()}@example.com", password="-", tenant_id=tenant.tenant_id)
+    game = Game(game_name="Dice", rtp_percent=Decimal("99.0"))
+    db.add_all([user, game])
+    db.flush()
+    wallet = Wallet(user_id=user.user_id, balance=Decimal("1000000"), type_of_wallet=WalletType.cash)
+    db.add(wallet)
+    db.commit()
+    created = (user.user_id, game.game_id, wallet.wallet_id)
+    db.close()
+    return created
+
+
+async def main(rounds: int):
+    Base.metadata.create_all(engine)
+    await run("legacy", legacy_round, rounds)
+    await run("RoundRecorder", recorder_round, rounds)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
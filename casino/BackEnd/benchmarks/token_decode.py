@@ -0,0 +1,53 @@
+"""
+Access-token decode cost: HS256 verification vs the verified-token cache
+
+Run from casino/BackEnd:
+    python -m benchmarks.token_decode [requests] [clients]
+
+Simulates polling clients that resend the same token on every request.
+"""
+import os
+import sys
+import time
+from datetime import timedelta
+
+for key in ("DATABASE_URL", "SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "sqlite://" if key == "DATABASE_URL" else "bench")
+
+from jose import jwt
+from app.config import settings
+from app.utils.security import create_access_token, decode_access_token
+from app.utils.token_cache import token_cache
+
+
+def main(requests: int, clients: int):
+    tokens = [
+        create_access_token(
+            {"sub": str(user_id), "tenant_id": 1, "role": "player", "ver": 0},
+            expires_delta=timedelta(minutes=30)
+        )
+        for user_id in range(clients)
+    ]
+
+    start = time.perf_counter()
+    for i in range(requests):
+        jwt.decode(tokens[i % clients], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    uncached = time.perf_counter() - start
+
+    token_cache.clear()
+    start = time.perf_counter()
+    for i in range(requests):
+        assert decode_access_token(tokens[i % clients]) is not None
+    cached = time.perf_counter() - start
+
+    print(f"{requests} requests from {clients} clients")
+    print(f"jwt.decode          {uncached / requests * 1e6:>8.2f} us/request")
+    print(f"decode_access_token {cached / requests * 1e6:>8.2f} us/request")
+    print(f"cache stats         {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    )
@@ -0,0 +1,134 @@
+"""
+Concurrency check for both wallet engines
+
+Run from casino/BackEnd:
+    python -m benchmarks.wallet_concurrency [threads] [ops_per_thread]
+
+Hammers a handful of wallets with concurrent debits, credits and transfers
+in both directions, then checks that no balance went negative and that the
+total matches the committed credits and debits. Exits non-zero on a
+mismatch. Point DATABASE_URL at PostgreSQL for real row locking; the
+default throwaway SQLite database has no FOR UPDATE, so the locking engine
+is expected to lose updates there and only the conditional engine is
+checked (tests/test_wallet_service.py skips it the same way).
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+)
+for key in ("SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "bench")
+
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+from app.database import Base, engine, SessionLocal
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.models.wallet import Wallet, WalletType
+from app.models import game  # noqa: F401 (registers relationship targets)
+from app.services.wallet_service import WalletService, ConditionalWalletService
+
+NUM_WALLETS = 4
+START_BALANCE = Decimal("100.00")
+
+
+def setup() -> list[int]:
+    db = SessionLocal()
+    tenant = Tenant(tenant_name="bench")
+    db.add(tenant)
+    db.flush()
+    user = User(first_name="bench", email=f"bench{time.time_ns()}@example.com", password="-", tenant_id=tenant.tenant_id)
+    db.add(user)
+    db.flush()
+    wallets = [
+        Wallet(user_id=user.user_id, balance=START_BALANCE, type_of_wallet=WalletType.cash)
+        for _ in range(NUM_WALLETS)
+    ]
+    db.add_all(wallets)
+    db.commit()
+    wallet_ids = [wallet.wallet_id for wallet in wallets]
+    db.close()
+    return wallet_ids
+
+
+def run(label: str, service: WalletService, threads: int, ops: int) -> bool:
+    wallet_ids = setup()
+    lock = threading.Lock()
+    stats = {"net": Decimal("0"), "ok": 0, "rejected": 0, "aborted": 0}
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        db = SessionLocal()
+        for _ in range(ops):
+            amount = Decimal(rng.randint(1, 2500)) / 100
+            op = rng.choice(("debit", "credit", "transfer"))
+            net = Decimal("0")
+            try:
+                if op == "debit":
+                    service.debit_wallet(db, rng.choice(wallet_ids), amount)
+                    net = -amount
+                elif op == "credit":
+                    service.credit_wallet(db, rng.choice(wallet_ids), amount)
+                    net = amount
+                else:
+                    from_id, to_id = rng.sample(wallet_ids, 2)
+                    service.transfer_between_wallets(db, from_id, to_id, amount)
+                outcome = "ok"
+            except HTTPException:
+                db.rollback()
+                outcome = "rejected"
+            except OperationalError:
+                # Lock timeout / deadlock victim: rolled back, nothing applied
+                db.rollback()
+                outcome = "aborted"
+            with lock:
+                stats[outcome] += 1
+                if outcome == "ok":
+                    stats["net"] += net
+        db.close()
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    balances = [
+        db.query(Wallet.balance).filter(Wallet.wallet_id == wallet_id).scalar()
+        for wallet_id in wallet_ids
+    ]
+    db.close()
+
+    expected = START_BALANCE * NUM_WALLETS + stats["net"]
+    consistent = sum(balances) == expected and min(balances) >= 0
+
+    print(
+        f"{label:<12} {threads * ops / elapsed:>8.1f} ops/s  ok={stats['ok']} "
+        f"rejected={stats['rejected']} aborted={stats['aborted']}  "
+        f"total={sum(balances)} expected={expected}  {'OK' if consistent else 'MISMATCH'}"
+    )
+    return consistent
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    ops = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    Base.metadata.create_all(engine)
+    locking_ok = run("locking", WalletService(), threads, ops)
+    conditional_ok = run("conditional", ConditionalWalletService(), threads, ops)
+    if engine.dialect.name == "sqlite":
+        # SQLite ignores FOR UPDATE, so the locking engine can lose updates there
+        print("note: locking engine result is informational on SQLite (no row locks)")
+        locking_ok = True
+    sys.exit(0 if locking_ok and conditional_ok else 1)
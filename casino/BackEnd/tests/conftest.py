@@ -0,0 +1,79 @@
+"""
+Shared fixtures
+
+Tests run against a throwaway SQLite database unless DATABASE_URL is
+already set (point it at PostgreSQL to exercise real row locking).
+"""
+import asyncio
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+for key in ("SECRET_KEY", "SMTP_HOST", "SMTP_USER", "SMTP_PASSWORD", "SMTP_FROM"):
+    os.environ.setdefault(key, "test")
+
+import pytest
+from app.database import Base, engine, SessionLocal, async_engine
+from app.models.tenant import Tenant
+from app.models.user import User, UserType
+from app.models.wallet import Wallet, WalletType
+from app.models import game  # noqa: F401 (registers relationship targets)
+
+
+def run(coroutine):
+    """Run a coroutine on a fresh event loop, then drop pooled async connections bound to it"""
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def player():
+    """A fresh active player with a cash wallet; returns (user_id, tenant_id, wallet_id)"""
+    def create(balance: Decimal = Decimal("1000.00")):
+        db = SessionLocal()
+        tenant = Tenant(tenant_name="test")
+        db.add(tenant)
+        db.flush()
+        user = User(
+            first_name="test",
+            email=f"player{time.time_ns()}@example.com",
+            password="-",
+            role=UserType.player,
+            tenant_id=tenant.tenant_id,
+            is_active=True
+        )
+        db.add(user)
+        db.flush()
+        wallet = Wallet(user_id=user.user_id, balance=balance, type_of_wallet=WalletType.cash)
+        db.add(wallet)
+        db.commit()
+        created = (user.user_id, tenant.tenant_id, wallet.wallet_id)
+        db.close()
+        return created
+
+    return create
+
+
+def balance(wallet_id: int) -> Decimal:
+    db = SessionLocal()
+    try:
+        return db.get(Wallet, wallet_id).balance
+    finally:
+        db.close()
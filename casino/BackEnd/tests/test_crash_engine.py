@@ -0,0 +1,27 @@
+from decimal import Decimal
+from app.services.game_engines.crash_engine import CrashGame
+
+SEED = {
+    "seed_pair_id": 3,
+    "server_seed": "server",
+    "server_seed_hash": "hash",
+    "client_seed": "client",
+    "nonce": 7
+}
+
+
+def test_state_round_trips_through_json():
+    game = CrashGame("round-1", SEED)
+    game.add_player_bet(1, Decimal("10.00"), Decimal("1.50"))
+    game.add_player_bet(2, Decimal("2.50"))
+    game.start_game()
+    game.current_multiplier = Decimal("1.2345678")
+    game.cash_out_player(2)
+
+    restored = CrashGame.from_bytes(game.to_bytes())
+
+    assert restored.to_bytes() == game.to_bytes()
+    assert restored.crash_point == game.crash_point
+    assert restored.current_multiplier == Decimal("1.2345678")
+    assert restored.players == game.players
+    assert restored.get_game_result() == game.get_game_result()
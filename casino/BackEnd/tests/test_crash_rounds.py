@@ -0,0 +1,54 @@
+"""Crash joins driven through the router functions"""
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from app.models.game import BetStatus
+from app.routers.games import crash
+from app.services.game_state_store import game_state_store
+from tests.conftest import balance, run
+from tests.test_game_rounds import as_user, call, outcomes
+from tests.test_seed_pair_service import settled
+
+BET = Decimal("10.00")
+
+
+def test_concurrent_first_joiners_share_one_round(player):
+    users = [as_user(*player()[:2]) for _ in range(4)]
+    joined = []
+
+    async def join(user):
+        joined.append(await call(crash.join_crash_game, crash.CrashBetInput(bet_amount=BET), current_user=user))
+
+    async def scenario():
+        await game_state_store.delete(crash.CURRENT_NAMESPACE, crash.CURRENT_KEY)
+        statuses = await outcomes(*(join(user) for user in users))
+        current = await crash._load_game(await crash._current_game_id())
+        return statuses, current
+
+    statuses, current = run(scenario())
+    assert statuses == [200] * len(users)
+    assert {result["game_id"] for result in joined} == {current.game_id}
+    assert sorted(current.players) == sorted(user.user_id for user in users)
+
+
+def test_failed_join_cancels_the_round(player, monkeypatch):
+    monkeypatch.setattr(crash.CrashGame, "add_player_bet", lambda self, *args, **kwargs: False)
+    user_id, tenant_id, wallet_id = player()
+    opened = []
+    original_open_round = crash.async_round_recorder.open_round
+
+    async def open_round(*args, **kwargs):
+        opened.append(await original_open_round(*args, **kwargs))
+        return opened[-1]
+
+    monkeypatch.setattr(crash.async_round_recorder, "open_round", open_round)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as failed:
+            await call(crash.join_crash_game, crash.CrashBetInput(bet_amount=BET), current_user=as_user(user_id, tenant_id))
+        return failed.value.status_code
+
+    assert run(scenario()) == 400
+    session_id, _ = opened[0]
+    assert settled(session_id) == (True, BetStatus.cancelled)
+    assert balance(wallet_id) == Decimal("1000.00")
@@ -0,0 +1,64 @@
+import json
+from decimal import Decimal
+from app.database import AsyncSessionLocal
+from app.routers.games import dice
+from app.services import round_recorder
+from app.services.wallet_service import AsyncConditionalWalletService
+from tests.conftest import balance, run
+from tests.test_game_rounds import as_user, outcomes
+
+
+def amount(value) -> Decimal:
+    return Decimal(str(value))
+
+
+def martingale(rolls: int = 50) -> dice.DiceAutobetInput:
+    return dice.DiceAutobetInput(
+        bet_amount=Decimal("1.00"), target=50.0, roll_over=True, rolls=rolls, on_loss=Decimal("2")
+    )
+
+
+async def autobet(user, autobet_data: dice.DiceAutobetInput):
+    """Play an autobet request and return its summary line"""
+    async with AsyncSessionLocal() as db:
+        response = await dice.autobet_dice(autobet_data, current_user=user, db=db)
+        lines = [json.loads(line) async for line in response.body_iterator]
+    return lines[-1]["summary"]
+
+
+def test_wallet_ends_at_stakes_less_payouts(player):
+    user_id, tenant_id, wallet_id = player(Decimal("20.00"))
+
+    summary = run(autobet(as_user(user_id, tenant_id), martingale()))
+
+    assert summary["rolls"] > 0
+    assert balance(wallet_id) == Decimal("20.00") - amount(summary["total_bet"]) + amount(summary["total_payout"])
+    assert amount(summary["total_bet"]) - amount(summary["total_payout"]) <= Decimal("20.00")
+
+
+def test_short_balance_plays_nothing(player):
+    user_id, tenant_id, wallet_id = player(Decimal("0.50"))
+
+    summary = run(autobet(as_user(user_id, tenant_id), martingale()))
+
+    assert (summary["rolls"], summary["stop_reason"], summary["session_id"]) == (0, "insufficient_balance", None)
+    assert balance(wallet_id) == Decimal("0.50")
+
+
+def test_concurrent_autobets_cannot_stake_the_same_funds(player, monkeypatch):
+    # Conditional debits are atomic on SQLite too, where row locks are no-ops
+    conditional = AsyncConditionalWalletService()
+    monkeypatch.setattr(dice, "async_wallet_service", conditional)
+    monkeypatch.setattr(round_recorder, "async_wallet_service", conditional)
+    user_id, tenant_id, wallet_id = player(Decimal("10.00"))
+    user = as_user(user_id, tenant_id)
+    summaries = []
+
+    async def play():
+        summaries.append(await autobet(user, martingale()))
+
+    statuses = run(outcomes(play(), play()))
+
+    assert set(statuses) <= {200, 400}
+    net = sum(amount(s["total_payout"]) - amount(s["total_bet"]) for s in summaries)
+    assert balance(wallet_id) == Decimal("10.00") + net >= 0
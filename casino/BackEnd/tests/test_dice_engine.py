@@ -0,0 +1,69 @@
+import hashlib
+from decimal import Decimal
+import pytest
+from app.services.game_engines.dice_engine import MULTIPLIERS, TARGET_STEPS, WIN_CHANCES, DiceEngine, target_step
+
+
+def legacy_roll(server_seed: str, client_seed: str, nonce: int) -> float:
+    """The roll derivation used before seed pairs"""
+    digest = hashlib.sha256(f"{server_seed}:{client_seed}:{nonce}".encode()).hexdigest()
+    return round((int(digest[:8], 16) % 10000) / 100, 2)
+
+
+def test_rolls_made_before_seed_pairs_still_verify():
+    engine = DiceEngine()
+    for nonce in range(20):
+        claimed = legacy_roll("server", "client", nonce)
+        assert engine.roll_dice("server", "client", nonce, "sha256") == claimed
+        assert engine.verify_roll("server", "client", nonce, claimed, algorithm="sha256")
+
+
+def test_default_algorithm_is_the_seed_pair_stream():
+    engine = DiceEngine()
+    rolls = [engine.roll_dice("server", "client", nonce) for nonce in range(20)]
+    assert rolls == [engine.roll_dice("server", "client", nonce, "hmac-sha256") for nonce in range(20)]
+    assert rolls != [legacy_roll("server", "client", nonce) for nonce in range(20)]
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        DiceEngine().roll_dice("server", "client", 0, "md5")
+
+
+def formula_multiplier(target: float, roll_over: bool) -> Decimal:
+    """calculate_multiplier as it was before the tables, for every target"""
+    win_chance = (100 - target) / 100 if roll_over else target / 100
+    if win_chance <= 0 or win_chance >= 1:
+        return Decimal("0")
+    return ((Decimal("1") - Decimal("0.01")) / Decimal(str(win_chance))).quantize(Decimal("0.0001"))
+
+
+# Exact ties at the fourth decimal that the float win chance tipped the other way
+FLOAT_TIES = {
+    (True, 42.4): Decimal("1.7188"),
+    (True, 85.92): Decimal("7.0312"),
+    (True, 93.6): Decimal("15.4688"),
+    (True, 98.72): Decimal("77.3438"),
+    (False, 57.6): Decimal("1.7188"),
+}
+
+
+@pytest.mark.parametrize("roll_over", [True, False])
+def test_tables_match_the_formula_on_every_target(roll_over):
+    engine = DiceEngine()
+    for step in range(TARGET_STEPS):
+        target = step / 100
+        assert target_step(target) == step
+        expected = FLOAT_TIES.get((roll_over, target)) or formula_multiplier(target, roll_over)
+        assert MULTIPLIERS[roll_over][step] == expected, target
+        assert WIN_CHANCES[roll_over][step] == pytest.approx(100 - target if roll_over else target)
+        assert engine.calculate_multiplier(target, roll_over) == MULTIPLIERS[roll_over][step]
+
+
+def test_off_grid_targets_fall_back_to_the_formula():
+    engine = DiceEngine()
+    assert target_step(50.005) is None
+    assert target_step(100) is None
+    assert engine.calculate_multiplier(50.005) == formula_multiplier(50.005, True)
+    assert engine.calculate_multiplier(100, False) == Decimal("0")
+    assert engine.win_chance(50.005, False) == 50.005
@@ -0,0 +1,53 @@
+"""Recorded rounds replay from the stream seed stored on GameRound"""
+from decimal import Decimal
+from app.config import settings
+from app.database import SessionLocal
+from app.models.game import GameRound
+from app.routers.games import blackjack, roulette, slots
+from app.services.game_engines.blackjack_engine import BlackjackEngine, Shoe
+from app.services.game_engines.roulette_engine import RouletteEngine
+from app.services.game_engines.slots_engine import SlotsEngine
+from tests.conftest import run
+from tests.test_game_rounds import as_user, call
+
+BETS = [
+    {"bet_type": "straight", "bet_value": 17, "bet_amount": Decimal("1.00")},
+    {"bet_type": "red", "bet_value": None, "bet_amount": Decimal("2.00")},
+]
+
+
+def stream_seed(session_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(GameRound).filter(GameRound.session_id == session_id).one().stream_seed
+    finally:
+        db.close()
+
+
+def test_roulette_spin_replays(player):
+    user = as_user(*player()[:2])
+    spin = roulette.RouletteSpinInput(bets=[roulette.RouletteBetInput(**bet) for bet in BETS])
+
+    result = run(call(roulette.spin_roulette, spin, current_user=user))
+    replayed = RouletteEngine(seed=stream_seed(result["session_id"])).play_round(BETS, settings.roulette_limits)
+
+    assert replayed["winning_number"] == result["winning_number"]
+    assert replayed["total_payout"] == result["total_payout"]
+
+
+def test_slots_spin_replays(player):
+    user = as_user(*player()[:2])
+
+    result = run(call(slots.spin_slots, slots.SlotsSpinInput(bet_amount=Decimal("1.00")), current_user=user))
+    replayed = SlotsEngine(seed=stream_seed(result["session_id"])).play_round(Decimal("1.00"))
+
+    assert (replayed["grid"], replayed["payout"]) == (result["grid"], result["payout"])
+
+
+def test_blackjack_deal_replays(player):
+    user = as_user(*player()[:2])
+
+    result = run(call(blackjack.start_blackjack_game, Decimal("10.00"), current_user=user))
+    engine = BlackjackEngine(shoe=Shoe(settings.BLACKJACK_DECKS, seed=stream_seed(result["session_id"])))
+
+    assert engine.start_game()["player_hand"] == result["game_state"]["player_hand"]
@@ -0,0 +1,110 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.config import settings
+from app.routers.games import fairness
+from app.services.game_engines import fair_verification
+from app.services.game_engines.crash_engine import CrashEngine
+from app.services.game_engines.dice_engine import DiceEngine
+from app.services.game_engines.fair_verification import verify_record, verify_stream
+from tests.conftest import run
+from app.services.game_engines.mines_engine import MinesEngine
+
+SEEDS = {"server_seed": "server", "client_seed": "client", "nonce": 7}
+
+
+def valid_records():
+    return [
+        dict(SEEDS, game="dice", claimed=DiceEngine().roll_dice("server", "client", 7)),
+        dict(SEEDS, game="crash", claimed=float(CrashEngine().generate_crash_point("server", "client", 7))),
+        dict(SEEDS, game="mines", num_mines=5, claimed=MinesEngine.place_mines("server", "client", 7, 25, 5)),
+    ]
+
+
+def test_valid_records_match():
+    assert [verify_record(record) for record in valid_records()] == [None, None, None]
+
+
+def test_tampered_records_report_the_actual_outcome():
+    dice, crash, mines = valid_records()
+    dice["claimed"] = round((dice["claimed"] + 1) % 100, 2)
+    crash["claimed"] = crash["claimed"] + 1
+    mines["claimed"] = [position + 1 for position in mines["claimed"]]
+
+    for record in (dice, crash, mines):
+        mismatch = verify_record(dict(record))
+        assert set(mismatch) == {"actual"}
+        assert mismatch["actual"] != record["claimed"]
+
+
+@pytest.mark.parametrize("fields", [
+    {"grid_size": 200},
+    {"grid_size": 1, "num_mines": 1},
+    {"num_mines": 0},
+    {"num_mines": 25},
+    {"num_mines": -3},
+    {"grid_size": "abc"},
+    {"claimed": 5},
+    {"server_seed": None, "nonce": "x"},
+])
+def test_malformed_mines_records_become_errors(fields):
+    record = dict(valid_records()[2], **fields)
+    assert set(verify_record(record)) == {"error"}
+
+
+def test_malformed_record_does_not_end_the_stream():
+    records = valid_records()
+    records.insert(1, dict(records[2], grid_size=1000))
+    records.append({"game": "mines"})
+
+    mismatches = list(verify_stream(records, workers=2, chunk_size=2, executor_class=ThreadPoolExecutor))
+
+    assert [mismatch["index"] for mismatch in mismatches] == [1, 4]
+    assert all("error" in mismatch for mismatch in mismatches)
+
+
+def request(body: bytes, chunk_size: int = 64):
+    """A request whose body arrives in chunks; returns it with the chunks not yet read"""
+    chunks = [body[start:start + chunk_size] for start in range(0, len(body), chunk_size)]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    return Request({"type": "http", "method": "POST", "headers": []}, receive), messages
+
+
+def test_oversized_body_is_refused_while_reading(monkeypatch):
+    monkeypatch.setattr(settings, "FAIR_VERIFY_MAX_BYTES", 256)
+    body = "\n".join(json.dumps(record) for record in valid_records() * 20).encode()
+    verify_request, unread = request(body)
+
+    with pytest.raises(HTTPException) as refused:
+        run(fairness.verify_outcomes(verify_request, current_user=None))
+
+    assert refused.value.status_code == 413
+    assert unread
+
+
+def test_api_verifies_on_the_shared_process_pool():
+    records = valid_records()
+    records[0]["claimed"] = round((records[0]["claimed"] + 1) % 100, 2)
+    body = "\n".join(json.dumps(record) for record in records).encode()
+
+    async def scenario():
+        response = await fairness.verify_outcomes(request(body)[0], current_user=None)
+        return [json.loads(line) async for line in response.body_iterator]
+
+    try:
+        lines = run(scenario())
+        assert fair_verification._pool is not None
+    finally:
+        fair_verification.shutdown_pool()
+
+    assert [line["index"] for line in lines[:-1]] == [0]
+    assert lines[-1]["summary"]["verified"] == 3
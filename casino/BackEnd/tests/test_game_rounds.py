@@ -0,0 +1,157 @@
+"""
+Mines and blackjack rounds driven through the router functions, in both
+GAME_STATE_MODE settings
+"""
+import asyncio
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.game import BetStatus
+from app.models.user import UserType
+from app.routers.games import blackjack, mines
+from app.services.game_catalog import game_catalog
+from app.services.game_engines.mines_engine import MinesEngine
+from app.services.game_state_store import game_state_store
+from app.services.round_recorder import async_round_recorder
+from app.utils.game_state_token import game_state_tokens
+from app.utils.user_cache import AuthenticatedUser
+from tests.conftest import balance, run
+
+BET = Decimal("10.00")
+
+
+@pytest.fixture(params=["store", "token"])
+def mode(request, monkeypatch):
+    monkeypatch.setattr(settings, "GAME_STATE_MODE", request.param)
+    return request.param
+
+
+def as_user(user_id: int, tenant_id: int) -> AuthenticatedUser:
+    return AuthenticatedUser(user_id=user_id, role=UserType.player, tenant_id=tenant_id, is_active=True)
+
+
+async def call(endpoint, *args, **kwargs):
+    """Call a router function with its own database session, as a request would"""
+    async with AsyncSessionLocal() as db:
+        return await endpoint(*args, db=db, **kwargs)
+
+
+async def outcomes(*calls):
+    """Run requests concurrently; HTTP errors come back as their status code"""
+    # Connect once first: the engine's one-time first-connect setup holds a
+    # thread lock, so racing it from two requests on one loop deadlocks
+    async with AsyncSessionLocal() as db:
+        await db.connection()
+
+    results = []
+    for result in await asyncio.gather(*calls, return_exceptions=True):
+        if isinstance(result, HTTPException):
+            results.append(result.status_code)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            results.append(200)
+    return results
+
+
+async def peek_board(session_id: int, state_token) -> MinesEngine:
+    if state_token is None:
+        return MinesEngine.from_bytes(await game_state_store.get(mines.GAME_NAMESPACE, str(session_id)))
+    return MinesEngine.from_bytes(game_state_tokens.open(mines.GAME_NAMESPACE, session_id, 0, state_token))
+
+
+def test_mines_round_trip_and_single_cashout(mode, player):
+    user_id, tenant_id, wallet_id = player()
+    user = as_user(user_id, tenant_id)
+
+    async def scenario():
+        started = await call(mines.start_mines_game, mines.MinesStartInput(bet_amount=BET, num_mines=1), current_user=user)
+        session_id, token = started["session_id"], started["state_token"]
+
+        board = await peek_board(session_id, token)
+        safe = next(position for position in range(board.grid_size) if position not in board.mine_positions)
+        revealed = await call(
+            mines.reveal_tile, session_id, mines.MinesRevealInput(position=safe), current_user=user, state_token=token
+        )
+        token = revealed["state_token"]
+        state = await call(mines.get_game_state, session_id, current_user=user, state_token=token)
+
+        cashouts = await outcomes(*(
+            call(mines.cashout_mines, session_id, current_user=user, state_token=token) for _ in range(2)
+        ))
+        return revealed["result"], state["game_state"], cashouts
+
+    result, state, cashouts = run(scenario())
+    assert not result["game_over"]
+    assert state["revealed"] == result["revealed"]
+    assert sorted(cashouts) == [200, 400 if mode == "store" else 409]
+    payout = (BET * Decimal(str(result["multiplier"]))).quantize(Decimal("0.01"))
+    assert balance(wallet_id) == Decimal("1000.00") - BET + payout
+
+
+def test_mines_failed_action_keeps_the_board(mode, player):
+    user_id, tenant_id, _ = player()
+    user = as_user(user_id, tenant_id)
+
+    async def scenario():
+        started = await call(mines.start_mines_game, mines.MinesStartInput(bet_amount=BET, num_mines=1), current_user=user)
+        session_id, token = started["session_id"], started["state_token"]
+        with pytest.raises(HTTPException) as refused:
+            await call(mines.cashout_mines, session_id, current_user=user, state_token=token)
+        # Nothing was committed, so the same board (and token) still plays
+        board = await peek_board(session_id, token)
+        safe = next(position for position in range(board.grid_size) if position not in board.mine_positions)
+        revealed = await call(
+            mines.reveal_tile, session_id, mines.MinesRevealInput(position=safe), current_user=user, state_token=token
+        )
+        return refused.value.status_code, revealed["result"]
+
+    status_code, result = run(scenario())
+    assert status_code == 400
+    assert not result["game_over"]
+
+
+def start_open_hand(player):
+    """A started hand that is not a natural (each attempt gets a fresh player)"""
+    while True:
+        user_id, tenant_id, wallet_id = player()
+        user = as_user(user_id, tenant_id)
+        started = run(call(blackjack.start_blackjack_game, BET, current_user=user))
+        if not started["game_state"]["game_over"]:
+            return user, wallet_id, started
+
+
+def test_blackjack_round_trip_and_single_stand(mode, player):
+    user, wallet_id, started = start_open_hand(player)
+    session_id = started["session_id"]
+
+    async def scenario():
+        stands = await outcomes(*(
+            call(blackjack.stand, session_id, current_user=user, state_token=started["state_token"]) for _ in range(2)
+        ))
+        async with AsyncSessionLocal() as db:
+            bet = await async_round_recorder.get_round_bet(db, session_id)
+        return stands, bet
+
+    stands, bet = run(scenario())
+    assert sorted(stands) == [200, 400 if mode == "store" else 409]
+    assert balance(wallet_id) == Decimal("1000.00") - BET + bet.payout_amount
+
+
+def test_settle_round_rejects_a_second_settle(player):
+    user_id, _, wallet_id = player()
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            game_id = await game_catalog.get_game_id(db, "Mines")
+            session_id, _ = await async_round_recorder.open_round(db, user_id, game_id, wallet_id, BET)
+            await async_round_recorder.settle_round(db, session_id, BET * 2, BetStatus.won)
+            with pytest.raises(HTTPException) as refused:
+                await async_round_recorder.settle_round(db, session_id, BET * 2, BetStatus.won)
+            await db.rollback()
+            return refused.value.status_code
+
+    assert run(scenario()) == 409
+    assert balance(wallet_id) == Decimal("1000.00") + BET
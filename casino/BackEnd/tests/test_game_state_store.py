@@ -0,0 +1,91 @@
+import asyncio
+import fakeredis.aioredis
+import pytest
+from app.services import game_state_store as store_module
+from app.services.game_state_store import GameStateStore, InMemoryGameStateStore, RedisGameStateStore
+from tests.conftest import run
+
+
+def increment(data):
+    return str(int(data or b"0") + 1).encode()
+
+
+def test_in_memory_update_is_atomic():
+    store = InMemoryGameStateStore()
+
+    async def scenario():
+        await asyncio.gather(*(store.update("game", "1", increment, None) for _ in range(100)))
+        return await store.get("game", "1")
+
+    assert run(scenario()) == b"100"
+
+
+@pytest.mark.parametrize("make_store", [
+    InMemoryGameStateStore,
+    lambda: RedisGameStateStore(client=fakeredis.aioredis.FakeRedis())
+], ids=["memory", "redis"])
+def test_take_hands_the_value_to_one_caller(make_store):
+    store = make_store()
+
+    async def scenario():
+        await store.set("game", "1", b"state", None)
+        taken = await asyncio.gather(*(store.take("game", "1") for _ in range(5)))
+        return taken, await store.get("game", "1")
+
+    taken, left = run(scenario())
+    assert sorted(taken, key=bool) == [None] * 4 + [b"state"]
+    assert left is None
+
+
+def test_in_memory_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(store_module.time, "monotonic", lambda: now[0])
+    store = InMemoryGameStateStore()
+
+    async def scenario():
+        await store.set("game", "short", b"a", 10)
+        await store.set("game", "kept", b"b", None)
+        await store.update("game", "updated", increment, 10)
+        now[0] += 10
+        return (
+            await store.get("game", "short"),
+            await store.get("game", "updated"),
+            await store.keys("game")
+        )
+
+    assert run(scenario()) == (None, None, ["kept"])
+
+
+def test_in_memory_evicts_least_recently_used():
+    store = InMemoryGameStateStore(max_entries=2)
+
+    async def scenario():
+        await store.set("game", "1", b"a", 60)
+        await store.set("game", "2", b"b", 60)
+        await store.get("game", "1")
+        await store.set("game", "3", b"c", 60)
+        return sorted(await store.keys("game"))
+
+    assert run(scenario()) == ["1", "3"]
+
+
+def test_in_memory_never_evicts_entries_without_ttl():
+    store = InMemoryGameStateStore(max_entries=1)
+
+    async def scenario():
+        await store.set("seed_pair", "1", b"nonce", None)
+        for key in range(3):
+            await store.set("game", str(key), b"board", 60)
+        await store.update("seed_pair", "2", increment, None)
+        return await store.get("seed_pair", "1"), await store.keys("seed_pair"), await store.keys("game")
+
+    assert run(scenario()) == (b"nonce", ["1", "2"], ["2"])
+
+
+def test_incomplete_backend_fails_on_construction():
+    class GetOnly(GameStateStore):
+        async def get(self, namespace, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnly()
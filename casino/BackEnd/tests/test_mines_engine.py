@@ -0,0 +1,45 @@
+from decimal import Decimal
+import pytest
+from app.services.game_engines.mines_engine import MinesEngine, multiplier_table
+
+
+def formula_multiplier(grid_size: int, num_mines: int, num_revealed: int) -> Decimal:
+    """calculate_multiplier as it was before the tables, recomputed on every reveal"""
+    if num_revealed == 0:
+        return Decimal("1.0")
+    if grid_size - num_revealed <= 0:
+        return Decimal("1.0")
+
+    multiplier = Decimal("1.0")
+    for i in range(num_revealed):
+        tiles_left = grid_size - i
+        safe_left = grid_size - num_mines - i
+        if safe_left > 0 and tiles_left > 0:
+            multiplier *= (Decimal(str(tiles_left)) / Decimal(str(safe_left))) * Decimal("0.98")
+    return multiplier.quantize(Decimal("0.01"))
+
+
+@pytest.mark.parametrize("grid_size", [4, 9, 16, 25, 36, 64])
+def test_table_matches_the_formula(grid_size):
+    table = multiplier_table(grid_size)
+
+    assert len(table) == grid_size
+    for num_mines in range(1, grid_size):
+        assert len(table[num_mines]) == grid_size - num_mines + 1
+        for num_revealed in range(grid_size - num_mines + 1):
+            assert table[num_mines][num_revealed] == formula_multiplier(grid_size, num_mines, num_revealed), (
+                num_mines, num_revealed
+            )
+
+
+def test_table_is_built_once_per_grid():
+    assert multiplier_table(25) is multiplier_table(25)
+
+
+def test_engine_reads_the_table_as_tiles_are_revealed():
+    engine = MinesEngine(grid_size=25, num_mines=3)
+    engine.start_game(mine_positions=[0, 1, 2])
+
+    for count, position in enumerate(range(3, 8), start=1):
+        engine.reveal_tile(position)
+        assert engine.calculate_multiplier() == formula_multiplier(25, 3, count)
@@ -0,0 +1,48 @@
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP
+from fractions import Fraction
+import pytest
+from app.utils.money import Rounding, multiply, scale, to_cents, to_decimal
+
+DECIMAL_ROUNDING = {
+    Rounding.down: ROUND_DOWN,
+    Rounding.half_up: ROUND_HALF_UP,
+    Rounding.half_even: ROUND_HALF_EVEN,
+}
+
+
+def test_to_cents_and_back():
+    assert to_cents(Decimal("10.50")) == 1050
+    assert to_cents(10) == 1000
+    assert to_cents(0.1) == 10
+    assert to_cents("19.8") == 1980
+    assert to_cents(Decimal("0.005")) == 1
+    assert to_cents(Decimal("0.005"), Rounding.half_even) == 0
+    assert to_cents(Fraction(1, 3)) == 33
+    assert to_decimal(1050) == Decimal("10.50")
+    assert str(to_decimal(-5)) == "-0.05"
+
+
+@pytest.mark.parametrize("rounding", list(Rounding))
+@pytest.mark.parametrize("cents", [0, 1, 5, 15, 25, 333, 1001, -15, -25, -333])
+@pytest.mark.parametrize("numerator, denominator", [(5, 2), (3, 2), (1, 3), (99, 50), (1, 1)])
+def test_scale_matches_decimal_quantize(cents, numerator, denominator, rounding):
+    exact = Decimal(cents) * numerator / denominator
+    expected = int(exact.quantize(Decimal("1"), rounding=DECIMAL_ROUNDING[rounding]))
+    assert scale(cents, numerator, denominator, rounding) == expected
+
+
+def test_scale_defaults_to_rounding_down():
+    assert scale(15, 5, 2) == 37  # 3:2 blackjack on 0.15
+    assert scale(-15, 5, 2) == -37
+
+
+def test_multiply_is_exact_for_decimal_and_float_multipliers():
+    assert multiply(1000, 2) == 2000
+    assert multiply(1000, Decimal("1.98")) == 1980
+    assert multiply(1000, 1.98) == 1980  # Shortest repr, not 1.97999...
+    assert multiply(333, Decimal("1.5")) == 499
+    assert multiply(333, Decimal("1.5"), Rounding.half_up) == 500
+    assert multiply(1, Decimal("2.5"), Rounding.half_even) == 2
+    assert multiply(3, Decimal("2.5"), Rounding.half_even) == 8
+    assert multiply(100, "1.005") == 100
+    assert multiply(100, Fraction(2, 3), Rounding.half_up) == 67
@@ -0,0 +1,120 @@
+import fakeredis.aioredis
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.utils import rate_limiter
+from app.utils.rate_limiter import AuthThrottle, InMemoryRateLimitBackend, RedisRateLimitBackend
+from tests.conftest import run
+
+
+class Clock:
+    """Stand-in for time.monotonic / time.time that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    monkeypatch.setattr(rate_limiter.time, "time", clock)
+    return clock
+
+
+def request_from(ip: str) -> Request:
+    return Request({"type": "http", "method": "POST", "path": "/auth/login", "headers": [], "client": (ip, 1234)})
+
+
+def test_bucket_allows_burst_then_refuses(clock):
+    backend = InMemoryRateLimitBackend()
+
+    async def scenario():
+        return [await backend.take("key", 3, 1.0) for _ in range(4)]
+
+    results = run(scenario())
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert results[-1][1] == pytest.approx(1.0)
+
+
+def test_bucket_refills_over_time(clock):
+    backend = InMemoryRateLimitBackend()
+
+    async def scenario():
+        for _ in range(2):
+            await backend.take("key", 2, 0.5)
+        refused = await backend.take("key", 2, 0.5)
+        clock.now += 1.0  # Half a token
+        still_refused = await backend.take("key", 2, 0.5)
+        clock.now += 1.0  # A whole token
+        allowed = await backend.take("key", 2, 0.5)
+        clock.now += 3600  # Never refills past capacity
+        burst = [await backend.take("key", 2, 0.5) for _ in range(3)]
+        return refused, still_refused, allowed, burst
+
+    refused, still_refused, allowed, burst = run(scenario())
+    assert not refused[0]
+    assert not still_refused[0]
+    assert allowed[0]
+    assert [allowed for allowed, _ in burst] == [True, True, False]
+
+
+def test_buckets_are_independent_and_bounded(clock):
+    backend = InMemoryRateLimitBackend(max_keys=2)
+
+    async def scenario():
+        await backend.take("a", 1, 0.1)
+        other = await backend.take("b", 1, 0.1)
+        await backend.take("c", 1, 0.1)  # Evicts "a", the least recently used
+        return other, await backend.take("a", 1, 0.1)
+
+    other, evicted = run(scenario())
+    assert other[0]
+    assert evicted[0]
+
+
+def test_throttle_returns_429_with_retry_after(clock):
+    throttle = AuthThrottle(InMemoryRateLimitBackend(), ip_burst=2, ip_per_minute=6, email_burst=5, email_per_minute=5)
+
+    async def scenario():
+        for _ in range(2):
+            await throttle.check(request_from("10.0.0.1"), "login")
+        with pytest.raises(HTTPException) as refused:
+            await throttle.check(request_from("10.0.0.1"), "login")
+        # Another client IP has its own bucket
+        await throttle.check(request_from("10.0.0.2"), "login")
+        return refused.value
+
+    refused = run(scenario())
+    assert refused.status_code == 429
+    assert refused.headers["Retry-After"] == "10"
+
+
+def test_throttle_limits_email_across_ips(clock):
+    throttle = AuthThrottle(InMemoryRateLimitBackend(), ip_burst=10, ip_per_minute=10, email_burst=2, email_per_minute=1)
+
+    async def scenario():
+        await throttle.check(request_from("10.0.0.1"), "login", "Player@Example.com")
+        await throttle.check(request_from("10.0.0.2"), "login", "player@example.com")
+        with pytest.raises(HTTPException) as refused:
+            await throttle.check(request_from("10.0.0.3"), "login", "PLAYER@example.com")
+        return refused.value
+
+    assert run(scenario()).status_code == 429
+
+
+def test_redis_backend_matches_in_memory(clock):
+    backend = RedisRateLimitBackend(None, client=fakeredis.aioredis.FakeRedis())
+
+    async def scenario():
+        burst = [await backend.take("key", 2, 0.5) for _ in range(3)]
+        clock.now += 2.0
+        return burst, await backend.take("key", 2, 0.5)
+
+    burst, refilled = run(scenario())
+    assert [allowed for allowed, _ in burst] == [True, True, False]
+    assert burst[-1][1] == pytest.approx(2.0)
+    assert refilled[0]
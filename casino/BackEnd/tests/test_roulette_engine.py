@@ -0,0 +1,113 @@
+from decimal import Decimal
+import pytest
+from app.services.game_engines.roulette_engine import (
+    BLACK_NUMBERS, INSIDE_BET_MASKS, RED_NUMBERS, Exposure, RouletteEngine, RouletteTable, compile_bet, number_mask
+)
+
+SLIP = [
+    {"bet_type": "straight", "bet_value": 17, "bet_amount": Decimal("1.00")},
+    {"bet_type": "split", "bet_value": [17, 20], "bet_amount": Decimal("2.50")},
+    {"bet_type": "red", "bet_value": None, "bet_amount": Decimal("10.00")},
+]
+
+
+def open_table() -> RouletteTable:
+    table = RouletteTable("main", 4, 1000.0)
+    table.add_slip(1, 11, SLIP, 0.0, session_id=101)
+    table.add_slip(2, 12, SLIP[2:], 0.0, session_id=102)
+    return table
+
+
+def test_open_round_round_trips_through_json():
+    table = open_table()
+    restored = RouletteTable.from_bytes(table.to_bytes())
+
+    assert restored.to_bytes() == table.to_bytes()
+    assert (restored.round_number, restored.closes_at) == (4, 1000.0)
+    assert restored.slips == table.slips
+    assert restored.exposure.per_number() == table.exposure.per_number()
+    assert restored.exposure.staked == table.exposure.staked
+
+
+def test_restored_table_spins_the_same_and_keeps_the_result():
+    table = open_table()
+    restored = RouletteTable.from_bytes(table.to_bytes())
+
+    result = table.spin(RouletteEngine(seed=5), 2000.0)
+    assert restored.spin(RouletteEngine(seed=5), 2000.0) == result
+
+    assert [settlement["session_id"] for settlement in result["settlements"]] == [101, 102]
+    assert result["recorded"] is False
+
+    reloaded = RouletteTable.from_bytes(table.to_bytes())
+    assert reloaded.last_result == result
+    assert (reloaded.round_number, reloaded.slips, reloaded.exposure.staked) == (5, [], 0)
+
+
+def covered(mask: int) -> set:
+    return {number for number in range(37) if mask >> number & 1}
+
+
+def test_outside_bets_compile_to_their_numbers():
+    assert covered(compile_bet("red")) == set(RED_NUMBERS)
+    assert covered(compile_bet("black")) == set(BLACK_NUMBERS)
+    assert covered(compile_bet("even")) == set(range(2, 37, 2))
+    assert covered(compile_bet("dozen2")) == set(range(13, 25))
+    assert covered(compile_bet("column3")) == set(range(3, 37, 3))
+    assert covered(compile_bet("straight", 0)) == {0}
+    assert covered(compile_bet("straight", "17")) == {17}
+
+
+def test_inside_bets_cover_every_legal_group_once():
+    counts = {bet_type: len(groups) for bet_type, groups in INSIDE_BET_MASKS.items()}
+    assert counts == {"split": 60, "street": 14, "corner": 23, "line": 11}
+
+    assert covered(compile_bet("split", [20, 17])) == {17, 20}
+    assert covered(compile_bet("split", (0, 3))) == {0, 3}
+    assert covered(compile_bet("street", [34, 35, 36])) == {34, 35, 36}
+    assert covered(compile_bet("corner", [0, 1, 2, 3])) == {0, 1, 2, 3}
+    assert compile_bet("line", list(range(31, 37))) == number_mask(range(31, 37))
+
+
+@pytest.mark.parametrize("bet_type, bet_value", [
+    ("split", [1, 5]),
+    ("split", [3, 4]),
+    ("split", [1, 1]),
+    ("split", [1, 2, 3]),
+    ("street", [2, 3, 4]),
+    ("street", [1, 4, 7]),
+    ("corner", [1, 2, 3, 4]),
+    ("line", list(range(2, 8))),
+    ("split", "1,2"),
+    ("split", None),
+    ("street", ["a", "b", "c"]),
+    ("straight", 37),
+    ("straight", None),
+    ("basket", [0, 1, 2]),
+])
+def test_illegal_bets_are_rejected(bet_type, bet_value):
+    with pytest.raises(ValueError):
+        compile_bet(bet_type, bet_value)
+
+
+def test_exposure_matches_settling_every_number():
+    compiled = RouletteEngine.compile_bets(SLIP)
+    exposure = Exposure.of(compiled)
+
+    for number in range(37):
+        settled = RouletteEngine().settle_bets(SLIP, compiled, number)
+        assert exposure.per_number()[number] == int(settled["total_payout"] * 100)
+    assert exposure.staked == 1350
+    assert exposure.max_payout() == 3600 + 250 * 18  # 17 is black
+    assert (Exposure.of(compiled[:1]) + Exposure.of(compiled[1:])).per_number() == exposure.per_number()
+
+
+def test_check_limits_per_number_and_table():
+    exposure = Exposure.of(RouletteEngine.compile_bets(SLIP))
+    worst = exposure.max_payout()
+
+    exposure.check_limits(worst, worst - 1350)
+    with pytest.raises(ValueError, match="Bets on 17"):
+        exposure.check_limits(worst - 1, worst)
+    with pytest.raises(ValueError, match="maximum liability"):
+        exposure.check_limits(worst, worst - 1351)
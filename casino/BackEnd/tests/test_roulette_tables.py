@@ -0,0 +1,165 @@
+"""
+Shared-wheel table slips: opened with their debit, settled once, refunded
+when they never reach a table
+"""
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.game import GameSession, GameRound, Bet, BetStatus
+from app.services import roulette_table_service
+from app.services.game_catalog import game_catalog
+from app.services.game_engines.roulette_engine import RouletteTable
+from app.services.game_state_store import game_state_store
+from app.services.round_recorder import async_round_recorder
+from app.services.roulette_table_service import RouletteTableService
+from tests.conftest import balance, run
+
+SLIP = [
+    {"bet_type": "red", "bet_value": None, "bet_amount": Decimal("10.00")},
+    {"bet_type": "split", "bet_value": [1, 2], "bet_amount": Decimal("5.00")},
+]
+
+
+@pytest.fixture(params=["rows", "compact"])
+def storage(request, monkeypatch):
+    monkeypatch.setattr(settings, "ROULETTE_SLIP_STORAGE", request.param)
+    return request.param
+
+
+def new_service() -> RouletteTableService:
+    return RouletteTableService([f"table{time.time_ns()}"], 60)
+
+
+def slip_round(session_id: int):
+    """(session closed, bet statuses, stream seed) of a slip's round"""
+    db = SessionLocal()
+    try:
+        session = db.get(GameSession, session_id)
+        round_obj = db.query(GameRound).filter(GameRound.session_id == session_id).one()
+        bets = db.query(Bet).filter(Bet.round_id == round_obj.round_id).order_by(Bet.bet_id).all()
+        return session.ended_at is not None, [bet.bet_status for bet in bets], round_obj.stream_seed
+    finally:
+        db.close()
+
+
+async def place(service: RouletteTableService, user_id: int, wallet_id: int) -> int:
+    async with AsyncSessionLocal() as db:
+        placed = await service.place_slip(db, service.table_ids[0], user_id, wallet_id, SLIP)
+    return placed["session_id"]
+
+
+async def close_window(service: RouletteTableService):
+    def closed(data):
+        table = RouletteTable.from_bytes(data)
+        table.closes_at = 0
+        return table.to_bytes()
+
+    await game_state_store.update(service.NAMESPACE, service.table_ids[0], closed, None)
+
+
+def test_placed_slip_is_recorded_with_its_debit(storage, player):
+    user_id, _, wallet_id = player()
+    service = new_service()
+
+    session_id = run(place(service, user_id, wallet_id))
+
+    assert balance(wallet_id) == Decimal("985.00")
+    closed, statuses, _ = slip_round(session_id)
+    assert not closed
+    assert set(statuses) == {BetStatus.placed}
+
+
+def test_slip_is_refunded_when_the_table_update_fails(player, monkeypatch):
+    user_id, _, wallet_id = player()
+    service = new_service()
+
+    async def failing_update(*args, **kwargs):
+        raise RuntimeError("store down")
+
+    monkeypatch.setattr(game_state_store, "update", failing_update)
+    with pytest.raises(RuntimeError):
+        run(place(service, user_id, wallet_id))
+
+    assert balance(wallet_id) == Decimal("1000.00")
+
+
+def test_closed_window_refunds_the_slip(player):
+    user_id, _, wallet_id = player()
+    service = new_service()
+    run(place(service, user_id, wallet_id))
+    run(close_window(service))
+
+    with pytest.raises(HTTPException) as rejected:
+        run(place(service, user_id, wallet_id))
+
+    assert rejected.value.status_code == 400
+    assert balance(wallet_id) == Decimal("985.00")
+
+
+def test_unrecorded_spin_is_kept_and_retried(storage, player, monkeypatch):
+    user_id, _, wallet_id = player()
+    service = new_service()
+    session_id = run(place(service, user_id, wallet_id))
+    run(close_window(service))
+
+    record_table_round = async_round_recorder.record_table_round
+
+    async def failing_record(*args, **kwargs):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(service, "RECORD_ATTEMPTS", 1)
+    monkeypatch.setattr(roulette_table_service.async_round_recorder, "record_table_round", failing_record)
+    (result,) = run(service.settle_due_tables())
+    assert run(service.settle_due_tables()) == []
+
+    table = run(service.get_table(service.table_ids[0]))
+    assert table.round_number == result["round_number"] + 1
+    assert table.last_result["recorded"] is False
+    assert not slip_round(session_id)[0]
+
+    monkeypatch.setattr(roulette_table_service.async_round_recorder, "record_table_round", record_table_round)
+    run(service.settle_due_tables())
+
+    assert run(service.get_table(service.table_ids[0])).last_result["recorded"] is True
+    closed, statuses, stream_seed = slip_round(session_id)
+    assert closed
+    assert BetStatus.placed not in statuses
+    assert stream_seed == result["seed"]
+    payout = result["settlements"][0]["total_payout"]
+    assert balance(wallet_id) == Decimal("985.00") + payout
+
+    # A second recording of the same spin pays nothing
+    run(service._record(service.table_ids[0], result))
+    assert balance(wallet_id) == Decimal("985.00") + payout
+
+
+def test_slip_missing_from_every_table_is_refunded(player):
+    user_id, _, wallet_id = player()
+    service = new_service()
+
+    async def orphan():
+        async with AsyncSessionLocal() as db:
+            game_id = await game_catalog.get_game_id(db, "Roulette")
+            return await async_round_recorder.open_slip(db, user_id, game_id, wallet_id, SLIP)
+
+    session_id = run(orphan())
+    db = SessionLocal()
+    db.execute(
+        update(GameSession)
+        .where(GameSession.session_id == session_id)
+        .values(started_at=datetime.utcnow() - timedelta(seconds=3 * service.window_seconds))
+    )
+    db.commit()
+    db.close()
+
+    run(service.settle_due_tables())
+
+    closed, statuses, _ = slip_round(session_id)
+    assert closed
+    assert set(statuses) == {BetStatus.cancelled}
+    assert balance(wallet_id) == Decimal("1000.00")
@@ -0,0 +1,81 @@
+"""
+Roulette slips recorded as one Bet per chip or packed on the round
+"""
+from decimal import Decimal
+import pytest
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.game import GameRound, Bet, BetStatus
+from app.services.game_catalog import game_catalog
+from app.services.game_engines.roulette_engine import RouletteEngine
+from app.services.round_recorder import async_round_recorder, pack_slip, unpack_slip
+from tests.conftest import balance, run
+
+SLIP = [
+    {"bet_type": "straight", "bet_value": 17, "bet_amount": Decimal("1.00")},
+    {"bet_type": "split", "bet_value": [17, 20], "bet_amount": Decimal("2.50")},
+    {"bet_type": "red", "bet_value": None, "bet_amount": Decimal("10.00")},
+]
+
+
+def test_pack_slip_round_trips_in_cents():
+    bet_results = RouletteEngine().settle_bets(SLIP, RouletteEngine.compile_bets(SLIP), 17)["bet_results"]
+    packed = pack_slip(bet_results)
+
+    assert packed["bets"] == [
+        ["straight", 17, 100, 3600],
+        ["split", [17, 20], 250, 4500],
+        ["red", None, 1000, 0],
+    ]
+    assert unpack_slip(packed) == [
+        {
+            "bet_type": bet["bet_type"],
+            "bet_value": bet["bet_value"],
+            "bet_amount": bet["bet_amount"],
+            "payout": bet["payout"],
+            "won": bet["won"]
+        }
+        for bet in bet_results
+    ]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_get_slip_reads_either_storage(compact, player):
+    user_id, _, wallet_id = player()
+    bet_results = RouletteEngine().settle_bets(SLIP, RouletteEngine.compile_bets(SLIP), 17)["bet_results"]
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            game_id = await game_catalog.get_game_id(db, "Roulette")
+            session_id, round_id, bet_ids = await async_round_recorder.record_round(
+                db, user_id, game_id, wallet_id, bet_results, compact=compact
+            )
+            return session_id, round_id, bet_ids, (
+                await async_round_recorder.get_slip(db, session_id),
+                await async_round_recorder.get_slip(db, session_id, user_id),
+                await async_round_recorder.get_slip(db, session_id, user_id + 1)
+            )
+
+    session_id, round_id, bet_ids, (slip, own_slip, other_slip) = run(scenario())
+
+    assert slip == own_slip
+    assert other_slip is None
+    assert [(bet["bet_amount"], bet["payout"], bet["won"]) for bet in slip] == [
+        (Decimal("1.00"), Decimal("36.00"), True),
+        (Decimal("2.50"), Decimal("45.00"), True),
+        (Decimal("10.00"), Decimal("0.00"), False),
+    ]
+    assert balance(wallet_id) == Decimal("1000.00") - Decimal("13.50") + Decimal("81.00")
+
+    db = SessionLocal()
+    try:
+        bets = db.query(Bet).filter(Bet.round_id == round_id).all()
+        assert (db.get(GameRound, round_id).slip is not None) == compact
+    finally:
+        db.close()
+    if compact:
+        assert [slip_bet["bet_type"] for slip_bet in slip] == ["straight", "split", "red"]
+        assert [(bet.bet_amount, bet.payout_amount, bet.bet_status) for bet in bets] == [
+            (Decimal("13.50"), Decimal("81.00"), BetStatus.won)
+        ]
+    else:
+        assert len(bets) == len(bet_ids) == 3
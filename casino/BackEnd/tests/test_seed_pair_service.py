@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.models.game import Bet, BetStatus, GameRound, GameSession
+from app.routers.games import mines
+from app.services.game_state_store import game_state_store
+from app.services.game_catalog import game_catalog
+from app.services.round_recorder import async_round_recorder
+from app.services.seed_pair_service import seed_pairs
+from tests.conftest import run
+from tests.test_game_rounds import as_user, call
+
+BET = Decimal("1.00")
+
+
+async def open_round(db, user_id: int, wallet_id: int):
+    """Open a mines-style round on the next nonce of the player's pair"""
+    seed = await seed_pairs.draw(db, user_id)
+    game_id = await game_catalog.get_game_id(db, "Mines")
+    session_id, _ = await async_round_recorder.open_round(
+        db, user_id, game_id, wallet_id, BET, seed_pair_id=seed["seed_pair_id"], nonce=seed["nonce"]
+    )
+    return seed, session_id
+
+
+def abandon(session_id: int):
+    """Backdate a session past the game state TTL"""
+    db = SessionLocal()
+    db.execute(
+        update(GameSession)
+        .where(GameSession.session_id == session_id)
+        .values(started_at=datetime.utcnow() - timedelta(seconds=settings.GAME_STATE_TTL_SECONDS + 60))
+    )
+    db.commit()
+    db.close()
+
+
+def settled(session_id: int):
+    """(session closed, bet status) of a round"""
+    db = SessionLocal()
+    try:
+        session = db.get(GameSession, session_id)
+        bet = db.query(Bet).join(GameRound).filter(GameRound.session_id == session_id).one()
+        return session.ended_at is not None, bet.bet_status
+    finally:
+        db.close()
+
+
+def test_rotate_waits_for_open_rounds(player):
+    user_id, _, wallet_id = player()
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            seed, session_id = await open_round(db, user_id, wallet_id)
+            with pytest.raises(HTTPException) as refused:
+                await seed_pairs.rotate(db, user_id)
+            still_active = await seed_pairs.get_active(db, user_id)
+
+            await async_round_recorder.settle_round(db, session_id, Decimal("0"), BetStatus.lost)
+            rotated = await seed_pairs.rotate(db, user_id)
+            return seed, refused.value.status_code, still_active, rotated
+
+    seed, status_code, still_active, rotated = run(scenario())
+    assert status_code == 409
+    assert still_active["seed_pair_id"] == seed["seed_pair_id"]
+    assert rotated["previous"]["server_seed"] == seed["server_seed"]
+    assert rotated["previous"]["nonce"] == seed["nonce"] + 1
+    assert rotated["active"]["seed_pair_id"] != seed["seed_pair_id"]
+
+
+def test_round_cannot_open_on_a_rotated_pair(player):
+    user_id, _, wallet_id = player()
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            seed = await seed_pairs.draw(db, user_id)
+            await seed_pairs.rotate(db, user_id)
+            game_id = await game_catalog.get_game_id(db, "Mines")
+            with pytest.raises(HTTPException) as refused:
+                await async_round_recorder.open_round(
+                    db, user_id, game_id, wallet_id, BET, seed_pair_id=seed["seed_pair_id"], nonce=seed["nonce"]
+                )
+            return refused.value.status_code
+
+    assert run(scenario()) == 409
+
+
+def test_rotate_forfeits_abandoned_rounds(player):
+    user_id, _, wallet_id = player()
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            seed, session_id = await open_round(db, user_id, wallet_id)
+        abandon(session_id)
+        async with AsyncSessionLocal() as db:
+            rotated = await seed_pairs.rotate(db, user_id)
+        return seed, session_id, rotated
+
+    seed, session_id, rotated = run(scenario())
+    assert rotated["previous"]["seed_pair_id"] == seed["seed_pair_id"]
+    assert settled(session_id) == (True, BetStatus.lost)
+
+
+def test_expired_mines_board_is_forfeited(player, monkeypatch):
+    monkeypatch.setattr(settings, "GAME_STATE_MODE", "store")
+    user_id, tenant_id, _ = player()
+    user = as_user(user_id, tenant_id)
+
+    async def scenario():
+        started = await call(mines.start_mines_game, mines.MinesStartInput(bet_amount=BET), current_user=user)
+        session_id = started["session_id"]
+        # Evicted by the store TTL
+        await game_state_store.delete(mines.GAME_NAMESPACE, str(session_id))
+        abandon(session_id)
+
+        with pytest.raises(HTTPException) as expired:
+            await call(mines.reveal_tile, session_id, mines.MinesRevealInput(position=0), current_user=user)
+        closed = settled(session_id)
+        async with AsyncSessionLocal() as db:
+            rotated = await seed_pairs.rotate(db, user_id)
+        return started, expired.value.status_code, closed, rotated
+
+    started, status_code, closed, rotated = run(scenario())
+    assert status_code == 400
+    assert closed == (True, BetStatus.lost)
+    assert rotated["previous"]["seed_pair_id"] == started["seed_pair_id"]
@@ -0,0 +1,39 @@
+import fakeredis
+import fakeredis.aioredis
+from app.utils.token_revocation import RedisTokenRevocationList, TokenRevocationList
+from tests.conftest import run
+
+
+def test_in_memory_revocation():
+    async def scenario():
+        revocations = TokenRevocationList(60)
+        await revocations.revoke(1, 3)
+        await revocations.revoke(1, 2)  # A late, older revocation does not lower it
+        return [await revocations.is_revoked(1, version) for version in (2, 3)], await revocations.is_revoked(2, 0)
+
+    assert run(scenario()) == ([True, False], False)
+
+
+def test_in_memory_revocation_expires():
+    async def scenario():
+        revocations = TokenRevocationList(0)
+        await revocations.revoke(1, 3)
+        return await revocations.is_revoked(1, 2)
+
+    assert run(scenario()) is False
+
+
+def test_redis_revocation_reaches_every_worker():
+    server = fakeredis.FakeServer()
+
+    async def scenario():
+        # Two workers, each with its own client to the same Redis
+        admin_worker = RedisTokenRevocationList(None, 60, client=fakeredis.aioredis.FakeRedis(server=server))
+        other_worker = RedisTokenRevocationList(None, 60, client=fakeredis.aioredis.FakeRedis(server=server))
+
+        before = await other_worker.is_revoked(7, 0)
+        await admin_worker.revoke(7, 1)
+        await admin_worker.revoke(7, 0)
+        return before, await other_worker.is_revoked(7, 0), await other_worker.is_revoked(7, 1)
+
+    assert run(scenario()) == (False, True, False)
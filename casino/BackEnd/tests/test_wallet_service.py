@@ -0,0 +1,94 @@
+import threading
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+from app.database import engine, SessionLocal
+from app.services.wallet_service import WalletService, ConditionalWalletService
+from tests.conftest import balance
+
+START_BALANCE = Decimal("100.00")
+DEBIT = Decimal("1.00")
+THREADS = 8
+DEBITS_PER_THREAD = 25  # 200 debits against a balance that covers 100
+
+locking_needs_row_locks = pytest.mark.skipif(
+    engine.dialect.name == "sqlite",
+    reason="SQLite ignores SELECT ... FOR UPDATE, so the locking engine can lose updates there"
+)
+
+
+def debit_concurrently(service: WalletService, wallet_id: int) -> dict:
+    """Debit from every thread at once; returns how many debits committed, were refused or aborted"""
+    outcomes = {"ok": 0, "rejected": 0, "aborted": 0}
+    lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def worker():
+        db = SessionLocal()
+        start.wait()
+        for _ in range(DEBITS_PER_THREAD):
+            try:
+                service.debit_wallet(db, wallet_id, DEBIT)
+                outcome = "ok"
+            except HTTPException as e:
+                assert e.detail == "Insufficient balance"
+                db.rollback()
+                outcome = "rejected"
+            except OperationalError:
+                # Lock timeout: rolled back, nothing applied
+                db.rollback()
+                outcome = "aborted"
+            with lock:
+                outcomes[outcome] += 1
+        db.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+@pytest.mark.parametrize("service", [
+    ConditionalWalletService(),
+    pytest.param(WalletService(), marks=locking_needs_row_locks),
+], ids=["conditional", "locking"])
+def test_concurrent_debits_never_overdraw(service, player):
+    _, _, wallet_id = player(START_BALANCE)
+
+    outcomes = debit_concurrently(service, wallet_id)
+
+    assert sum(outcomes.values()) == THREADS * DEBITS_PER_THREAD
+    assert outcomes["rejected"] > 0
+    final = balance(wallet_id)
+    assert final >= 0
+    # Every committed debit, and only those, came off the balance
+    assert final == START_BALANCE - outcomes["ok"] * DEBIT
+
+
+def test_conditional_debit_refuses_short_balance(player):
+    _, _, wallet_id = player(Decimal("5.00"))
+    db = SessionLocal()
+    try:
+        with pytest.raises(HTTPException) as refused:
+            ConditionalWalletService.debit_wallet(db, wallet_id, Decimal("5.01"))
+        assert refused.value.status_code == 400
+        db.rollback()
+
+        ConditionalWalletService.debit_wallet(db, wallet_id, Decimal("5.00"))
+    finally:
+        db.close()
+    assert balance(wallet_id) == 0
+
+
+def test_conditional_debit_missing_wallet():
+    db = SessionLocal()
+    try:
+        with pytest.raises(HTTPException) as missing:
+            ConditionalWalletService.debit_wallet(db, 10 ** 9, Decimal("1.00"))
+        assert missing.value.status_code == 404
+    finally:
+        db.close()
@@ -1,27 +1,51 @@
 import api from "./axios";
 
+// Sealed game state returned when the server runs in token mode,
+// sent back with the next action on the same session
+const stateTokens = {};
+
+const stateHeaders = (game, sessionId) => {
+  const token = stateTokens[`${game}:${sessionId}`];
+  return token ? { "X-Game-State": token } : {};
+};
+
+const keepStateToken = (game, sessionId, data) => {
+  if (data.state_token) {
+    stateTokens[`${game}:${sessionId}`] = data.state_token;
+  } else {
+    delete stateTokens[`${game}:${sessionId}`];
+  }
+  return data;
+};
+
 // Blackjack
 export const blackjackAPI = {
   startGame: async (betAmount) => {
     const response = await api.post("/games/blackjack/start", null, {
       params: { bet_amount: betAmount },
     });
-    return response.data;
+    return keepStateToken("blackjack", response.data.session_id, response.data);
   },
 
   hit: async (sessionId) => {
-    const response = await api.post(`/games/blackjack/${sessionId}/hit`);
-    return response.data;
+    const response = await api.post(`/games/blackjack/${sessionId}/hit`, null, {
+      headers: stateHeaders("blackjack", sessionId),
+    });
+    return keepStateToken("blackjack", sessionId, response.data);
   },
 
   stand: async (sessionId) => {
-    const response = await api.post(`/games/blackjack/${sessionId}/stand`);
-    return response.data;
+    const response = await api.post(`/games/blackjack/${sessionId}/stand`, null, {
+      headers: stateHeaders("blackjack", sessionId),
+    });
+    return keepStateToken("blackjack", sessionId, response.data);
   },
 
   doubleDown: async (sessionId) => {
-    const response = await api.post(`/games/blackjack/${sessionId}/double`);
-    return response.data;
+    const response = await api.post(`/games/blackjack/${sessionId}/double`, null, {
+      headers: stateHeaders("blackjack", sessionId),
+    });
+    return keepStateToken("blackjack", sessionId, response.data);
   },
 };
 
@@ -36,21 +60,76 @@ export const rouletteAPI = {
     const response = await api.get("/games/roulette/table-info");
     return response.data;
   },
+
+  // Shared-wheel tables
+  getTables: async () => {
+    const response = await api.get("/games/roulette/tables");
+    return response.data;
+  },
+
+  placeTableBets: async (tableId, bets) => {
+    const response = await api.post(`/games/roulette/tables/${tableId}/bets`, { bets });
+    return response.data;
+  },
+
+  getTableResults: async (tableId) => {
+    const response = await api.get(`/games/roulette/tables/${tableId}/results`);
+    return response.data;
+  },
+};
+
+// Provably fair seed pairs (dice, mines, crash)
+export const fairAPI = {
+  getSeeds: async () => {
+    const response = await api.get("/games/fair/seeds");
+    return response.data;
+  },
+
+  rotateSeeds: async (clientSeed) => {
+    const response = await api.post("/games/fair/seeds/rotate", {
+      client_seed: clientSeed || null,
+    });
+    return response.data;
+  },
+
+  getHouseSeeds: async () => {
+    const response = await api.get("/games/fair/house");
+    return response.data;
+  },
 };
 
 // Dice
 export const diceAPI = {
-  roll: async (betAmount, target, rollOver, clientSeed, nonce) => {
+  roll: async (betAmount, target, rollOver) => {
     const response = await api.post("/games/dice/roll", {
       bet_amount: betAmount,
       target,
       roll_over: rollOver,
-      client_seed: clientSeed,
-      nonce,
     });
     return response.data;
   },
 
+  // strategy: { on_win, on_loss, stop_profit, stop_loss } (all optional)
+  // Returns { rolls, summary } parsed from the NDJSON stream
+  autobet: async (betAmount, target, rollOver, rolls, strategy = {}) => {
+    const response = await api.post(
+      "/games/dice/autobet",
+      {
+        bet_amount: betAmount,
+        target,
+        roll_over: rollOver,
+        rolls,
+        ...strategy,
+      },
+      { responseType: "text" },
+    );
+    const lines = response.data
+      .split("\n")
+      .filter(Boolean)
+      .map((line) => JSON.parse(line));
+    return { rolls: lines.slice(0, -1), summary: lines[lines.length - 1].summary };
+  },
+
   verify: async (serverSeed, clientSeed, nonce, claimedResult) => {
     const response = await api.post("/games/dice/verify", {
       server_seed: serverSeed,
@@ -61,6 +140,13 @@ export const diceAPI = {
     return response.data;
   },
 
+  // Full table for every target: { roll_over: { multiplier, win_chance }, roll_under: ... }
+  // indexed by target * 100
+  getMultiplierTable: async () => {
+    const response = await api.get("/games/dice/multipliers");
+    return response.data;
+  },
+
   calculateMultiplier: async (target, rollOver) => {
     const response = await api.get("/games/dice/calculate-multiplier", {
       params: { target, roll_over: rollOver },
@@ -76,23 +162,37 @@ export const minesAPI = {
       bet_amount: betAmount,
       num_mines: numMines,
     });
-    return response.data;
+    return keepStateToken("mines", response.data.session_id, response.data);
   },
 
   revealTile: async (sessionId, position) => {
-    const response = await api.post(`/games/mines/${sessionId}/reveal`, {
-      position,
-    });
-    return response.data;
+    const response = await api.post(
+      `/games/mines/${sessionId}/reveal`,
+      { position },
+      { headers: stateHeaders("mines", sessionId) }
+    );
+    return keepStateToken("mines", sessionId, response.data);
   },
 
   cashout: async (sessionId) => {
-    const response = await api.post(`/games/mines/${sessionId}/cashout`);
+    const response = await api.post(`/games/mines/${sessionId}/cashout`, null, {
+      headers: stateHeaders("mines", sessionId),
+    });
+    return keepStateToken("mines", sessionId, response.data);
+  },
+
+  // multipliers[numMines][revealed] for a grid
+  getMultiplierTable: async (gridSize = 25) => {
+    const response = await api.get("/games/mines/multipliers", {
+      params: { grid_size: gridSize },
+    });
     return response.data;
   },
 
   getState: async (sessionId) => {
-    const response = await api.get(`/games/mines/${sessionId}/state`);
+    const response = await api.get(`/games/mines/${sessionId}/state`, {
+      headers: stateHeaders("mines", sessionId),
+    });
     return response.data;
   },
 };
@@ -144,7 +144,8 @@ const Blackjack = () => {
           <div className="bg-white rounded-xl shadow-lg p-6">
             <h3 className="text-2xl font-bold text-gray-900 mb-4">
               Dealer's Hand{" "}
-              {gameState.dealer_value && `(${gameState.dealer_value})`}
+              {gameState.dealer_value &&
+                `(${gameState.dealer_soft ? "Soft " : ""}${gameState.dealer_value})`}
             </h3>
             <div className="flex flex-wrap gap-3 justify-center">
               {gameState.dealer_hand.map((card, idx) => (
@@ -161,7 +162,8 @@ const Blackjack = () => {
           {/* Player's Hand */}
           <div className="bg-white rounded-xl shadow-lg p-6">
             <h3 className="text-2xl font-bold text-gray-900 mb-4">
-              Your Hand ({gameState.player_value})
+              Your Hand ({gameState.player_soft ? "Soft " : ""}
+              {gameState.player_value})
             </h3>
             <div className="flex flex-wrap gap-3 justify-center">
               {gameState.player_hand.map((card, idx) => (
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import { diceAPI } from "../../api/games";
+import { diceAPI, fairAPI } from "../../api/games";
 import { useWallet } from "../../hooks/useWallet";
 import ErrorMessage from "../common/ErrorMessage";
 import Button from "../common/Button";
@@ -13,7 +13,9 @@ const Dice = () => {
   const [multiplier, setMultiplier] = useState(1.98);
   const [winChance, setWinChance] = useState(50);
   const [clientSeed, setClientSeed] = useState("");
-  const [nonce, setNonce] = useState(1);
+  const [seedPair, setSeedPair] = useState(null);
+  const [revealedSeed, setRevealedSeed] = useState(null);
+  const [multiplierTable, setMultiplierTable] = useState(null);
   const [result, setResult] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
@@ -21,13 +23,47 @@ const Dice = () => {
 
   useEffect(() => {
     setClientSeed(generateRandomSeed());
+    loadSeedPair();
+    diceAPI
+      .getMultiplierTable()
+      .then(setMultiplierTable)
+      .catch(() => console.error("Failed to load multiplier table"));
   }, []);
 
   useEffect(() => {
     calculateMultiplier();
-  }, [target, rollOver]);
+  }, [target, rollOver, multiplierTable]);
+
+  const loadSeedPair = async () => {
+    try {
+      setSeedPair(await fairAPI.getSeeds());
+    } catch (err) {
+      console.error("Failed to load seed pair");
+    }
+  };
+
+  const handleRotateSeeds = async () => {
+    setError("");
+    try {
+      const data = await fairAPI.rotateSeeds(clientSeed);
+      setRevealedSeed(data.previous);
+      setSeedPair(data.active);
+      setClientSeed(generateRandomSeed());
+    } catch (err) {
+      setError(err.response?.data?.detail || "Failed to rotate seeds");
+    }
+  };
 
   const calculateMultiplier = async () => {
+    // Slider moves are looked up locally once the table is loaded
+    if (multiplierTable) {
+      const row = multiplierTable[rollOver ? "roll_over" : "roll_under"];
+      const step = Math.round(target * 100);
+      setMultiplier(row.multiplier[step]);
+      setWinChance(row.win_chance[step]);
+      return;
+    }
+
     try {
       const data = await diceAPI.calculateMultiplier(target, rollOver);
       setMultiplier(data.multiplier);
@@ -48,15 +84,9 @@ const Dice = () => {
     setResult(null);
 
     try {
-      const data = await diceAPI.roll(
-        betAmount,
-        target,
-        rollOver,
-        clientSeed,
-        nonce,
-      );
+      const data = await diceAPI.roll(betAmount, target, rollOver);
       setResult(data);
-      setNonce(nonce + 1);
+      setSeedPair({ ...seedPair, nonce: data.nonce + 1 });
       await fetchWallets();
     } catch (err) {
       setError(err.response?.data?.detail || "Failed to roll");
@@ -203,8 +233,8 @@ const Dice = () => {
               <div className="mt-6 bg-white/20 rounded-lg p-4 text-left">
                 <h4 className="font-bold mb-2">Provably Fair Verification</h4>
                 <p className="text-sm break-all">
-                  <strong>Server Seed:</strong>{" "}
-                  {result.server_seed.substring(0, 20)}...
+                  <strong>Server Seed Hash:</strong>{" "}
+                  {result.server_seed_hash.substring(0, 20)}...
                 </p>
                 <p className="text-sm">
                   <strong>Client Seed:</strong> {result.client_seed}
@@ -230,13 +260,44 @@ const Dice = () => {
         </h3>
         <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
           <Input
-            label="Client Seed"
+            label="Active Server Seed Hash"
+            type="text"
+            value={seedPair?.server_seed_hash || ""}
+            readOnly
+          />
+          <Input
+            label="Active Client Seed"
+            type="text"
+            value={seedPair?.client_seed || ""}
+            readOnly
+          />
+          <Input
+            label="Next Nonce"
+            type="number"
+            value={seedPair?.nonce ?? ""}
+            readOnly
+          />
+          <Input
+            label="New Client Seed"
             type="text"
             value={clientSeed}
             onChange={(e) => setClientSeed(e.target.value)}
           />
-          <Input label="Nonce" type="number" value={nonce} readOnly />
         </div>
+        <Button onClick={handleRotateSeeds} variant="secondary" className="mt-4">
+          Rotate Seed Pair
+        </Button>
+        {revealedSeed && (
+          <div className="mt-4 text-sm break-all text-gray-700">
+            <p>
+              <strong>Revealed Server Seed:</strong> {revealedSeed.server_seed}
+            </p>
+            <p>
+              <strong>Client Seed:</strong> {revealedSeed.client_seed} (
+              {revealedSeed.nonce} rolls)
+            </p>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -8,6 +8,7 @@ import { formatCurrency } from "../../utils/helpers";
 
 const Mines = () => {
   const [gameState, setGameState] = useState(null);
+  const [multipliers, setMultipliers] = useState([]);
   const [sessionId, setSessionId] = useState(null);
   const [betAmount, setBetAmount] = useState(10);
   const [numMines, setNumMines] = useState(5);
@@ -35,6 +36,7 @@ const Mines = () => {
       const data = await minesAPI.startGame(betAmount, numMines);
       setSessionId(data.session_id);
       setGameState(data.game_state);
+      setMultipliers(data.multipliers || []);
       await fetchWallets();
     } catch (err) {
       setError(err.response?.data?.detail || "Failed to start game");
@@ -255,6 +257,17 @@ const Mines = () => {
                 Potential Win:{" "}
                 {formatCurrency(betAmount * gameState.multiplier)}
               </p>
+              {!gameState.game_over &&
+                multipliers[(gameState.revealed?.length || 0) + 1] && (
+                  <p className="text-sm mt-1 text-primary-100">
+                    Next Tile:{" "}
+                    {multipliers[gameState.revealed.length + 1].toFixed(2)}x (
+                    {formatCurrency(
+                      betAmount * multipliers[gameState.revealed.length + 1],
+                    )}
+                    )
+                  </p>
+                )}
             </div>
 
             {/* Actions */}